@@ -1,14 +1,36 @@
-import json
-from base64 import b64decode, b64encode
+from datetime import date
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse, Response
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
-from app.core.calendar_gen import generate_ics, generate_multi_ics
-from app.core.holidays import get_countries
-from app.core.optimizer import optimize_vacation
-from app.models.schemas import OptimizeRequest, OptimizeResponse, VacationOption
+from app.core import metrics
+from app.core.batch import REQUEST_ERRORS, optimize_batch
+from app.core.frontier import optimize_frontier
+from app.core.holidays import get_countries, get_subdivisions
+from app.core.planner import plan_vacation
+from app.core.result_cache import optimize_vacation_cached, sweep_vacation_cached
+from app.core.result_store import RESULT_STORE_TTL, get_result_store, ics_etag
+from app.core.serialization import optimize_response_json
+from app.core.streaming import optimize_vacation_stream
+from app.core.team import plan_team_vacation
+from app.models.schemas import (
+    BatchOptimizeRequest,
+    BatchOptimizeResult,
+    FrontierRequest,
+    FrontierResponse,
+    OptimizeRequest,
+    OptimizeResponse,
+    OptimizeStreamEvent,
+    PlanRequest,
+    PlanResponse,
+    SubdivisionList,
+    SweepResponse,
+    TeamPlanRequest,
+    TeamPlanResponse,
+    VacationOption,
+)
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -21,79 +43,316 @@ async def list_countries():
     return countries
 
 
+@router.get("/api/countries/{country_code}/subdivisions", response_model=SubdivisionList)
+async def list_subdivisions(country_code: str, year: int | None = None):
+    """Get the subdivisions that have their own holidays in a year."""
+    country_code = country_code.upper()
+    year = year or date.today().year
+    subdivisions = await get_subdivisions(country_code, year)
+    return SubdivisionList(country=country_code, year=year, subdivisions=subdivisions)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Latency histograms and cache counters in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @router.post("/api/optimize", response_model=OptimizeResponse)
 async def optimize(request: OptimizeRequest):
     """Run vacation optimization algorithm."""
-    options = await optimize_vacation(request)
-    return OptimizeResponse(
+    options = await optimize_vacation_cached(request)
+    # Returning a Response skips FastAPI's response_model validation; the
+    # model still documents the body
+    with metrics.span("serialize"):
+        body = optimize_response_json(
+            options, request.country, request.start_date, request.end_date
+        )
+    return Response(body, media_type="application/json")
+
+
+@router.post("/api/optimize/sweep", response_model=SweepResponse)
+async def optimize_sweep(request: OptimizeRequest):
+    """Best options for every PTO budget from 1 to ``pto_days``, from one search.
+
+    Each option is sent once; ``budgets`` lists which options belong to each
+    budget, so a client can switch budgets without another request.
+    """
+    options, budgets = await sweep_vacation_cached(request)
+    response = SweepResponse.model_construct(
         options=options,
+        budgets=budgets,
         country=request.country,
         search_range=(request.start_date, request.end_date),
     )
+    return Response(response.model_dump_json(), media_type="application/json")
 
 
-@router.post("/results", response_class=HTMLResponse)
-async def results_partial(request: Request):
-    """HTMX endpoint for rendering results partial."""
-    form = await request.form()
+@router.post("/api/optimize/frontier", response_model=FrontierResponse)
+async def optimize_pareto_frontier(request: FrontierRequest):
+    """Only the options no other option beats on both PTO used and days off.
+
+    With ``group_by``, each month or season gets its own frontier.
+    """
+    groups = await optimize_frontier(request)
+    response = FrontierResponse.model_construct(
+        groups=groups,
+        country=request.country,
+        search_range=(request.start_date, request.end_date),
+    )
+    return Response(response.model_dump_json(), media_type="application/json")
+
+
+@router.post("/api/plan", response_model=PlanResponse)
+async def plan(request: PlanRequest):
+    """Choose the non-overlapping trips that give the most days off for a PTO budget."""
+    trips = await plan_vacation(request)
+    response = PlanResponse.model_construct(
+        trips=trips,
+        pto_days_used=sum(t.pto_days_used for t in trips),
+        total_days_off=sum(t.total_days_off for t in trips),
+        country=request.country,
+        search_range=(request.start_date, request.end_date),
+    )
+    return Response(response.model_dump_json(), media_type="application/json")
+
+
+@router.post("/api/plan/team", response_model=TeamPlanResponse)
+async def plan_team(request: TeamPlanRequest):
+    """Plan trips for a whole team, keeping ``min_staffing`` members at work on every PTO day."""
+    members, lowest = await plan_team_vacation(request)
+    response = TeamPlanResponse.model_construct(
+        members=members,
+        lowest_staffing=lowest,
+        country=request.country,
+        search_range=(request.start_date, request.end_date),
+    )
+    return Response(response.model_dump_json(), media_type="application/json")
+
+
+@router.post("/api/optimize/batch")
+async def optimize_many(batch: BatchOptimizeRequest):
+    """Run many optimizations, streaming one NDJSON line per request in input order."""
+
+    async def lines():
+        async for index, result in optimize_batch(batch.requests):
+            request = batch.requests[index]
+            line = BatchOptimizeResult(
+                index=index,
+                country=request.country,
+                search_range=(request.start_date, request.end_date),
+            )
+            if isinstance(result, Exception):
+                line.error = str(result)
+            else:
+                line.options = result
+            yield line.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/api/optimize/stream")
+async def optimize_stream(request: OptimizeRequest, accept: str | None = Header(default=None)):
+    """Stream a rolling top-k while the search runs, then the final list.
+
+    Sends Server-Sent Events if the client accepts text/event-stream,
+    NDJSON otherwise.
+    """
+    use_sse = "text/event-stream" in (accept or "")
+
+    async def events():
+        async for event in _stream_events(request):
+            payload = event.model_dump_json()
+            yield sse_event(event.event, payload) if use_sse else payload + "\n"
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
 
+async def _stream_events(request: OptimizeRequest):
+    try:
+        async for event in optimize_vacation_stream(request):
+            yield OptimizeStreamEvent.model_construct(
+                event=event.event, progress=event.progress, options=event.options, error=None
+            )
+    except REQUEST_ERRORS as exc:
+        yield OptimizeStreamEvent(event="error", progress=1.0, error=str(exc))
+
+
+def sse_event(event: str, data: str) -> str:
+    """Format one Server-Sent Event, splitting multi-line data."""
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+    return f"event: {event}\n{lines}\n"
+
+
+def _form_fields(form) -> dict:
     # Parse work days from checkboxes
     work_days = [int(d) for d in form.getlist("work_days")]
     if not work_days:
         work_days = [0, 1, 2, 3, 4]  # Default to Mon-Fri
 
-    opt_request = OptimizeRequest(
-        country=form["country"],
+    return {
+        "country": form["country"],
+        "work_days": work_days,
+        "start_date": form["start_date"],
+        "end_date": form["end_date"],
+        "subdivision": form.get("subdivision") or None,
+    }
+
+
+def _optional_int(value: str | None) -> int | None:
+    return int(value) if value else None
+
+
+def parse_results_form(form) -> OptimizeRequest:
+    """Build an OptimizeRequest from the results form (or its query string)."""
+    return OptimizeRequest(
+        **_form_fields(form),
         pto_days=int(form["pto_days"]),
-        work_days=work_days,
-        start_date=form["start_date"],
-        end_date=form["end_date"],
-        subdivision=form.get("subdivision") or None,
+        max_results=int(form.get("max_results") or 50),
     )
 
-    options = await optimize_vacation(opt_request)
 
-    # Encode options for ICS download links
-    options_data = [o.model_dump(mode="json") for o in options]
-    encoded_options = b64encode(json.dumps(options_data).encode()).decode()
+def parse_plan_form(form) -> PlanRequest:
+    """Build a PlanRequest from the results form, taking its PTO days as the budget."""
+    return PlanRequest(
+        **_form_fields(form),
+        pto_budget=int(form["pto_days"]),
+        min_trip_days=_optional_int(form.get("min_trip_days")),
+        max_trip_days=_optional_int(form.get("max_trip_days")),
+        min_gap_days=_optional_int(form.get("min_gap_days")) or 0,
+    )
 
-    return templates.TemplateResponse(
-        "results.html",
-        {
-            "request": request,
-            "options": options,
-            "country": opt_request.country,
-            "encoded_options": encoded_options,
-        },
+
+def results_context(request: Request, opt_request: OptimizeRequest, options: list[VacationOption]) -> dict:
+    # Keep the options server-side; download links refer to them by ID
+    return {
+        "request": request,
+        "options": options,
+        "country": opt_request.country,
+        "result_id": get_result_store().save(options),
+    }
+
+
+@router.post("/results", response_class=HTMLResponse)
+async def results_partial(request: Request):
+    """HTMX endpoint for rendering results partial."""
+    form = await request.form()
+    opt_request = parse_results_form(form)
+
+    # Streaming forms get a placeholder that subscribes to /results/stream
+    if form.get("stream"):
+        query = urlencode([(k, v) for k, v in form.multi_items() if k != "stream"])
+        return templates.TemplateResponse(
+            request, "results_stream.html", {"stream_url": f"/results/stream?{query}"}
+        )
+
+    options = await optimize_vacation_cached(opt_request)
+
+    with metrics.span("render"):
+        return templates.TemplateResponse(
+            request, "results.html", results_context(request, opt_request, options)
+        )
+
+
+@router.post("/plan", response_class=HTMLResponse)
+async def plan_partial(request: Request):
+    """HTMX endpoint for rendering a year plan."""
+    plan_request = parse_plan_form(await request.form())
+    trips = await plan_vacation(plan_request)
+
+    with metrics.span("render"):
+        return templates.TemplateResponse(
+            request,
+            "plan.html",
+            {
+                "trips": trips,
+                "budget": plan_request.pto_budget,
+                "pto_days_used": sum(t.pto_days_used for t in trips),
+                "total_days_off": sum(t.total_days_off for t in trips),
+                "result_id": get_result_store().save(trips),
+            },
+        )
+
+
+@router.get("/results/stream")
+async def results_stream(request: Request):
+    """Server-Sent Events of the results partial, re-rendered as the search progresses."""
+    opt_request = parse_results_form(request.query_params)
+    template = templates.get_template("results.html")
+
+    async def events():
+        try:
+            async for event in optimize_vacation_stream(opt_request):
+                if event.event == "final":
+                    context = results_context(request, opt_request, event.options)
+                else:
+                    context = {"request": request, "options": event.options}
+                context.update(streaming=event.event != "final", progress=event.progress)
+                with metrics.span("render"):
+                    html = template.render(context)
+                yield sse_event(event.event, html)
+        except REQUEST_ERRORS as exc:
+            html = templates.get_template("results_error.html").render(message=str(exc))
+            yield sse_event("final", html)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
     )
 
 
-@router.get("/api/ics/single/{index}")
-async def download_single_ics(index: int, data: str):
-    """Download ICS for a single vacation option."""
-    options_data = json.loads(b64decode(data))
-    if index < 0 or index >= len(options_data):
-        return Response(status_code=404)
+@router.get("/api/ics/{result_id}")
+async def download_all_ics(request: Request, result_id: str):
+    """Download ICS with all vacation options of a result, streamed event by event."""
+    from app.core.calendar_gen import iter_multi_ics  # only needed for exports
 
-    option = VacationOption(**options_data[index])
-    ics_content = generate_ics(option)
+    etag = ics_etag(result_id)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_ics_cache_headers(etag))
+    options = get_result_store().load(result_id)
+    if options is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired result: {result_id}")
 
-    return Response(
-        content=ics_content,
+    return StreamingResponse(
+        metrics.timed_iter("ics", iter_multi_ics(options)),
         media_type="text/calendar",
-        headers={"Content-Disposition": f"attachment; filename=vacation-option-{index + 1}.ics"},
+        headers={
+            **_ics_cache_headers(etag),
+            "Content-Disposition": "attachment; filename=vacation-options-all.ics",
+        },
     )
 
 
-@router.get("/api/ics/all")
-async def download_all_ics(data: str):
-    """Download ICS with all vacation options."""
-    options_data = json.loads(b64decode(data))
-    options = [VacationOption(**o) for o in options_data]
-    ics_content = generate_multi_ics(options)
+@router.get("/api/ics/{result_id}/{index}")
+async def download_single_ics(request: Request, result_id: str, index: int):
+    """Download ICS for a single vacation option of a result."""
+    etag = ics_etag(result_id, index)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_ics_cache_headers(etag))
+    try:
+        content = get_result_store().ics(result_id, index)
+    except IndexError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from None
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired result: {result_id}")
 
     return Response(
-        content=ics_content,
+        content=content,
         media_type="text/calendar",
-        headers={"Content-Disposition": "attachment; filename=vacation-options-all.ics"},
+        headers={
+            **_ics_cache_headers(etag),
+            "Content-Disposition": f"attachment; filename=vacation-option-{index + 1}.ics",
+        },
     )
+
+
+def _ics_cache_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"private, max-age={RESULT_STORE_TTL}"}
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,69 @@
+"""Runtime settings, read from ``VACATION_TIME_*`` environment variables."""
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.executor import DEFAULT_TIMEOUT
+from app.core.holiday_archive import ARCHIVE_PATH
+from app.core.store import SNAPSHOT_PATH
+
+
+@dataclass(frozen=True)
+class Settings:
+    # SQLite file persisting upstream holiday data; unset keeps it in memory only
+    holiday_store_path: str | None = None
+    # Bundled snapshot loaded at startup so the app can answer without network
+    holiday_snapshot_path: str | None = str(SNAPSHOT_PATH)
+    # Precompiled public holiday archive, memory-mapped and shared by workers
+    holiday_archive_path: str | None = str(ARCHIVE_PATH)
+    # Where the search runs: "process", "thread" or "inline"
+    executor: str = "process"
+    # Pool size; unset uses the executor's default (one per CPU for processes)
+    executor_workers: int | None = None
+    # Seconds an optimization may run before the request fails
+    optimize_timeout: float = DEFAULT_TIMEOUT
+    # SQLite file sharing results behind download links; unset keeps them in memory only
+    result_store_path: str | None = None
+    # Record per-stage latency histograms for /metrics
+    metrics: bool = False
+    # Also report each request's stage timings in a Server-Timing header
+    server_timing: bool = False
+    # Countries whose holidays for this year and next are preloaded at startup
+    warm_countries: tuple[str, ...] = ()
+    # Seconds startup waits for the preload; the rest finishes in the background
+    warm_up_timeout: float = 5.0
+
+
+def _flag(value: str | None) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _codes(value: str | None) -> tuple[str, ...]:
+    return tuple(code.strip().upper() for code in (value or "").split(",") if code.strip())
+
+
+@lru_cache
+def get_settings() -> Settings:
+    env = os.environ
+    workers = env.get("VACATION_TIME_EXECUTOR_WORKERS")
+    return Settings(
+        holiday_store_path=env.get("VACATION_TIME_HOLIDAY_STORE") or None,
+        holiday_snapshot_path=env.get(
+            "VACATION_TIME_HOLIDAY_SNAPSHOT", Settings.holiday_snapshot_path
+        ) or None,
+        holiday_archive_path=env.get(
+            "VACATION_TIME_HOLIDAY_ARCHIVE", Settings.holiday_archive_path
+        ) or None,
+        executor=env.get("VACATION_TIME_EXECUTOR", Settings.executor),
+        executor_workers=int(workers) if workers else None,
+        optimize_timeout=float(
+            env.get("VACATION_TIME_OPTIMIZE_TIMEOUT", Settings.optimize_timeout)
+        ),
+        result_store_path=env.get("VACATION_TIME_RESULT_STORE") or None,
+        metrics=_flag(env.get("VACATION_TIME_METRICS")),
+        server_timing=_flag(env.get("VACATION_TIME_SERVER_TIMING")),
+        warm_countries=_codes(env.get("VACATION_TIME_WARM_COUNTRIES")),
+        warm_up_timeout=float(
+            env.get("VACATION_TIME_WARM_UP_TIMEOUT", Settings.warm_up_timeout)
+        ),
+    )
@@ -0,0 +1,131 @@
+"""Batch optimization for many requests at once.
+
+Requests that share a country, subdivision, date range and work week need
+the same holidays and the same calendar, so they are grouped and each group
+fetches holidays once. Its searches are split into jobs of at most
+SEARCHES_PER_JOB, each building the calendar once for its share, and the
+jobs of all groups run concurrently in the executor, which spreads them
+across worker processes. So a batch that shares one country, range and
+work week still uses every worker. Jobs wait for a free worker before
+they are submitted, so the per-request deadline only counts running time.
+"""
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import date
+
+import httpx
+
+from app.core import executor
+from app.core.executor import OptimizationTimeoutError
+from app.core.holidays import CountryNotFoundError, get_holidays_for_range
+from app.core.optimizer import search_vacation_batch
+from app.core.result_cache import canonical_request
+from app.models.schemas import OptimizeRequest, VacationOption
+
+GroupKey = tuple[str, str | None, date, date, tuple[int, ...], int, int]
+SearchKey = tuple[int, int]
+
+# Most searches one executor job runs; bigger groups become parallel jobs
+SEARCHES_PER_JOB = 8
+
+# Failures reported per request instead of failing a whole streamed response
+REQUEST_ERRORS = (CountryNotFoundError, OptimizationTimeoutError, httpx.HTTPError)
+
+
+def group_key(request: OptimizeRequest) -> GroupKey:
+    """Requests with the same key share holidays, a calendar and a gap policy."""
+    return (
+        request.country,
+        request.subdivision,
+        request.start_date,
+        request.end_date,
+        tuple(request.work_days),
+        request.max_span_days,
+        request.max_worked_days,
+    )
+
+
+def search_chunks(searches: list[SearchKey], size: int = SEARCHES_PER_JOB) -> list[list[SearchKey]]:
+    """Split a group's searches into consecutive jobs of at most ``size``."""
+    return [searches[i : i + size] for i in range(0, len(searches), size)]
+
+
+async def _search_job(slots: asyncio.Semaphore, *args: object) -> list[list[VacationOption]]:
+    """One search_vacation_batch job, started once a pool slot is free.
+
+    The executor's deadline runs from submission, so jobs wait here instead
+    of in the pool's queue, where a large batch would time out unrun.
+    """
+    async with slots:
+        return await executor.run(search_vacation_batch, *args, timeout=executor.get_timeout())
+
+
+async def _run_group(
+    members: list[OptimizeRequest], slots: asyncio.Semaphore
+) -> dict[SearchKey, list[VacationOption]]:
+    first = members[0]
+    public_holidays = await get_holidays_for_range(
+        first.country,
+        first.start_date,
+        first.end_date,
+        first.subdivision,
+        holiday_type="Public",
+    )
+    searches = sorted({(m.pto_days, m.max_results) for m in members})
+    timeout = executor.get_timeout()
+    jobs = [
+        asyncio.ensure_future(
+            _search_job(
+                slots,
+                first.start_date,
+                first.end_date,
+                first.work_days,
+                public_holidays,
+                chunk,
+                timeout,
+                1,
+                first.max_span_days,
+                first.max_worked_days,
+            )
+        )
+        for chunk in search_chunks(searches)
+    ]
+    try:
+        results = await asyncio.gather(*jobs)
+    finally:
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+    return dict(zip(searches, (options for chunk in results for options in chunk)))
+
+
+async def optimize_batch(
+    requests: list[OptimizeRequest],
+) -> AsyncIterator[tuple[int, list[VacationOption] | Exception]]:
+    """Yield ``(index, options or error)`` for every request, in input order.
+
+    All groups start at once, with at most one search job per pool worker
+    in the executor at a time; results are yielded as soon as every earlier
+    request's group has finished.
+    """
+    canonical = [canonical_request(r) for r in requests]
+    members: dict[GroupKey, list[OptimizeRequest]] = {}
+    for request in canonical:
+        members.setdefault(group_key(request), []).append(request)
+
+    slots = asyncio.Semaphore(executor.get_workers())
+    groups = {
+        key: asyncio.ensure_future(_run_group(group, slots)) for key, group in members.items()
+    }
+    try:
+        for i, request in enumerate(canonical):
+            try:
+                results = await groups[group_key(request)]
+            except REQUEST_ERRORS as exc:
+                yield i, exc
+            else:
+                yield i, results[(request.pto_days, request.max_results)]
+    finally:
+        for task in groups.values():
+            task.cancel()
+        await asyncio.gather(*groups.values(), return_exceptions=True)
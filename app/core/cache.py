@@ -0,0 +1,72 @@
+"""In-process LRU cache with per-entry expiry."""
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, replace
+
+# Returned by LRUCache.get for absent keys, so empty results can be cached
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # entries dropped to stay within maxsize
+    expirations: int = 0  # entries dropped because their TTL passed
+    size: int = 0
+    maxsize: int = 0
+
+
+class LRUCache:
+    """Size-bounded LRU cache with per-entry TTLs on a monotonic clock."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._cache: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._stats = CacheStats(maxsize=maxsize)
+
+    def get(self, key: Hashable, default: object = None) -> object:
+        """Return the cached value, or ``default`` (e.g. MISSING) if absent or expired."""
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if self._clock() < expires_at:
+                self._cache.move_to_end(key)
+                self._stats.hits += 1
+                return value
+            del self._cache[key]
+            self._stats.expirations += 1
+        self._stats.misses += 1
+        return default
+
+    def peek(self, key: Hashable, default: object = None) -> object:
+        """Like get(), but without counting the lookup or refreshing recency."""
+        entry = self._cache.get(key)
+        if entry is not None and self._clock() < entry[0]:
+            return entry[1]
+        return default
+
+    def set(self, key: Hashable, value: object, ttl: float | None = None) -> None:
+        expires_at = self._clock() + (self._ttl if ttl is None else ttl)
+        self._cache[key] = (expires_at, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+            self._stats.evictions += 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        return replace(self._stats, size=len(self._cache))
+
+    def __len__(self) -> int:
+        return len(self._cache)
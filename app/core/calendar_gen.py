@@ -1,68 +1,145 @@
-from datetime import timedelta
-from uuid import uuid4
+"""RFC 5545 calendar export.
 
-from icalendar import Calendar, Event
+Calendars are written line by line rather than built as an object tree:
+values are escaped, lines are folded at 75 octets, and each component is
+yielded as soon as it is complete so large exports can be streamed. UIDs
+are derived from the option content and DTSTAMP is fixed, so the same
+plan always produces the same bytes.
+"""
+from collections.abc import Iterable, Iterator
+from datetime import date, timedelta
+from hashlib import sha256
 
 from app.models.schemas import VacationOption
 
+PRODID = "-//Vacation Time//vacation-time//EN"
+UID_DOMAIN = "vacation-time"
+# Bump when the output changes, so cached downloads get new ETags
+ICS_FORMAT_VERSION = 2
+# DTSTAMP of every event; required by RFC 5545, but a clock value would make
+# output differ between exports of the same plan
+DTSTAMP = "20250101T000000Z"
 
-def generate_ics(option: VacationOption) -> bytes:
-    """Generate an ICS file for a vacation option."""
-    cal = Calendar()
-    cal.add("prodid", "-//Vacation Time//vacation-time//EN")
-    cal.add("version", "2.0")
-    cal.add("calscale", "GREGORIAN")
-    cal.add("method", "PUBLISH")
-    cal.add("x-wr-calname", "Vacation Time - PTO Plan")
-
-    # Create an all-day event spanning the full vacation period
-    vacation_event = Event()
-    vacation_event.add("uid", str(uuid4()))
-    vacation_event.add("dtstart", option.start_date)
-    vacation_event.add("dtend", option.end_date + timedelta(days=1))
-    vacation_event.add("summary", "Vacation Time Off")
+MAX_LINE_OCTETS = 75
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT value (RFC 5545 section 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> bytes:
+    """Encode a content line, folded so no line exceeds 75 octets (section 3.1)."""
+    data = line.encode()
+    if len(data) <= MAX_LINE_OCTETS:
+        return data + b"\r\n"
+
+    parts = []
+    start, limit = 0, MAX_LINE_OCTETS
+    while len(data) - start > limit:
+        end = start + limit
+        while data[end] & 0xC0 == 0x80:  # never split a UTF-8 sequence
+            end -= 1
+        parts.append(data[start:end])
+        # Continuation lines start with a space, which counts toward the limit
+        start, limit = end, MAX_LINE_OCTETS - 1
+    parts.append(data[start:])
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def event_uid(*parts: object) -> str:
+    """Stable UID for an event, derived from what it describes."""
+    digest = sha256("|".join(map(str, parts)).encode()).hexdigest()
+    return f"{digest[:32]}@{UID_DOMAIN}"
+
+
+def calendar_start(name: str) -> bytes:
+    lines = [
+        "BEGIN:VCALENDAR",
+        f"PRODID:{PRODID}",
+        "VERSION:2.0",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ]
+    return b"".join(fold_line(line) for line in lines)
+
+
+CALENDAR_END = fold_line("END:VCALENDAR")
+
+
+def all_day_event(uid: str, start: date, end: date, summary: str, description: str) -> bytes:
+    """A VEVENT covering the days ``start`` through ``end`` inclusive."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"SUMMARY:{escape_text(summary)}",
+        f"DTSTART;VALUE=DATE:{start:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{end + timedelta(days=1):%Y%m%d}",
+        f"UID:{uid}",
+        f"DTSTAMP:{DTSTAMP}",
+        f"DESCRIPTION:{escape_text(description)}",
+        "END:VEVENT",
+    ]
+    return b"".join(fold_line(line) for line in lines)
 
+
+def _option_fingerprint(option: VacationOption) -> tuple[str, ...]:
+    return (
+        option.start_date.isoformat(),
+        option.end_date.isoformat(),
+        ",".join(d.isoformat() for d in option.pto_dates),
+    )
+
+
+def _holiday_names(option: VacationOption) -> str:
+    return ", ".join(h.name for h in option.holidays_included)
+
+
+def iter_ics(option: VacationOption) -> Iterator[bytes]:
+    """Yield the calendar for one vacation option, one component at a time."""
+    yield calendar_start("Vacation Time - PTO Plan")
+
+    # An all-day event spanning the full vacation period
     description_parts = [
         f"Total days off: {option.total_days_off}",
         f"PTO days used: {option.pto_days_used}",
         f"Efficiency: {option.efficiency_ratio}x",
     ]
     if option.holidays_included:
-        holiday_names = [h.name for h in option.holidays_included]
-        description_parts.append(f"Holidays: {', '.join(holiday_names)}")
-
-    vacation_event.add("description", "\n".join(description_parts))
-    cal.add_component(vacation_event)
+        description_parts.append(f"Holidays: {_holiday_names(option)}")
+    yield all_day_event(
+        event_uid("vacation", *_option_fingerprint(option)),
+        option.start_date,
+        option.end_date,
+        "Vacation Time Off",
+        "\n".join(description_parts),
+    )
 
-    # Create individual events for each PTO day
+    # Individual events for each PTO day
     for pto_date in option.pto_dates:
-        pto_event = Event()
-        pto_event.add("uid", str(uuid4()))
-        pto_event.add("dtstart", pto_date)
-        pto_event.add("dtend", pto_date + timedelta(days=1))
-        pto_event.add("summary", "PTO Day")
-        pto_event.add("description", "Take this day off as PTO")
-        cal.add_component(pto_event)
+        yield all_day_event(
+            # Scoped to the option, so importing another option's file keeps these events
+            event_uid("pto", pto_date.isoformat(), *_option_fingerprint(option)),
+            pto_date,
+            pto_date,
+            "PTO Day",
+            "Take this day off as PTO",
+        )
 
-    return cal.to_ical()
+    yield CALENDAR_END
 
 
-def generate_multi_ics(options: list[VacationOption]) -> bytes:
-    """Generate an ICS file with multiple vacation options as separate events."""
-    cal = Calendar()
-    cal.add("prodid", "-//Vacation Time//vacation-time//EN")
-    cal.add("version", "2.0")
-    cal.add("calscale", "GREGORIAN")
-    cal.add("method", "PUBLISH")
-    cal.add("x-wr-calname", "Vacation Time - All Options")
+def iter_multi_ics(options: Iterable[VacationOption]) -> Iterator[bytes]:
+    """Yield a calendar with one event per option, one component at a time."""
+    yield calendar_start("Vacation Time - All Options")
 
     for i, option in enumerate(options, 1):
-        event = Event()
-        event.add("uid", str(uuid4()))
-        event.add("dtstart", option.start_date)
-        event.add("dtend", option.end_date + timedelta(days=1))
-        event.add("summary", f"Vacation Option {i}: {option.total_days_off} days off")
-
         description_parts = [
             f"Option {i}",
             f"Total days off: {option.total_days_off}",
@@ -71,10 +148,23 @@ def generate_multi_ics(options: list[VacationOption]) -> bytes:
             f"PTO dates: {', '.join(d.isoformat() for d in option.pto_dates)}",
         ]
         if option.holidays_included:
-            holiday_names = [h.name for h in option.holidays_included]
-            description_parts.append(f"Holidays: {', '.join(holiday_names)}")
+            description_parts.append(f"Holidays: {_holiday_names(option)}")
+        yield all_day_event(
+            event_uid("option", *_option_fingerprint(option)),
+            option.start_date,
+            option.end_date,
+            f"Vacation Option {i}: {option.total_days_off} days off",
+            "\n".join(description_parts),
+        )
+
+    yield CALENDAR_END
+
+
+def generate_ics(option: VacationOption) -> bytes:
+    """Generate an ICS file for a vacation option."""
+    return b"".join(iter_ics(option))
 
-        event.add("description", "\n".join(description_parts))
-        cal.add_component(event)
 
-    return cal.to_ical()
+def generate_multi_ics(options: list[VacationOption]) -> bytes:
+    """Generate an ICS file with multiple vacation options as separate events."""
+    return b"".join(iter_multi_ics(options))
@@ -0,0 +1,129 @@
+"""Worker pool for the CPU-bound optimization stage.
+
+Searching a long range with many PTO days takes long enough to stall every
+other request on the event loop, so it runs in a pool instead. The mode is
+one of:
+
+- ``process``: a process pool, so searches run in parallel (the default);
+- ``thread``: a thread pool, which keeps the loop responsive but shares the GIL;
+- ``inline``: run on the calling thread, for tests and debugging.
+
+Functions passed to run() must be picklable, along with their arguments
+and results, to work in process mode.
+"""
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import TypeVar
+
+from app.core import metrics
+
+T = TypeVar("T")
+
+EXECUTOR_MODES = ("process", "thread", "inline")
+DEFAULT_TIMEOUT = 30.0
+
+_mode = "process"
+_workers: int | None = None
+_timeout: float | None = DEFAULT_TIMEOUT
+_executor: Executor | None = None
+
+
+class OptimizationTimeoutError(TimeoutError):
+    """An optimization did not finish within its deadline."""
+
+    def __init__(self, timeout: float | None) -> None:
+        super().__init__(f"Optimization did not finish within {timeout:g} seconds")
+        self.timeout = timeout
+
+
+def configure(
+    mode: str = "process",
+    workers: int | None = None,
+    timeout: float | None = DEFAULT_TIMEOUT,
+) -> None:
+    """Select the executor mode, pool size and per-request deadline."""
+    global _mode, _workers, _timeout
+    if mode not in EXECUTOR_MODES:
+        raise ValueError(f"Unknown executor mode {mode!r}, expected one of {EXECUTOR_MODES}")
+    shutdown()
+    _mode = mode
+    _workers = workers
+    _timeout = timeout
+
+
+def get_mode() -> str:
+    return _mode
+
+
+def get_timeout() -> float | None:
+    return _timeout
+
+
+def get_workers() -> int:
+    """How many searches the pool runs at once."""
+    if _mode == "inline":
+        return 1
+    if _workers is not None:
+        return _workers
+    cpus = os.cpu_count() or 1
+    # The standard library's defaults for each pool
+    return cpus if _mode == "process" else min(32, cpus + 4)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if _mode == "process":
+            # Imported here: multiprocessing is not needed in the other modes
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Spawned workers do not inherit the event loop or open sockets
+            _executor = ProcessPoolExecutor(
+                max_workers=get_workers(), mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_workers(), thread_name_prefix="optimizer"
+            )
+    return _executor
+
+
+async def run(fn: Callable[..., T], *args: object, timeout: float | None = None) -> T:
+    """Run fn(*args) in the configured executor.
+
+    Raises OptimizationTimeoutError if it takes longer than ``timeout``
+    seconds, counted from this call, so time spent queued behind a busy
+    pool counts too. A worker cannot be interrupted, so fn should also stop itself
+    at the deadline to free its slot.
+
+    With metrics enabled, the spans fn records where it runs are recorded
+    here too.
+    """
+    collect = metrics.enabled()
+    call = partial(metrics.call_collecting, fn, args) if collect else partial(fn, *args)
+    try:
+        if _mode == "inline":
+            result = call()
+        else:
+            loop = asyncio.get_running_loop()
+            result = await asyncio.wait_for(loop.run_in_executor(_get_executor(), call), timeout)
+    except TimeoutError as exc:
+        raise OptimizationTimeoutError(timeout) from exc
+
+    if collect:
+        result, spans = result
+        for stage, seconds in spans:
+            metrics.record(stage, seconds)
+    return result
+
+
+def shutdown() -> None:
+    """Stop the pool, dropping queued work. A later run() starts a new one."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,165 @@
+"""Pareto frontier of vacations over (PTO used, total days off).
+
+An option is on the frontier if no other option gives at least as many
+days off for no more PTO, with one of the two strictly better. For each
+PTO count only the window with the most days off can qualify (the
+earliest one on ties), and it qualifies if it beats every smaller count.
+So one scan over every window keeps just the best total per PTO count,
+and optionally per month or season the window starts in. Windows are
+scored from the search index and never materialized; only the frontier
+becomes VacationOption models.
+
+Seasons are meteorological: December to February is winter, labelled by
+the year its January falls in.
+"""
+import time
+from datetime import date, timedelta
+
+from app.core import executor, metrics
+from app.core.holiday_archive import HolidaySpan
+from app.core.holidays import get_holidays_for_range
+from app.core.optimizer import build_calendar, materialize_options
+from app.core.search import (
+    MAX_PTO_SPAN_DAYS,
+    MAX_WORKED_DAYS,
+    ClusterWindow,
+    SearchIndex,
+    SearchTimeout,
+)
+from app.models.schemas import FrontierGroup, FrontierRequest, Holiday, VacationOption
+
+# How many windows the scan covers between deadline checks
+DEADLINE_CHECK_WINDOWS = 4096
+
+SEASONS = ("winter", "spring", "summer", "autumn")
+
+
+def group_labels(
+    start_date: date, days: int, group_by: str | None
+) -> tuple[list[str | None], list[int]]:
+    """Labels of the groups in a range, and each day's position in them."""
+    if group_by is None:
+        return [None], [0] * days
+
+    labels: list[str | None] = []
+    positions: dict[str, int] = {}
+    groups = [0] * days
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        if group_by == "month":
+            label = f"{day:%Y-%m}"
+        else:
+            year = day.year + (day.month == 12)
+            label = f"{year}-{SEASONS[day.month % 12 // 3]}"
+        if label not in positions:
+            positions[label] = len(labels)
+            labels.append(label)
+        groups[offset] = positions[label]
+    return labels, groups
+
+
+def pareto_frontier(
+    index: SearchIndex,
+    pto_days: int,
+    groups: list[int] | None = None,
+    group_count: int = 1,
+    deadline: float | None = None,
+) -> list[list[ClusterWindow]]:
+    """The frontier of each group, fewest PTO days first.
+
+    ``groups`` gives each day's group; a window belongs to the group of its
+    first day off. ``deadline`` is a time.monotonic() value; SearchTimeout
+    is raised if it passes.
+    """
+    # best[g][k]: the best k-day window in group g; on ties the one with the
+    # fewest worked days, then the earliest
+    best: list[list[ClusterWindow | None]] = [[None] * (pto_days + 1) for _ in range(group_count)]
+    for scanned, window in enumerate(index.all_windows(pto_days)):
+        if deadline is not None and scanned % DEADLINE_CHECK_WINDOWS == 0 and time.monotonic() > deadline:
+            raise SearchTimeout(f"frontier stopped at workday {window.first_workday}")
+        row = best[groups[window.cluster_start] if groups is not None else 0]
+        kept = row[window.pto_days]
+        if (
+            kept is None
+            or window.total_days_off > kept.total_days_off
+            or window.total_days_off == kept.total_days_off and window.worked_days < kept.worked_days
+        ):
+            row[window.pto_days] = window
+
+    frontiers = []
+    for row in best:
+        frontier = []
+        most = 0
+        for window in row[1:]:
+            if window is not None and window.total_days_off > most:
+                most = window.total_days_off
+                frontier.append(window)
+        frontiers.append(frontier)
+    return frontiers
+
+
+def search_vacation_frontier(
+    start_date: date,
+    end_date: date,
+    work_days: list[int],
+    holidays: list[Holiday] | HolidaySpan,
+    pto_days: int,
+    group_by: str | None = None,
+    time_budget: float | None = None,
+    max_span_days: int = MAX_PTO_SPAN_DAYS,
+    max_worked_days: int = MAX_WORKED_DAYS,
+) -> list[tuple[str | None, list[VacationOption]]]:
+    """Build the calendar and find each group's frontier; empty groups are left out.
+
+    Like search_vacation_options, this takes and returns only picklable
+    values so it can run in a worker process.
+    """
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    with metrics.span("build_calendar"):
+        calendar = build_calendar(start_date, end_date, work_days, holidays)
+    if not calendar:
+        return []
+
+    labels, groups = group_labels(start_date, len(calendar), group_by)
+    with metrics.span("frontier_search"):
+        index = SearchIndex(calendar.day_types, max_span_days, max_worked_days)
+        frontiers = pareto_frontier(index, pto_days, groups, len(labels), deadline)
+    with metrics.span("build_models"):
+        options = materialize_options(calendar, index, [w for f in frontiers for w in f])
+
+    result = []
+    position = 0
+    for label, frontier in zip(labels, frontiers):
+        if frontier:
+            result.append((label, options[position : position + len(frontier)]))
+            position += len(frontier)
+    return result
+
+
+async def optimize_frontier(request: FrontierRequest) -> list[FrontierGroup]:
+    """The Pareto-efficient vacations for a request, per group if asked."""
+    with metrics.span("holidays"):
+        public_holidays = await get_holidays_for_range(
+            request.country.strip().upper(),
+            request.start_date,
+            request.end_date,
+            request.subdivision,
+            holiday_type="Public",
+        )
+
+    timeout = executor.get_timeout()
+    with metrics.span("executor"):
+        groups = await executor.run(
+            search_vacation_frontier,
+            request.start_date,
+            request.end_date,
+            request.work_days,
+            public_holidays,
+            request.pto_days,
+            request.group_by,
+            timeout,
+            request.max_span_days,
+            request.max_worked_days,
+            timeout=timeout,
+        )
+    return [FrontierGroup.model_construct(label=label, options=options) for label, options in groups]
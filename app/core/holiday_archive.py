@@ -0,0 +1,356 @@
+"""Precompiled archive of public holidays, read through mmap.
+
+The optimizer only needs to know which days are public holidays and what
+they are called, so an offline build step compiles holiday payloads into
+one binary file: a 366-bit bitset per country (or subdivision) and year,
+plus the holiday names, interned once. The archive is opened with mmap,
+so every worker process on a host shares one page-cache copy, and a
+calendar's day vector is filled straight from the bitsets.
+
+Layout (little-endian)::
+
+    header     magic, format version, first year, year count, key count, name count
+    names      name_count + 1 u32 offsets, then the UTF-8 names
+    keys       key_count fixed-width ASCII keys, sorted ("US", "US-", "US-CA", ...)
+    present    key_count * year_count bytes, 1 where the year was compiled
+    bitsets    key_count * year_count bitsets of 46 bytes (bit i = day i of the year)
+    day names  key_count * year_count + 1 u32 offsets into the name-ID list,
+               then one u32 name ID per set bit, in day order
+
+Country keys hold all the country's public holidays, ``"{country}-"`` keys
+the nationwide ones, and subdivision keys the nationwide ones plus their
+own, as HolidayIndex.select() returns them. Compile an archive with::
+
+    python -m app.core.holiday_archive --snapshot app/data/holiday_snapshot.json.gz
+"""
+import mmap
+import struct
+from collections.abc import Iterator, Sequence
+from datetime import date
+from itertools import count
+from os import PathLike
+from pathlib import Path
+from typing import NamedTuple
+
+from app.core import search
+from app.models.schemas import Holiday
+
+ARCHIVE_PATH = Path(__file__).resolve().parent.parent / "data" / "holiday_archive.bin"
+
+MAGIC = b"VTHA"
+FORMAT_VERSION = 1
+BITSET_BYTES = 46  # 366 bits
+KEY_BYTES = 12
+
+_HEADER = struct.Struct("<4sHHHII")
+_KEY = struct.Struct(f"<{KEY_BYTES}s")
+
+_archive_versions = count(1)
+
+
+class ArchiveFormatError(ValueError):
+    """A file is not a holiday archive this version can read."""
+
+
+class ArchivedHoliday(NamedTuple):
+    """The parts of a Holiday a calendar keeps, without building a model."""
+
+    date: date
+    name: str
+    types: tuple[str, ...] = ("Public",)
+
+
+class HolidaySpan(Sequence[Holiday]):
+    """Public holidays of one place over a date range, as archive bitsets.
+
+    Behaves as the list of holidays get_holidays_for_range returns, but keeps
+    only the bitsets and names of the years it covers, so it is cheap to
+    pickle to a worker, and build_calendar fills its day vector with fill().
+    """
+
+    __slots__ = ("country_code", "start_date", "end_date", "years", "_holidays")
+
+    def __init__(
+        self,
+        country_code: str,
+        start_date: date,
+        end_date: date,
+        years: list[tuple[int, bytes, tuple[str, ...]]],
+    ) -> None:
+        self.country_code = country_code
+        self.start_date = start_date
+        self.end_date = end_date
+        self.years = years  # (year, bitset, names of its set bits)
+        self._holidays: list[Holiday] | None = None
+
+    def __getstate__(self) -> tuple:
+        return self.country_code, self.start_date, self.end_date, self.years
+
+    def __setstate__(self, state: tuple) -> None:
+        self.country_code, self.start_date, self.end_date, self.years = state
+        self._holidays = None
+
+    def days(self) -> Iterator[tuple[int, str]]:
+        """``(ordinal, name)`` of every holiday in the range, in date order."""
+        first = self.start_date.toordinal()
+        last = self.end_date.toordinal()
+        for year, bitset, names in self.years:
+            base = date(year, 1, 1).toordinal()
+            for day, name in zip(search.set_days(int.from_bytes(bitset, "little")), names):
+                if first <= base + day <= last:
+                    yield base + day, name
+
+    def fill(self, day_types: bytearray, start_date: date) -> dict[int, ArchivedHoliday]:
+        """Mark holidays in a day vector starting at ``start_date``; return them by offset."""
+        base = start_date.toordinal()
+        holidays: dict[int, ArchivedHoliday] = {}
+        for ordinal, name in self.days():
+            offset = ordinal - base
+            if 0 <= offset < len(day_types):
+                day_types[offset] = search.HOLIDAY
+                holidays[offset] = ArchivedHoliday(date.fromordinal(ordinal), name)
+        return holidays
+
+    def _holiday(self, ordinal: int, name: str) -> Holiday:
+        return Holiday.model_construct(
+            date=date.fromordinal(ordinal),
+            name=name,
+            local_name=None,
+            country_code=self.country_code,
+            types=["Public"],
+            counties=None,
+        )
+
+    def _list(self) -> list[Holiday]:
+        if self._holidays is None:
+            self._holidays = [self._holiday(o, name) for o, name in self.days()]
+        return self._holidays
+
+    def __getitem__(self, i):  # type: ignore[override]
+        return self._list()[i]
+
+    def __len__(self) -> int:
+        return len(self._list())
+
+
+class HolidayArchive:
+    """Read-only view of an archive file.
+
+    Opening it reads the header, keys and offset tables; bitsets and names
+    are read from the mapping on demand. ``version`` is new for every opened
+    archive, like HolidayIndex versions.
+    """
+
+    def __init__(self, path: str | PathLike) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except (struct.error, ArchiveFormatError):
+            self._map.close()
+            raise
+        self.version = next(_archive_versions)
+
+    def _parse(self) -> None:
+        view = self._map
+        magic, version, first_year, year_count, key_count, name_count = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ArchiveFormatError(f"not a version {FORMAT_VERSION} holiday archive")
+        self.years = range(first_year, first_year + year_count)
+
+        pos = _HEADER.size
+        self._name_offsets = struct.unpack_from(f"<{name_count + 1}I", view, pos)
+        pos += 4 * (name_count + 1)
+        self._names_at = pos
+        pos += self._name_offsets[-1]
+
+        self._keys: dict[str, int] = {}
+        for i in range(key_count):
+            (key,) = _KEY.unpack_from(view, pos)
+            self._keys[key.rstrip(b"\0").decode("ascii")] = i
+            pos += KEY_BYTES
+
+        slots = key_count * year_count
+        self._present_at = pos
+        pos += slots
+        self._bitsets_at = pos
+        pos += slots * BITSET_BYTES
+        self._day_offsets = struct.unpack_from(f"<{slots + 1}I", view, pos)
+        self._day_names_at = pos + 4 * (slots + 1)
+        self._name_cache: dict[int, str] = {}
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        """Number of countries and subdivisions compiled."""
+        return len(self._keys)
+
+    def _slot(self, key: str, year: int) -> int | None:
+        i = self._keys.get(key)
+        if i is None or year not in self.years:
+            return None
+        slot = i * len(self.years) + year - self.years.start
+        return slot if self._map[self._present_at + slot] else None
+
+    def _name(self, name_id: int) -> str:
+        name = self._name_cache.get(name_id)
+        if name is None:
+            start, end = self._name_offsets[name_id], self._name_offsets[name_id + 1]
+            name = self._map[self._names_at + start : self._names_at + end].decode()
+            self._name_cache[name_id] = name
+        return name
+
+    def covers(self, country_code: str, years: range) -> bool:
+        """Whether every year is compiled for a country."""
+        return all(self._slot(country_code, year) is not None for year in years)
+
+    def span(
+        self,
+        country_code: str,
+        start_date: date,
+        end_date: date,
+        subdivision: str | None = None,
+    ) -> HolidaySpan | None:
+        """Public holidays of a country (or subdivision) in a range, or None if not compiled.
+
+        A subdivision without holidays of its own, or one of another
+        country, observes the nationwide ones.
+        """
+        years = range(start_date.year, end_date.year + 1)
+        if not self.covers(country_code, years):
+            return None
+        if subdivision is None:
+            key = country_code
+        elif subdivision.startswith(f"{country_code}-") and subdivision in self._keys:
+            key = subdivision
+        else:
+            key = _nationwide(country_code)
+        compiled = []
+        for year in years:
+            slot = self._slot(key, year)
+            if slot is None:
+                return None
+            at = self._bitsets_at + slot * BITSET_BYTES
+            first, last = self._day_offsets[slot], self._day_offsets[slot + 1]
+            name_ids = struct.unpack_from(f"<{last - first}I", self._map, self._day_names_at + 4 * first)
+            compiled.append(
+                (year, self._map[at : at + BITSET_BYTES], tuple(map(self._name, name_ids)))
+            )
+        return HolidaySpan(country_code, start_date, end_date, compiled)
+
+
+def _nationwide(country_code: str) -> str:
+    return f"{country_code}-"
+
+
+def compile_archive(entries: dict[str, object]) -> bytes:
+    """Compile ``PublicHolidays/{year}/{country}`` payloads (as in a snapshot) into an archive.
+
+    Each country gets three kinds of key, matching HolidayIndex.select():
+    the country code for all its public holidays, ``"{country}-"`` for the
+    nationwide ones, and each subdivision for the nationwide ones plus its own.
+    """
+    payloads: dict[tuple[str, int], list[dict]] = {}
+    subdivisions: dict[str, set[str]] = {}
+    for path, payload in entries.items():
+        kind, _, rest = path.partition("/")
+        if kind != "PublicHolidays":
+            continue
+        year, _, country = rest.partition("/")
+        public = [h for h in payload if "Public" in (h.get("types") or [])]  # type: ignore[attr-defined]
+        payloads[(country, int(year))] = public
+        subdivisions.setdefault(country, set()).update(
+            county for h in public for county in h.get("counties") or ()
+        )
+
+    # (key, year) -> {day of year: name}; the last holiday on a day names it
+    days: dict[tuple[str, int], dict[int, str]] = {}
+    for (country, year), public in payloads.items():
+        places = [country, _nationwide(country), *subdivisions[country]]
+        for place in places:
+            days[(place, year)] = {}
+        for holiday in public:
+            day = date.fromisoformat(holiday["date"]).timetuple().tm_yday - 1
+            counties = holiday.get("counties")
+            observed = places[:1] + (counties if counties else places[1:])
+            for place in observed:
+                if (place, year) in days:
+                    days[(place, year)][day] = holiday["name"]
+
+    all_years = sorted({year for _, year in payloads})
+    years = range(all_years[0], all_years[-1] + 1) if all_years else range(0)
+    keys = sorted({key for key, _ in days})
+
+    names: dict[str, int] = {}
+    present = bytearray()
+    bitsets = bytearray()
+    day_offsets = [0]
+    day_names: list[int] = []
+    for key in keys:
+        for year in years:
+            present.append((key, year) in days)
+            named = days.get((key, year), {})
+            bits = 0
+            for day in sorted(named):
+                bits |= 1 << day
+                day_names.append(names.setdefault(named[day], len(names)))
+            bitsets += bits.to_bytes(BITSET_BYTES, "little")
+            day_offsets.append(len(day_names))
+
+    encoded = [name.encode() for name in names]
+    name_offsets = [0]
+    for name in encoded:
+        name_offsets.append(name_offsets[-1] + len(name))
+
+    parts = [
+        _HEADER.pack(MAGIC, FORMAT_VERSION, years.start, len(years), len(keys), len(names)),
+        struct.pack(f"<{len(name_offsets)}I", *name_offsets),
+        *encoded,
+        *(_KEY.pack(key.encode("ascii")) for key in keys),
+        bytes(present),
+        bytes(bitsets),
+        struct.pack(f"<{len(day_offsets)}I", *day_offsets),
+        struct.pack(f"<{len(day_names)}I", *day_names),
+    ]
+    return b"".join(parts)
+
+
+def write_archive(path: str | PathLike, entries: dict[str, object]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Replace atomically: running workers keep their mapping of the old file
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(compile_archive(entries))
+    tmp.replace(path)
+
+
+def main() -> None:
+    import argparse
+    import asyncio
+
+    from app.core.store import build_snapshot, read_snapshot
+
+    parser = argparse.ArgumentParser(description="Compile a public holiday archive.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--snapshot", type=Path, help="Compile a holiday snapshot")
+    source.add_argument("--years", help="Fetch a year span from the API, e.g. 2025-2030")
+    parser.add_argument("--output", type=Path, default=ARCHIVE_PATH)
+    args = parser.parse_args()
+
+    if args.snapshot:
+        entries = read_snapshot(args.snapshot)["entries"]
+    else:
+        first, _, last = args.years.partition("-")
+        entries = asyncio.run(build_snapshot(range(int(first), int(last or first) + 1)))
+    write_archive(args.output, entries)
+    archive = HolidayArchive(args.output)
+    print(f"Wrote {len(archive)} places for years {archive.years.start}-{archive.years.stop - 1}")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
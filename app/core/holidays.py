@@ -1,81 +1,420 @@
+import asyncio
+import json
+import logging
 import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
+from itertools import count
+from pathlib import Path
 
 import httpx
 
+from app.core import metrics
+from app.core.cache import MISSING, CacheStats, LRUCache
+from app.core.holiday_archive import HolidayArchive, HolidaySpan
+from app.core.singleflight import SingleFlight
+from app.core.store import HolidayStore
 from app.models.schemas import Country, Holiday
 
 BASE_URL = "https://date.nager.at/api/v3"
 CACHE_TTL = 3600  # 1 hour
+CACHE_MAX_ENTRIES = 2048
+NEGATIVE_CACHE_TTL = 600  # remember unknown countries for 10 minutes
+STORE_REFRESH_AFTER = 24 * 3600  # refresh persisted entries in the background after 1 day
 
+# Country list shipped with the app, shown until the live list is cached
+COUNTRIES_PATH = Path(__file__).resolve().parent.parent / "data" / "countries.json"
 
-class HolidayCache:
-    def __init__(self) -> None:
-        self._cache: dict[str, tuple[float, object]] = {}
+# Upstream HTTP client settings
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 10.0
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 60.0
 
-    def get(self, key: str) -> object | None:
-        if key in self._cache:
-            timestamp, value = self._cache[key]
-            if time.time() - timestamp < CACHE_TTL:
-                return value
-            del self._cache[key]
-        return None
+# Cached in place of holidays for a country the API does not know
+NOT_FOUND = object()
+
+
+class CountryNotFoundError(LookupError):
+    """The holiday API has no data for a country code."""
+
+    def __init__(self, country_code: str) -> None:
+        super().__init__(f"Unknown country code: {country_code}")
+        self.country_code = country_code
+
+
+class HolidayCache(LRUCache):
+    """LRU cache of parsed holiday data, sized and timed for the Nager.Date API."""
 
-    def set(self, key: str, value: object) -> None:
-        self._cache[key] = (time.time(), value)
+    def __init__(
+        self,
+        maxsize: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(maxsize, ttl, clock)
+
+
+@dataclass
+class FetchStats:
+    hits: int = 0  # lookups answered from the cache
+    store_hits: int = 0  # cache misses answered from the persistent store
+    misses: int = 0  # upstream requests made
+    coalesced: int = 0  # lookups that joined an upstream request already in flight
+    archive_hits: int = 0  # range lookups answered from the holiday archive
 
 
 _cache = HolidayCache()
+_index_versions = count(1)
+_client: httpx.AsyncClient | None = None
+_fetches = SingleFlight()
+_index_builds = SingleFlight()
+_stats = FetchStats()
+_store: HolidayStore | None = None
+_archive: HolidayArchive | None = None
+_background: set[asyncio.Task] = set()
+# The one background load of the country list, while it runs
+_countries_load: asyncio.Task | None = None
+
+logger = logging.getLogger(__name__)
+
+
+def create_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """Create a pooled keep-alive HTTP/2 client for the Nager.Date API.
+
+    Pass a transport (e.g. httpx.MockTransport) to serve requests locally.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        transport=transport,
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating one if none has been set."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_client()
+    return _client
+
+
+def set_client(client: httpx.AsyncClient | None) -> None:
+    """Replace the shared client. The previous client is not closed."""
+    global _client
+    _client = client
+
+
+async def close_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def set_store(store: HolidayStore | None) -> None:
+    """Persist upstream responses in a store, or stop persisting with None."""
+    global _store
+    _store = store
+
+
+async def close_store() -> None:
+    """Stop background loads and close the persistent store."""
+    global _store, _countries_load
+    _countries_load = None
+    for task in list(_background):
+        task.cancel()
+    await asyncio.gather(*_background, return_exceptions=True)
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+def set_archive(archive: HolidayArchive | None) -> None:
+    """Answer public holiday range lookups from a precompiled archive where it covers them."""
+    global _archive
+    _archive = archive
+
+
+def close_archive() -> None:
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        _archive = None
+
+
+async def wait_for_refreshes() -> None:
+    """Wait for background loads (store refreshes, warm-up) to finish."""
+    await asyncio.gather(*_background, return_exceptions=True)
+
+
+def cache_stats() -> CacheStats:
+    """Snapshot of the shared holiday cache's counters."""
+    return _cache.stats()
+
+
+def fetch_stats() -> FetchStats:
+    """Snapshot of cache hit, upstream miss and coalesced lookup counters."""
+    return FetchStats(
+        hits=_stats.hits,
+        store_hits=_stats.store_hits,
+        misses=_fetches.calls,
+        coalesced=_fetches.coalesced + _index_builds.coalesced,
+        archive_hits=_stats.archive_hits,
+    )
+
+
+async def _fetch_json(path: str) -> object:
+    """GET a Nager.Date endpoint, sharing the request with concurrent callers.
+
+    With a persistent store set, a stored payload is returned right away; if
+    it is older than STORE_REFRESH_AFTER it is refreshed in the background.
+    """
+    store = _store
+    if store is not None:
+        entry = store.get(path)
+        if entry is not None:
+            fetched_at, payload = entry
+            _stats.store_hits += 1
+            if time.time() - fetched_at >= STORE_REFRESH_AFTER:
+                _refresh_in_background(path)
+            return payload
+
+    return await _fetches.do(path, lambda: _fetch_upstream(path))
+
+
+async def _fetch_upstream(path: str) -> object:
+    endpoint = path.split("/", 1)[0]
+    start = time.perf_counter()
+    try:
+        response = await get_client().get(f"{BASE_URL}/{path}")
+    except httpx.HTTPError:
+        metrics.upstream(endpoint, "error", time.perf_counter() - start)
+        raise
+    metrics.upstream(endpoint, str(response.status_code), time.perf_counter() - start)
+    response.raise_for_status()
+    data = response.json()
+    if _store is not None:
+        _store.put(path, data)
+    return data
+
+
+def _in_background(load: Callable[[], Awaitable[object]], description: str) -> asyncio.Task:
+    """Run ``load()`` as a tracked task, logging upstream failures.
+
+    The awaitable is only created once the task runs, so a task cancelled
+    before it starts leaves nothing unawaited.
+    """
+
+    async def run() -> None:
+        try:
+            await load()
+        except httpx.HTTPError as exc:
+            logger.warning("%s failed: %s", description, exc)
+
+    task = asyncio.ensure_future(run())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return task
+
+
+def _refresh_in_background(path: str) -> None:
+    _in_background(
+        lambda: _fetches.do(path, lambda: _fetch_upstream(path)), f"Background refresh of {path}"
+    )
 
 
 async def get_countries() -> list[Country]:
-    cached = _cache.get("countries")
-    if cached:
+    cached = _cache.get("countries", MISSING)
+    if cached is not MISSING:
+        _stats.hits += 1
         return cached  # type: ignore
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/AvailableCountries")
-        response.raise_for_status()
-        data = response.json()
+    data = await _fetch_json("AvailableCountries")
 
     countries = [Country(code=c["countryCode"], name=c["name"]) for c in data]
     _cache.set("countries", countries)
     return countries
 
 
-async def get_holidays(
-    country_code: str, year: int, subdivision: str | None = None
-) -> list[Holiday]:
-    cache_key = f"holidays:{country_code}:{year}:{subdivision or ''}"
-    cached = _cache.get(cache_key)
-    if cached:
-        return cached  # type: ignore
+@lru_cache(maxsize=1)
+def bundled_countries() -> list[Country]:
+    """The country list shipped with the app."""
+    data = json.loads(COUNTRIES_PATH.read_text(encoding="utf-8"))
+    return [Country(code=c["countryCode"], name=c["name"]) for c in data]
+
+
+def cached_countries() -> list[Country]:
+    """Countries to show without waiting on the API.
+
+    Returns the cached list, or else the bundled one while the live list is
+    loaded in the background.
+    """
+    global _countries_load
+    cached = _cache.peek("countries", MISSING)
+    if cached is not MISSING:
+        return cached  # type: ignore[return-value]
+    if _countries_load is None or _countries_load.done():
+        _countries_load = _in_background(get_countries, "Loading the country list")
+    return bundled_countries()
+
+
+class HolidayIndex:
+    """One country's holidays for a year, indexed by subdivision and type.
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/PublicHolidays/{year}/{country_code}")
-        response.raise_for_status()
-        data = response.json()
+    Built once per country-year from the raw API payload; every subdivision
+    and type filter is then answered from the index and memoized. Each index
+    gets a new ``version``, so results derived from it can tell when the
+    holiday data they used has been replaced.
+    """
 
-    holidays = []
-    for h in data:
-        # Filter by subdivision if specified
-        if subdivision:
-            counties = h.get("counties")
-            if counties and subdivision not in counties:
-                continue
+    def __init__(self, holidays: list[Holiday]) -> None:
+        self.holidays = holidays
+        self.version = next(_index_versions)
+        self._national: list[int] = []
+        self._by_subdivision: dict[str, list[int]] = {}
+        self._by_type: dict[str, set[int]] = {}
+        for i, h in enumerate(holidays):
+            if h.counties:
+                for county in h.counties:
+                    self._by_subdivision.setdefault(county, []).append(i)
+            else:
+                self._national.append(i)
+            for holiday_type in h.types:
+                self._by_type.setdefault(holiday_type, set()).add(i)
+        self._views: dict[tuple[str | None, str | None], list[Holiday]] = {}
 
-        holidays.append(
+    @classmethod
+    def from_payload(cls, data: list[dict]) -> "HolidayIndex":
+        holidays = [
             Holiday(
                 date=date.fromisoformat(h["date"]),
                 name=h["name"],
                 local_name=h.get("localName"),
                 country_code=h["countryCode"],
-                types=h.get("types", []),
+                types=h.get("types") or [],
+                counties=h.get("counties") or None,
             )
-        )
+            for h in data
+        ]
+        return cls(holidays)
+
+    def subdivisions(self) -> list[str]:
+        """Subdivision codes that have their own holidays."""
+        return sorted(self._by_subdivision)
+
+    def select(
+        self, subdivision: str | None = None, holiday_type: str | None = None
+    ) -> list[Holiday]:
+        """Holidays observed in a subdivision (all holidays if None), optionally of one type."""
+        key = (subdivision, holiday_type)
+        view = self._views.get(key)
+        if view is None:
+            if subdivision is None:
+                positions = range(len(self.holidays))
+            else:
+                positions = sorted(self._national + self._by_subdivision.get(subdivision, []))
+            if holiday_type is not None:
+                of_type = self._by_type.get(holiday_type, set())
+                positions = [i for i in positions if i in of_type]
+            view = [self.holidays[i] for i in positions]
+            self._views[key] = view
+        return view
+
+
+def normalize_subdivision(country_code: str, subdivision: str | None) -> str | None:
+    """Qualify a bare region code ("CA") as an ISO 3166-2 code ("US-CA")."""
+    if not subdivision:
+        return None
+    subdivision = subdivision.strip().upper()
+    if "-" not in subdivision:
+        subdivision = f"{country_code.upper()}-{subdivision}"
+    return subdivision
+
+
+async def get_holiday_index(country_code: str, year: int) -> HolidayIndex:
+    """Fetch (or reuse) the holiday index for a country and year."""
+    cache_key = f"holidays:{country_code}:{year}"
+    cached = _cache.get(cache_key, MISSING)
+    if cached is not MISSING:
+        _stats.hits += 1
+        if cached is NOT_FOUND:
+            raise CountryNotFoundError(country_code)
+        return cached  # type: ignore
+
+    async def build() -> HolidayIndex:
+        try:
+            data = await _fetch_json(f"PublicHolidays/{year}/{country_code}")
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code == 404:
+                _cache.set(cache_key, NOT_FOUND, ttl=NEGATIVE_CACHE_TTL)
+                raise CountryNotFoundError(country_code) from exc
+            raise
+        index = HolidayIndex.from_payload(data)  # type: ignore[arg-type]
+        _cache.set(cache_key, index)
+        return index
 
-    _cache.set(cache_key, holidays)
-    return holidays
+    return await _index_builds.do(cache_key, build)
+
+
+async def warm_up(country_codes: Iterable[str], years: range, timeout: float | None) -> None:
+    """Preload the country list and some countries' holidays.
+
+    Waits at most ``timeout`` seconds; loads still running then carry on in
+    the background. Failures are logged, not raised.
+    """
+
+    async def load() -> None:
+        lookups = [get_holiday_index(cc, year) for cc in country_codes for year in years]
+        results = await asyncio.gather(get_countries(), *lookups, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Warm-up lookup failed: %s", result)
+
+    task = _in_background(load, "Warm-up")
+    await asyncio.wait({task}, timeout=timeout)
+
+
+def data_version(country_code: str, years: range) -> tuple[int, ...] | None:
+    """Version of the holiday data for some years, or None if any is not cached.
+
+    That is the archive's version if it covers them, else the versions of
+    the cached holiday indexes.
+    """
+    archive = _archive
+    if archive is not None and archive.covers(country_code, years):
+        return (-archive.version,)  # negative, so never equal to index versions
+    versions = []
+    for year in years:
+        index = _cache.peek(f"holidays:{country_code}:{year}")
+        if not isinstance(index, HolidayIndex):
+            return None
+        versions.append(index.version)
+    return tuple(versions)
+
+
+async def get_holidays(
+    country_code: str,
+    year: int,
+    subdivision: str | None = None,
+    holiday_type: str | None = None,
+) -> list[Holiday]:
+    index = await get_holiday_index(country_code, year)
+    return index.select(normalize_subdivision(country_code, subdivision), holiday_type)
+
+
+async def get_subdivisions(country_code: str, year: int) -> list[str]:
+    index = await get_holiday_index(country_code, year)
+    return index.subdivisions()
 
 
 async def get_holidays_for_range(
@@ -83,13 +422,27 @@ async def get_holidays_for_range(
     start_date: date,
     end_date: date,
     subdivision: str | None = None,
-) -> list[Holiday]:
-    years = set(range(start_date.year, end_date.year + 1))
-    all_holidays: list[Holiday] = []
+    holiday_type: str | None = None,
+) -> list[Holiday] | HolidaySpan:
+    """Holidays of a country (or subdivision) between two dates.
 
-    for year in years:
-        holidays = await get_holidays(country_code, year, subdivision)
-        all_holidays.extend(holidays)
+    Public holidays come from the archive if one is set and covers the
+    range; the HolidaySpan returned then fills calendars from its bitsets.
+    """
+    archive = _archive
+    if archive is not None and holiday_type == "Public":
+        span = archive.span(
+            country_code.upper(), start_date, end_date, normalize_subdivision(country_code, subdivision)
+        )
+        if span is not None:
+            _stats.archive_hits += 1
+            return span
+
+    years = range(start_date.year, end_date.year + 1)
+    results = await asyncio.gather(
+        *(get_holidays(country_code, year, subdivision, holiday_type) for year in years)
+    )
+    all_holidays = [h for holidays in results for h in holidays]
 
     # Filter to date range
     return [h for h in all_holidays if start_date <= h.date <= end_date]
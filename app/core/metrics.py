@@ -0,0 +1,268 @@
+"""Per-stage latency instrumentation, exposed in the Prometheus text format.
+
+Code marks its stages with ``span()``::
+
+    with metrics.span("build_calendar"):
+        ...
+
+While metrics are enabled, every span is observed in a latency histogram
+and added to the current request's Server-Timing list, if one is being
+collected. Functions run through the executor collect their spans where
+they run (possibly a worker process) and hand them back with the result,
+so stages inside the search show up too. While disabled, ``span()``
+returns a shared no-op context manager.
+
+Cache and fetch counters are not counted here: they are read from the
+caches' own statistics when ``/metrics`` is scraped.
+"""
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Span = tuple[str, float]  # (stage, seconds)
+
+_enabled = False
+_server_timing = False
+_NULL_SPAN = nullcontext()
+# Spans of the request (or executor call) being timed, or None
+_spans: ContextVar[list[Span] | None] = ContextVar("spans", default=None)
+# Set inside call_collecting(), whose caller records the spans
+_collecting: ContextVar[bool] = ContextVar("collecting", default=False)
+
+
+class Histogram:
+    """Latency histogram with one series per combination of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...],
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> per-bucket counts (last one is +Inf), then sum and count
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def clear(self) -> None:
+        self._series.clear()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, series in sorted(self._series.items()):
+            labels = "".join(f'{k}="{v}",' for k, v in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], series):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels}le="{bound}"}} {cumulative:g}'
+            labels = f"{{{labels.rstrip(',')}}}" if labels else ""
+            yield f"{self.name}_sum{labels} {series[-2]:.6f}"
+            yield f"{self.name}_count{labels} {series[-1]:g}"
+
+
+stage_seconds = Histogram(
+    "vacation_time_stage_seconds", "Time spent in each stage of a request.", ("stage",)
+)
+request_seconds = Histogram(
+    "vacation_time_request_seconds",
+    "Time to handle an HTTP request, until its response starts.",
+    ("method", "route", "status"),
+)
+upstream_seconds = Histogram(
+    "vacation_time_upstream_request_seconds",
+    "Latency of Nager.Date API requests.",
+    ("endpoint", "status"),
+)
+HISTOGRAMS = (stage_seconds, request_seconds, upstream_seconds)
+
+
+def configure(enabled: bool, server_timing: bool = False) -> None:
+    """Turn instrumentation on or off, optionally adding Server-Timing headers."""
+    global _enabled, _server_timing
+    _enabled = enabled
+    _server_timing = enabled and server_timing
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Drop every recorded observation."""
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+class _Timer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        record(self.stage, time.perf_counter() - self.start)
+
+
+def span(stage: str):
+    """Context manager timing one stage."""
+    if not _enabled and _spans.get() is None:
+        return _NULL_SPAN
+    return _Timer(stage)
+
+
+def record(stage: str, seconds: float) -> None:
+    """Record a finished stage, as if it had run in a span()."""
+    if _enabled and not _collecting.get():
+        stage_seconds.observe(seconds, stage)
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((stage, seconds))
+
+
+def timed_iter(stage: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield from an iterator, recording the time spent producing its items as one stage."""
+    if not _enabled:
+        yield from chunks
+        return
+    elapsed = 0.0
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        chunk = next(iterator, None)
+        elapsed += time.perf_counter() - start
+        if chunk is None:
+            break
+        yield chunk
+    record(stage, elapsed)
+
+
+def upstream(endpoint: str, status: str, seconds: float) -> None:
+    """Record one Nager.Date request."""
+    if _enabled:
+        upstream_seconds.observe(seconds, endpoint, status)
+        record("upstream", seconds)
+
+
+def call_collecting(fn: Callable, args: tuple) -> tuple[object, list[Span]]:
+    """Call fn(*args) and return its result with the spans it recorded.
+
+    Runs where the executor runs fn, so it must stay importable and picklable.
+    """
+    spans: list[Span] = []
+    token = _spans.set(spans)
+    collecting = _collecting.set(True)
+    try:
+        return fn(*args), spans
+    finally:
+        _collecting.reset(collecting)
+        _spans.reset(token)
+
+
+def server_timing(spans: Iterable[Span]) -> str:
+    """Server-Timing header value, in milliseconds, adding up repeated stages."""
+    totals: dict[str, float] = {}
+    for stage, seconds in spans:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in totals.items())
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request and adding its Server-Timing header."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _enabled:
+            await self.app(scope, receive, send)
+            return
+
+        spans: list[Span] = []
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                route = getattr(scope.get("route"), "path", "unmatched")
+                request_seconds.observe(elapsed, scope["method"], route, str(message["status"]))
+                if _server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing([*spans, ("total", elapsed)]))
+            await send(message)
+
+        token = _spans.set(spans)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _spans.reset(token)
+
+
+def _counter(name: str, help: str, samples: Iterable[tuple[str, float]], kind: str = "counter"):
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        yield f"{name}{labels} {value:g}"
+
+
+def _cache_lines() -> Iterator[str]:
+    from app.core.holidays import cache_stats, fetch_stats
+    from app.core.result_cache import result_cache_stats
+
+    caches = {"holidays": cache_stats(), "results": result_cache_stats()}
+    for field in ("hits", "misses", "evictions", "expirations"):
+        yield from _counter(
+            f"vacation_time_cache_{field}_total",
+            f"Cache {field}.",
+            ((f'{{cache="{name}"}}', getattr(stats, field)) for name, stats in caches.items()),
+        )
+    yield from _counter(
+        "vacation_time_cache_entries",
+        "Entries in a cache.",
+        ((f'{{cache="{name}"}}', stats.size) for name, stats in caches.items()),
+        kind="gauge",
+    )
+
+    fetches = fetch_stats()
+    yield from _counter(
+        "vacation_time_holiday_lookups_total",
+        "Holiday lookups by where they were answered.",
+        [
+            ('{source="cache"}', fetches.hits),
+            ('{source="store"}', fetches.store_hits),
+            ('{source="archive"}', fetches.archive_hits),
+            ('{source="upstream"}', fetches.misses),
+            ('{source="coalesced"}', fetches.coalesced),
+        ],
+    )
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines = [*_cache_lines()]
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
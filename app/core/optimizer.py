@@ -1,7 +1,13 @@
+import time
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Mapping
 from datetime import date, timedelta
 from enum import Enum
 
+from app.core import executor, metrics, search
+from app.core.holiday_archive import ArchivedHoliday, HolidaySpan
 from app.core.holidays import get_holidays_for_range
+from app.core.search import MAX_PTO_SPAN_DAYS, MAX_WORKED_DAYS, ClusterWindow, SearchIndex
 from app.models.schemas import Holiday, HolidayDetail, OptimizeRequest, VacationOption
 
 
@@ -11,34 +17,192 @@ class DayType(Enum):
     HOLIDAY = "holiday"
 
 
+# Day types by their code in a CompactCalendar day vector
+_DAY_TYPES = {
+    search.WORKDAY: DayType.WORKDAY,
+    search.WEEKEND: DayType.WEEKEND,
+    search.HOLIDAY: DayType.HOLIDAY,
+}
+
+
+class CompactCalendar(Mapping[date, tuple[DayType, Holiday | None]]):
+    """Calendar stored as one day-type byte per day plus a sparse holiday table.
+
+    Days are addressed by their offset from ``start_date``. The mapping
+    interface matches the dict calendars this replaced, but the optimizer
+    works on the offsets directly and only turns them into dates for output.
+    """
+
+    __slots__ = ("start_date", "day_types", "holidays")
+
+    def __init__(
+        self,
+        start_date: date,
+        day_types: bytearray,
+        holidays: dict[int, Holiday] | dict[int, ArchivedHoliday],
+    ) -> None:
+        self.start_date = start_date
+        self.day_types = day_types
+        self.holidays = holidays
+
+    @classmethod
+    def from_mapping(
+        cls, calendar: Mapping[date, tuple[DayType, Holiday | None]]
+    ) -> "CompactCalendar":
+        """Pack a calendar covering consecutive days."""
+        if isinstance(calendar, CompactCalendar):
+            return calendar
+        dates = sorted(calendar.keys())
+        codes = {day_type: code for code, day_type in _DAY_TYPES.items()}
+        day_types = bytearray(codes[calendar[d][0]] for d in dates)
+        holidays = {
+            i: calendar[d][1]
+            for i, d in enumerate(dates)
+            if calendar[d][0] == DayType.HOLIDAY and calendar[d][1]
+        }
+        return cls(dates[0] if dates else date.min, day_types, holidays)
+
+    def date_at(self, offset: int) -> date:
+        return self.start_date + timedelta(days=offset)
+
+    def offset_of(self, day: date) -> int:
+        return (day - self.start_date).days
+
+    def __getitem__(self, day: date) -> tuple[DayType, Holiday | None]:
+        offset = self.offset_of(day)
+        if not 0 <= offset < len(self.day_types):
+            raise KeyError(day)
+        return _DAY_TYPES[self.day_types[offset]], self.holidays.get(offset)
+
+    def __iter__(self) -> Iterator[date]:
+        return (self.date_at(i) for i in range(len(self.day_types)))
+
+    def __len__(self) -> int:
+        return len(self.day_types)
+
+
 def build_calendar(
     start_date: date,
     end_date: date,
     work_days: list[int],
-    holidays: list[Holiday],
-) -> dict[date, tuple[DayType, Holiday | None]]:
-    """Build a calendar marking each day's type and holiday info if applicable."""
-    holiday_map = {h.date: h for h in holidays}
-    calendar: dict[date, tuple[DayType, Holiday | None]] = {}
-
-    current = start_date
-    while current <= end_date:
-        if current in holiday_map:
-            calendar[current] = (DayType.HOLIDAY, holiday_map[current])
-        elif current.weekday() not in work_days:
-            calendar[current] = (DayType.WEEKEND, None)
-        else:
-            calendar[current] = (DayType.WORKDAY, None)
-        current += timedelta(days=1)
+    holidays: list[Holiday] | HolidaySpan,
+) -> CompactCalendar:
+    """Build a calendar marking each day's type and holiday info if applicable.
+
+    Holidays from the archive are marked straight from its bitsets.
+    """
+    days = max((end_date - start_date).days + 1, 0)
+
+    # Lay down the weekly work pattern, rotated to start on start_date's weekday
+    week = bytes(
+        search.WORKDAY if weekday in work_days else search.WEEKEND
+        for weekday in range(7)
+    )
+    first = start_date.weekday()
+    week = week[first:] + week[:first]
+    day_types = bytearray((week * (days // 7 + 1))[:days])
 
-    return calendar
+    if isinstance(holidays, HolidaySpan):
+        return CompactCalendar(start_date, day_types, holidays.fill(day_types, start_date))
+
+    holiday_map: dict[int, Holiday] = {}
+    for h in holidays:
+        offset = (h.date - start_date).days
+        if 0 <= offset < days:
+            day_types[offset] = search.HOLIDAY
+            holiday_map[offset] = h
+
+    return CompactCalendar(start_date, day_types, holiday_map)
 
 
 def find_vacation_clusters(
-    calendar: dict[date, tuple[DayType, Holiday | None]],
+    calendar: Mapping[date, tuple[DayType, Holiday | None]],
     pto_days: int,
+    max_span_days: int = MAX_PTO_SPAN_DAYS,
+    max_worked_days: int = MAX_WORKED_DAYS,
 ) -> list[VacationOption]:
     """Find all possible vacation clusters using up to pto_days of PTO."""
+    compact = CompactCalendar.from_mapping(calendar)
+    if not compact:
+        return []
+
+    index = SearchIndex(compact.day_types, max_span_days, max_worked_days)
+    return materialize_options(compact, index, index.search(pto_days))
+
+
+def find_top_vacation_options(
+    calendar: Mapping[date, tuple[DayType, Holiday | None]],
+    pto_days: int,
+    limit: int,
+    deadline: float | None = None,
+    max_span_days: int = MAX_PTO_SPAN_DAYS,
+    max_worked_days: int = MAX_WORKED_DAYS,
+) -> list[VacationOption]:
+    """Find the best ``limit`` vacation clusters, ranked like optimize_vacation."""
+    compact = CompactCalendar.from_mapping(calendar)
+    if not compact:
+        return []
+
+    index = SearchIndex(compact.day_types, max_span_days, max_worked_days)
+    return materialize_options(compact, index, index.top(pto_days, limit, deadline))
+
+
+def materialize_options(
+    calendar: CompactCalendar,
+    index: SearchIndex,
+    windows: Iterable[ClusterWindow],
+) -> list[VacationOption]:
+    """Turn search windows into VacationOption models.
+
+    Each holiday gets a single HolidayDetail shared by every option that
+    includes it.
+    """
+    holiday_offsets = sorted(calendar.holidays)
+    details: dict[int, HolidayDetail] = {}
+    base = calendar.start_date.toordinal()
+
+    def detail(offset: int) -> HolidayDetail:
+        if offset not in details:
+            holiday = calendar.holidays[offset]
+            details[offset] = HolidayDetail(
+                date=holiday.date, name=holiday.name, types=holiday.types
+            )
+        return details[offset]
+
+    options: list[VacationOption] = []
+    for window in windows:
+        first = bisect_left(holiday_offsets, window.cluster_start)
+        last = bisect_right(holiday_offsets, window.cluster_end)
+        worked_dates = None
+        if window.worked_days:
+            worked_dates = [
+                date.fromordinal(base + i)
+                for i in index.worked(window.first_workday, window.pto_days, window.worked_days)
+            ]
+        options.append(
+            VacationOption(
+                pto_dates=[
+                    date.fromordinal(base + i)
+                    for i in index.window(window.first_workday, window.pto_days, window.worked_days)
+                ],
+                pto_days_used=window.pto_days,
+                total_days_off=window.total_days_off,
+                efficiency_ratio=round(window.total_days_off / window.pto_days, 2),
+                start_date=date.fromordinal(base + window.cluster_start),
+                end_date=date.fromordinal(base + window.cluster_end),
+                holidays_included=[detail(i) for i in holiday_offsets[first:last]],
+                worked_dates=worked_dates,
+            )
+        )
+
+    return options
+
+
+def find_vacation_clusters_reference(
+    calendar: Mapping[date, tuple[DayType, Holiday | None]],
+    pto_days: int,
+) -> list[VacationOption]:
+    """Brute-force cluster search, kept as the reference for find_vacation_clusters."""
     dates = sorted(calendar.keys())
     if not dates:
         return []
@@ -64,7 +228,7 @@ def find_vacation_clusters(
 
 def find_best_cluster_from(
     dates: list[date],
-    calendar: dict[date, tuple[DayType, Holiday | None]],
+    calendar: Mapping[date, tuple[DayType, Holiday | None]],
     start_idx: int,
     pto_to_use: int,
 ) -> VacationOption | None:
@@ -124,7 +288,7 @@ def find_best_cluster_from(
 
 def expand_cluster(
     dates: list[date],
-    calendar: dict[date, tuple[DayType, Holiday | None]],
+    calendar: Mapping[date, tuple[DayType, Holiday | None]],
     first_pto_idx: int,
     last_pto_idx: int,
 ) -> tuple[date, date]:
@@ -150,30 +314,169 @@ def expand_cluster(
     return dates[start_idx], dates[end_idx]
 
 
-async def optimize_vacation(request: OptimizeRequest) -> list[VacationOption]:
-    """Main optimization function."""
-    all_holidays = await get_holidays_for_range(
-        request.country,
-        request.start_date,
-        request.end_date,
-        request.subdivision,
+def search_vacation_options(
+    start_date: date,
+    end_date: date,
+    work_days: list[int],
+    holidays: list[Holiday] | HolidaySpan,
+    pto_days: int,
+    max_results: int,
+    time_budget: float | None = None,
+    max_span_days: int = MAX_PTO_SPAN_DAYS,
+    max_worked_days: int = MAX_WORKED_DAYS,
+) -> list[VacationOption]:
+    """Build the calendar and run the search.
+
+    This is the CPU-bound stage of optimize_vacation. It takes and returns
+    only picklable values so it can run in a worker process; ``time_budget``
+    is in seconds from when the worker starts.
+    """
+    searches = [(pto_days, max_results)]
+    return search_vacation_batch(
+        start_date,
+        end_date,
+        work_days,
+        holidays,
+        searches,
+        time_budget,
+        max_span_days=max_span_days,
+        max_worked_days=max_worked_days,
+    )[0]
+
+
+def search_vacation_batch(
+    start_date: date,
+    end_date: date,
+    work_days: list[int],
+    holidays: list[Holiday] | HolidaySpan,
+    searches: list[tuple[int, int]],
+    time_budget: float | None = None,
+    min_pto_days: int = 1,
+    max_span_days: int = MAX_PTO_SPAN_DAYS,
+    max_worked_days: int = MAX_WORKED_DAYS,
+) -> list[list[VacationOption]]:
+    """Run several ``(pto_days, max_results)`` searches over one shared calendar.
+
+    Searches only consider budgets of at least ``min_pto_days``, which lets
+    one search be split into ranges of budgets that run separately.
+    """
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    with metrics.span("build_calendar"):
+        calendar = build_calendar(start_date, end_date, work_days, holidays)
+    if not calendar:
+        return [[] for _ in searches]
+
+    results = []
+    with metrics.span("search_index"):
+        index = SearchIndex(calendar.day_types, max_span_days, max_worked_days)
+    for pto_days, max_results in searches:
+        # Keep only the best max_results options, ranked by total days off,
+        # then efficiency, then start date
+        with metrics.span("cluster_search"):
+            windows = index.top(pto_days, max_results, deadline, min_pto_days)
+        with metrics.span("build_models"):
+            results.append(materialize_options(calendar, index, windows))
+    return results
+
+
+def search_vacation_sweep(
+    start_date: date,
+    end_date: date,
+    work_days: list[int],
+    holidays: list[Holiday] | HolidaySpan,
+    pto_days: int,
+    max_results: int,
+    time_budget: float | None = None,
+    max_span_days: int = MAX_PTO_SPAN_DAYS,
+    max_worked_days: int = MAX_WORKED_DAYS,
+) -> tuple[list[VacationOption], list[list[int]]]:
+    """The best options for every budget from 1 to pto_days, from one calendar and search.
+
+    Returns each distinct option once, plus for every budget the positions
+    of its options in ranking order; budgets share most of their options.
+    """
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    with metrics.span("build_calendar"):
+        calendar = build_calendar(start_date, end_date, work_days, holidays)
+    if not calendar:
+        return [], [[] for _ in range(pto_days)]
+
+    with metrics.span("cluster_search"):
+        index = SearchIndex(calendar.day_types, max_span_days, max_worked_days)
+        per_budget = index.sweep(pto_days, max_results, deadline)
+
+    positions: dict[ClusterWindow, int] = {}
+    budgets = [
+        [positions.setdefault(window, len(positions)) for window in windows]
+        for windows in per_budget
+    ]
+    with metrics.span("build_models"):
+        return materialize_options(calendar, index, positions), budgets
+
+
+def option_rank_key(option: VacationOption) -> tuple[int, float, int, date]:
+    """Sort key matching the search ranking: days off, efficiency, worked days, then start date."""
+    return (
+        -option.total_days_off,
+        -option.efficiency_ratio,
+        len(option.worked_dates or ()),
+        option.start_date,
     )
 
+
+async def optimize_vacation(request: OptimizeRequest) -> list[VacationOption]:
+    """Main optimization function."""
     # Only treat "Public" holidays as days off (federal/national holidays)
     # Other types (School, Authorities, Observance) are not days off for most workers
-    public_holidays = [h for h in all_holidays if "Public" in h.types]
+    with metrics.span("holidays"):
+        public_holidays = await get_holidays_for_range(
+            request.country,
+            request.start_date,
+            request.end_date,
+            request.subdivision,
+            holiday_type="Public",
+        )
 
-    calendar = build_calendar(
-        request.start_date,
-        request.end_date,
-        request.work_days,
-        public_holidays,
-    )
+    timeout = executor.get_timeout()
+    with metrics.span("executor"):
+        return await executor.run(
+            search_vacation_options,
+            request.start_date,
+            request.end_date,
+            request.work_days,
+            public_holidays,
+            request.pto_days,
+            request.max_results,
+            timeout,
+            request.max_span_days,
+            request.max_worked_days,
+            timeout=timeout,
+        )
 
-    options = find_vacation_clusters(calendar, request.pto_days)
 
-    # Sort by total days off (descending), then by efficiency, then by start date
-    options.sort(key=lambda o: (-o.total_days_off, -o.efficiency_ratio, o.start_date))
+async def sweep_vacation(request: OptimizeRequest) -> tuple[list[VacationOption], list[list[int]]]:
+    """Best options for every PTO budget up to ``request.pto_days``; see search_vacation_sweep."""
+    with metrics.span("holidays"):
+        public_holidays = await get_holidays_for_range(
+            request.country,
+            request.start_date,
+            request.end_date,
+            request.subdivision,
+            holiday_type="Public",
+        )
 
-    # Limit results to avoid overwhelming the UI
-    return options[:50]
+    timeout = executor.get_timeout()
+    with metrics.span("executor"):
+        return await executor.run(
+            search_vacation_sweep,
+            request.start_date,
+            request.end_date,
+            request.work_days,
+            public_holidays,
+            request.pto_days,
+            request.max_results,
+            timeout,
+            request.max_span_days,
+            request.max_worked_days,
+            timeout=timeout,
+        )
@@ -0,0 +1,176 @@
+"""Annual PTO planner.
+
+Instead of ranking single clusters, the planner picks the set of
+non-overlapping trips that together give the most days off within a total
+PTO budget. A trip is any candidate window of the cluster search (a run of
+consecutive workdays taken as PTO, widened to the free days around it).
+
+The choice is a knapsack over the day vector: ``best[d][b]`` is the most
+days off from trips that are over (gap included) by day ``d`` using at most
+``b`` PTO days. Each day either inherits ``best[d - 1]`` or ends a trip
+started at ``s``, extending ``best[s]``; with trip lengths bounded by the
+PTO span limit that is O(days * budget).
+"""
+import time
+from datetime import date
+
+from app.core import executor, metrics
+from app.core.holiday_archive import HolidaySpan
+from app.core.holidays import get_holidays_for_range
+from app.core.optimizer import build_calendar, materialize_options
+from app.core.search import (
+    MAX_PTO_SPAN_DAYS,
+    MAX_WORKED_DAYS,
+    ClusterWindow,
+    SearchIndex,
+    SearchTimeout,
+)
+from app.models.schemas import Holiday, PlanRequest, VacationOption
+
+# How many days of the DP run between deadline checks
+DEADLINE_CHECK_DAYS = 64
+
+
+def candidate_trips(
+    index: SearchIndex,
+    budget: int,
+    min_trip_days: int | None = None,
+    max_trip_days: int | None = None,
+    blocked: int = 0,
+) -> list[ClusterWindow]:
+    """Every window of up to ``budget`` PTO days within the gap policy and length limits.
+
+    ``blocked`` is a bitset of day offsets that may not be taken as PTO.
+    """
+    trips = []
+    too_long = -1  # first workday whose windows have passed max_trip_days
+    for trip in index.all_windows(budget, blocked):
+        if trip.first_workday == too_long:
+            continue
+        # More PTO from the same start never gives fewer days off
+        if max_trip_days is not None and trip.total_days_off > max_trip_days:
+            too_long = trip.first_workday
+            continue
+        if min_trip_days is not None and trip.total_days_off < min_trip_days:
+            continue
+        trips.append(trip)
+    return trips
+
+
+def plan_trips(
+    index: SearchIndex,
+    budget: int,
+    min_trip_days: int | None = None,
+    max_trip_days: int | None = None,
+    min_gap_days: int = 0,
+    deadline: float | None = None,
+    blocked: int = 0,
+) -> list[ClusterWindow]:
+    """The best set of non-overlapping trips, in date order.
+
+    Trips are ``min_gap_days`` apart, and always at least one workday apart
+    so two trips never join into a longer one. Among plans with the most
+    days off, the one using the least PTO wins. ``deadline`` is a
+    time.monotonic() value; SearchTimeout is raised if it passes. No trip
+    takes PTO on a day set in the ``blocked`` bitset.
+    """
+    n = len(index.run_start)
+
+    # Group trips by the first day the next trip may start
+    arrivals: list[list[ClusterWindow]] = [[] for _ in range(n + 1)]
+    for trip in candidate_trips(index, budget, min_trip_days, max_trip_days, blocked):
+        arrivals[min(trip.cluster_end + 1 + max(min_gap_days, 1), n)].append(trip)
+
+    best = [[0] * (budget + 1)]
+    choices: list[list[ClusterWindow | None]] = [[]]
+    for d in range(1, n + 1):
+        if deadline is not None and d % DEADLINE_CHECK_DAYS == 0 and time.monotonic() > deadline:
+            raise SearchTimeout(f"plan stopped at day {d} of {n}")
+        row = best[d - 1][:]
+        picks: list[ClusterWindow | None] = [None] * (budget + 1)
+        for trip in arrivals[d]:
+            k = trip.pto_days
+            before = best[trip.cluster_start]
+            for b in range(k, budget + 1):
+                total = before[b - k] + trip.total_days_off
+                if total > row[b]:
+                    row[b] = total
+                    picks[b] = trip
+        best.append(row)
+        choices.append(picks)
+
+    # Fewest PTO days reaching the best total
+    b = best[n].index(best[n][budget])
+    plan = []
+    d = n
+    while d > 0:
+        trip = choices[d][b]
+        if trip is None:
+            d -= 1
+        else:
+            plan.append(trip)
+            b -= trip.pto_days
+            d = trip.cluster_start
+    plan.reverse()
+    return plan
+
+
+def search_vacation_plan(
+    start_date: date,
+    end_date: date,
+    work_days: list[int],
+    holidays: list[Holiday] | HolidaySpan,
+    budget: int,
+    min_trip_days: int | None = None,
+    max_trip_days: int | None = None,
+    min_gap_days: int = 0,
+    time_budget: float | None = None,
+    max_span_days: int = MAX_PTO_SPAN_DAYS,
+    max_worked_days: int = MAX_WORKED_DAYS,
+) -> list[VacationOption]:
+    """Build the calendar and plan the trips.
+
+    Like search_vacation_options, this takes and returns only picklable
+    values so it can run in a worker process.
+    """
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    with metrics.span("build_calendar"):
+        calendar = build_calendar(start_date, end_date, work_days, holidays)
+    if not calendar:
+        return []
+
+    with metrics.span("plan_search"):
+        index = SearchIndex(calendar.day_types, max_span_days, max_worked_days)
+        trips = plan_trips(index, budget, min_trip_days, max_trip_days, min_gap_days, deadline)
+    with metrics.span("build_models"):
+        return materialize_options(calendar, index, trips)
+
+
+async def plan_vacation(request: PlanRequest) -> list[VacationOption]:
+    """Plan the best non-overlapping trips for a PTO budget."""
+    with metrics.span("holidays"):
+        public_holidays = await get_holidays_for_range(
+            request.country.strip().upper(),
+            request.start_date,
+            request.end_date,
+            request.subdivision,
+            holiday_type="Public",
+        )
+
+    timeout = executor.get_timeout()
+    with metrics.span("executor"):
+        return await executor.run(
+            search_vacation_plan,
+            request.start_date,
+            request.end_date,
+            request.work_days,
+            public_holidays,
+            request.pto_budget,
+            request.min_trip_days,
+            request.max_trip_days,
+            request.min_gap_days,
+            timeout,
+            request.max_span_days,
+            request.max_worked_days,
+            timeout=timeout,
+        )
@@ -0,0 +1,129 @@
+"""Memoized optimization results.
+
+Identical queries are common (same country, work week and range with a
+handful of PTO counts), so results are cached under a canonical form of the
+request. An entry is only served while the holiday data it was computed
+from is still the cached data, and concurrent identical requests share a
+single computation.
+"""
+from app.core import holidays
+from app.core.cache import MISSING, CacheStats, LRUCache
+from app.core.holidays import get_holidays_for_range, normalize_subdivision
+from app.core.optimizer import optimize_vacation, sweep_vacation
+from app.core.singleflight import SingleFlight
+from app.models.schemas import OptimizeRequest, VacationOption
+
+RESULT_CACHE_MAX_ENTRIES = 512
+RESULT_CACHE_TTL = holidays.CACHE_TTL
+
+Version = tuple[int, ...] | None
+RequestKey = tuple[str, str | None, str, str, int, int, int, int, int]
+
+_results = LRUCache(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL)
+_computations = SingleFlight()
+
+
+def canonical_request(request: OptimizeRequest) -> OptimizeRequest:
+    """Normalize spellings that do not change the result (case, bare region codes)."""
+    country = request.country.strip().upper()
+    return request.model_copy(
+        update={
+            "country": country,
+            "subdivision": normalize_subdivision(country, request.subdivision),
+            "work_days": sorted(set(request.work_days)),
+        }
+    )
+
+
+def request_key(request: OptimizeRequest) -> RequestKey:
+    """Cache key for a canonical request, with work days as a weekday bitmask."""
+    return (
+        request.country,
+        request.subdivision,
+        request.start_date.isoformat(),
+        request.end_date.isoformat(),
+        sum(1 << day for day in request.work_days),
+        request.pto_days,
+        request.max_results,
+        request.max_span_days,
+        request.max_worked_days,
+    )
+
+
+def _years(request: OptimizeRequest) -> range:
+    return range(request.start_date.year, request.end_date.year + 1)
+
+
+def cached_result(request: OptimizeRequest) -> list[VacationOption] | None:
+    """The cached options for a canonical request, if still valid."""
+    version = data_version(request)
+    if version is None:
+        return None
+    cached = _results.get(request_key(request), MISSING)
+    if cached is MISSING or cached[0] != version:
+        return None
+    return cached[1]
+
+
+def data_version(request: OptimizeRequest) -> Version:
+    """Version of the cached holiday data a canonical request is computed from."""
+    return holidays.data_version(request.country, _years(request))
+
+
+async def load_data_version(request: OptimizeRequest) -> Version:
+    """Make sure a request's holidays are cached, and return their version.
+
+    Read it before computing: a refresh that lands during the search must
+    leave the result marked with the data it was actually computed from.
+    """
+    await get_holidays_for_range(
+        request.country,
+        request.start_date,
+        request.end_date,
+        request.subdivision,
+        holiday_type="Public",
+    )
+    return data_version(request)
+
+
+def store_result(request: OptimizeRequest, options: list[VacationOption], version: Version) -> None:
+    """Cache options computed for a canonical request from holiday data at ``version``."""
+    if version is not None:
+        _results.set(request_key(request), (version, options))
+
+
+async def optimize_vacation_cached(request: OptimizeRequest) -> list[VacationOption]:
+    """optimize_vacation with result memoization and request coalescing."""
+    request = canonical_request(request)
+    cached = cached_result(request)
+    if cached is not None:
+        return cached
+
+    async def compute() -> list[VacationOption]:
+        version = await load_data_version(request)
+        options = await optimize_vacation(request)
+        store_result(request, options, version)
+        return options
+
+    return await _computations.do(request_key(request), compute)
+
+
+async def sweep_vacation_cached(
+    request: OptimizeRequest,
+) -> tuple[list[VacationOption], list[list[int]]]:
+    """sweep_vacation, also caching each budget's options as its single-budget result."""
+    request = canonical_request(request)
+    version = await load_data_version(request)
+    options, budgets = await sweep_vacation(request)
+    for pto_days, positions in enumerate(budgets, 1):
+        budget = request.model_copy(update={"pto_days": pto_days})
+        store_result(budget, [options[i] for i in positions], version)
+    return options, budgets
+
+
+def result_cache_stats() -> CacheStats:
+    return _results.stats()
+
+
+def clear_result_cache() -> None:
+    _results.clear()
@@ -0,0 +1,161 @@
+"""Short-lived store of rendered results, for downloads that refer back to them.
+
+The results page links its ICS downloads to a short result ID instead of
+embedding every option in the URL. IDs are derived from the options
+themselves, so rendering the same result twice reuses the entry. Entries
+live in a bounded in-memory LRU, optionally backed by SQLite so they
+survive restarts and are shared between workers, and the ICS bytes
+generated from them are cached per ``(result_id, index)``. The ICS writer
+is imported on first use, so processes that never export skip it. ICS output is a
+deterministic function of the options, so ETags come from the result ID
+and conditional requests are answered without rendering anything.
+"""
+import sqlite3
+import threading
+import time
+from base64 import urlsafe_b64encode
+from collections.abc import Callable
+from hashlib import sha256
+from os import PathLike
+
+from pydantic import TypeAdapter
+
+from app.core import metrics
+from app.core.cache import MISSING, LRUCache
+from app.core.serialization import dump_options
+from app.models.schemas import VacationOption
+
+RESULT_STORE_MAX_ENTRIES = 1024
+RESULT_STORE_TTL = 24 * 3600  # downloads keep working for a day
+ICS_CACHE_MAX_ENTRIES = 4096
+
+_options_adapter = TypeAdapter(list[VacationOption])
+
+
+def ics_etag(result_id: str, index: int | None = None) -> str:
+    """Strong ETag for the ICS export of one option (or all options with None)."""
+    from app.core.calendar_gen import ICS_FORMAT_VERSION
+    part = "all" if index is None else index
+    return f'"{result_id}-{part}-v{ICS_FORMAT_VERSION}"'
+
+
+class ResultStore:
+    """Bounded TTL store of option lists keyed by short result ID.
+
+    With a ``path`` the entries are also written to SQLite; memory stays the
+    first lookup and SQLite answers what memory has evicted or never saw.
+    """
+
+    def __init__(
+        self,
+        path: str | PathLike | None = None,
+        maxsize: int = RESULT_STORE_MAX_ENTRIES,
+        ttl: float = RESULT_STORE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._results = LRUCache(maxsize, ttl, clock)
+        self._ics = LRUCache(ICS_CACHE_MAX_ENTRIES, ttl, clock)
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            with self._lock, self._db:
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " id TEXT PRIMARY KEY,"
+                    " created_at REAL NOT NULL,"
+                    " payload BLOB NOT NULL)"
+                )
+                self._db.execute(
+                    "CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)"
+                )
+
+    def save(self, options: list[VacationOption]) -> str:
+        """Store options and return their result ID."""
+        payload = dump_options(options)
+        result_id = urlsafe_b64encode(sha256(payload).digest()[:12]).decode()
+        self._results.set(result_id, options)
+        if self._db is not None:
+            now = time.time()
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT INTO results (id, created_at, payload) VALUES (?, ?, ?)"
+                    " ON CONFLICT(id) DO UPDATE SET created_at = excluded.created_at",
+                    (result_id, now, payload),
+                )
+                self._db.execute("DELETE FROM results WHERE created_at < ?", (now - self._ttl,))
+                self._db.execute(
+                    "DELETE FROM results WHERE id IN"
+                    " (SELECT id FROM results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self._maxsize,),
+                )
+        return result_id
+
+    def load(self, result_id: str) -> list[VacationOption] | None:
+        """The options stored under an ID, or None if unknown or expired."""
+        options = self._results.get(result_id, MISSING)
+        if options is not MISSING:
+            return options  # type: ignore[return-value]
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload FROM results WHERE id = ? AND created_at >= ?",
+                (result_id, time.time() - self._ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        options = _options_adapter.validate_json(row[0])
+        self._results.set(result_id, options)
+        return options
+
+    def ics(self, result_id: str, index: int) -> bytes | None:
+        """ICS bytes for one option, or None if the result is unknown or expired.
+
+        Raises IndexError if the result exists but has no option ``index``.
+        """
+        key = (result_id, index)
+        cached = self._ics.get(key, MISSING)
+        if cached is not MISSING:
+            return cached  # type: ignore[return-value]
+
+        options = self.load(result_id)
+        if options is None:
+            return None
+        if not 0 <= index < len(options):
+            raise IndexError(f"No option {index} in result {result_id}")
+        from app.core.calendar_gen import generate_ics  # only needed for exports
+
+        with metrics.span("ics"):
+            content = generate_ics(options[index])
+        self._ics.set(key, content)
+        return content
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+
+_store = ResultStore()
+
+
+def get_result_store() -> ResultStore:
+    return _store
+
+
+def set_result_store(store: ResultStore) -> None:
+    """Replace the shared store. The previous store is not closed."""
+    global _store
+    _store = store
+
+
+def close_result_store() -> None:
+    """Close the shared store and fall back to a fresh in-memory one."""
+    global _store
+    _store.close()
+    _store = ResultStore()
@@ -0,0 +1,349 @@
+"""Cluster search engine.
+
+A candidate vacation is a run of consecutive workdays taken as PTO, widened
+to the weekends and holidays on either side. The engine precomputes, once
+per calendar:
+
+- the position of every workday (the inverse of a prefix sum of workdays),
+  so the window of ``k`` workdays starting at any workday is found by index
+  arithmetic;
+- the free-run boundaries of every day (the first/last day of the stretch of
+  non-workdays touching it), so expanding a window to its full cluster is a
+  pair of array lookups.
+
+Every window is therefore scored in O(1) and a search over ``pto_days``
+budgets costs O(days * pto_days).
+
+The gap policy bounds a vacation: its PTO days span at most
+``max_span_days`` days, and up to ``max_worked_days`` workdays between its
+first and last PTO day may be worked instead of taken off, which lets a
+vacation bridge two nearby holidays without paying for the days between.
+Windows breaking the policy are never scored: the scan over window lengths
+stops at the first one past the span limit. Working a day never shortens
+the stretch the PTO covers, so for each start and budget the widest window
+within the policy has the most days off. Worked days split the time off
+in two, so a window only works days where that beats every window of the
+same budget without them, and ties go to fewer worked days.
+
+Calendars are given as a day-type vector with one byte per consecutive day,
+so every position in the engine is a day offset from the calendar start.
+"""
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+from heapq import heappush, heapreplace
+from typing import NamedTuple
+
+# Default gap policy: PTO days within 14 days, all on consecutive workdays
+MAX_PTO_SPAN_DAYS = 14
+MAX_WORKED_DAYS = 0
+
+# Day-type codes used in day vectors
+WORKDAY = 0
+WEEKEND = 1
+HOLIDAY = 2
+
+
+class SearchTimeout(TimeoutError):
+    """The search passed its deadline before finishing."""
+
+
+class ClusterWindow(NamedTuple):
+    """A scored PTO window, expressed as day offsets into the calendar."""
+
+    first_seen: int  # earliest start offset whose search yields this window
+    pto_days: int
+    first_workday: int  # rank of the first PTO day among all workdays
+    cluster_start: int
+    cluster_end: int
+    total_days_off: int
+    worked_days: int = 0  # workdays between the first and last PTO day that are worked
+
+
+class SearchIndex:
+    """Workday positions and free-run boundaries for one calendar, under one gap policy."""
+
+    __slots__ = ("workdays", "run_start", "run_end", "max_span_days", "max_worked_days")
+
+    def __init__(
+        self,
+        day_types: bytes | bytearray,
+        max_span_days: int = MAX_PTO_SPAN_DAYS,
+        max_worked_days: int = MAX_WORKED_DAYS,
+    ) -> None:
+        self.max_span_days = max_span_days
+        self.max_worked_days = max_worked_days
+        n = len(day_types)
+        self.workdays = array("i", (i for i in range(n) if day_types[i] == WORKDAY))
+
+        # run_start[i] is the first day after the nearest workday left of i,
+        # run_end[i] the last day before the nearest workday right of i
+        self.run_start = array("i", bytes(4 * n))
+        start = 0
+        for i in range(n):
+            self.run_start[i] = start
+            if day_types[i] == WORKDAY:
+                start = i + 1
+
+        self.run_end = array("i", bytes(4 * n))
+        end = n - 1
+        for i in range(n - 1, -1, -1):
+            self.run_end[i] = end
+            if day_types[i] == WORKDAY:
+                end = i - 1
+
+    def window(self, first_workday: int, pto_days: int, worked_days: int = 0) -> list[int]:
+        """Day offsets of the PTO days in a window.
+
+        Worked days sit in the middle of the window, between a leading half
+        of the PTO days and a trailing one.
+        """
+        if not worked_days:
+            return list(self.workdays[first_workday : first_workday + pto_days])
+        lead = first_workday + (pto_days + 1) // 2
+        end = first_workday + pto_days + worked_days
+        return list(self.workdays[first_workday:lead]) + list(self.workdays[lead + worked_days : end])
+
+    def worked(self, first_workday: int, pto_days: int, worked_days: int) -> list[int]:
+        """Day offsets of the worked days in a window."""
+        lead = first_workday + (pto_days + 1) // 2
+        return list(self.workdays[lead : lead + worked_days])
+
+    def search(self, pto_days: int) -> Iterator[ClusterWindow]:
+        """Yield the best window for every starting offset and budget up to pto_days.
+
+        For a start offset ``s`` and budget ``k`` the best window is the one
+        with the most days off among windows whose first PTO day is at or
+        after ``s``, the earliest one winning ties. As ``s`` advances that
+        answer only changes when ``s`` passes a workday, so a suffix maximum
+        over windows gives every answer at once. Windows are yielded ordered
+        by the first start offset that produces them, then by budget.
+        """
+        found = list(self.windows(pto_days))
+        found.sort(key=lambda w: (w.first_seen, w.pto_days))
+        return iter(found)
+
+    def windows(
+        self, pto_days: int, deadline: float | None = None, min_pto_days: int = 1
+    ) -> Iterator[ClusterWindow]:
+        """Yield the same windows as search(), grouped by budget instead of start.
+
+        Only budgets from ``min_pto_days`` to ``pto_days`` are searched.
+        ``deadline`` is a time.monotonic() value; SearchTimeout is raised if
+        it passes between budgets.
+        """
+        for k in range(min_pto_days, pto_days + 1):
+            if deadline is not None and time.monotonic() > deadline:
+                raise SearchTimeout(f"search stopped before budget {k} of {pto_days}")
+            yield from self._search_budget(k)
+
+    def all_windows(self, pto_days: int, blocked: int = 0) -> Iterator[ClusterWindow]:
+        """Yield every window of up to ``pto_days`` PTO days within the gap policy.
+
+        Each starting workday and budget gets one window, widened by worked
+        days the way search() widens it, only where that beats every window
+        without worked days. Windows come ordered by first
+        workday, then budget. No window takes PTO on a day set in the
+        ``blocked`` bitset.
+        """
+        workdays = self.workdays
+        run_start = self.run_start
+        run_end = self.run_end
+        max_span_days = self.max_span_days
+        n = len(workdays)
+        # plain[k] for budget k; worked days need at least two PTO days
+        plain = [0, 0] + [self._plain_total(k) if self.max_worked_days else 0 for k in range(2, pto_days + 1)]
+        for j in range(n):
+            first = workdays[j]
+            if blocked >> first & 1:
+                continue
+            start = run_start[first]
+            for k in range(1, min(pto_days, n - j) + 1):
+                if workdays[j + k - 1] - first > max_span_days:
+                    break
+                total = -1
+                worked = 0
+                max_worked = self.max_worked_days if k >= 2 else 0
+                for w in range(min(max_worked, n - j - k) + 1):
+                    last = workdays[j + k + w - 1]
+                    if last - first > max_span_days:
+                        break
+                    days_off = run_end[last] - start + 1 - w
+                    if days_off > total and (not w or days_off > plain[k]):
+                        total = days_off
+                        worked = w
+                if blocked:
+                    if not self.max_worked_days and blocked >> workdays[j + k - 1] & 1:
+                        break  # every longer run of workdays includes it too
+                    if any(blocked >> d & 1 for d in self.window(j, k, worked)):
+                        continue
+                end = start + total - 1 + worked
+                yield ClusterWindow(start, k, j, start, end, total, worked)
+
+    def top(
+        self,
+        pto_days: int,
+        limit: int,
+        deadline: float | None = None,
+        min_pto_days: int = 1,
+    ) -> list[ClusterWindow]:
+        """The best ``limit`` windows of search(), in ranking order."""
+        return top_windows(self.windows(pto_days, deadline, min_pto_days), limit)
+
+    def sweep(
+        self, pto_days: int, limit: int, deadline: float | None = None
+    ) -> list[list[ClusterWindow]]:
+        """top(k, limit) for every budget k from 1 to pto_days, in one pass.
+
+        The windows of budget ``k`` are the new candidates for every larger
+        budget, so one bounded heap grows budget by budget and is read off
+        after each. Element ``k - 1`` of the result belongs to budget ``k``.
+        """
+        heap: list[_HeapItem] = []
+        results = []
+        for k in range(1, pto_days + 1):
+            if deadline is not None and time.monotonic() > deadline:
+                raise SearchTimeout(f"sweep stopped before budget {k} of {pto_days}")
+            for window in self._search_budget(k):
+                _keep_best(heap, window, limit)
+            results.append([item[-1] for item in sorted(heap, reverse=True)])
+        return results
+
+    def _plain_total(self, k: int) -> int:
+        """Most days off from ``k`` consecutive PTO workdays within the span limit.
+
+        Working a day splits the time off in two, so a window with worked
+        days is only used where it beats every window without.
+        """
+        workdays = self.workdays
+        run_start = self.run_start
+        run_end = self.run_end
+        most = 0
+        for j in range(len(workdays) - k + 1):
+            first = workdays[j]
+            last = workdays[j + k - 1]
+            if last - first <= self.max_span_days:
+                most = max(most, run_end[last] - run_start[first] + 1)
+        return most
+
+    def _search_budget(self, k: int) -> Iterator[ClusterWindow]:
+        workdays = self.workdays
+        run_start = self.run_start
+        run_end = self.run_end
+        max_span_days = self.max_span_days
+        windows = len(workdays) - k + 1
+        if windows <= 0:
+            return
+        # The first and last PTO days bound the window, so working a day takes two of them
+        max_worked = self.max_worked_days if k >= 2 else 0
+
+        # best[j] is the best valid window starting at rank >= j, or -1;
+        # worked[j] is how many of its workdays are worked
+        best = [-1] * windows
+        worked = [0] * windows
+        best_j = -1
+        best_w = 0
+        best_total = 0
+        if not max_worked:
+            for j in range(windows - 1, -1, -1):
+                first = workdays[j]
+                last = workdays[j + k - 1]
+                if last - first <= max_span_days:
+                    total = run_end[last] - run_start[first] + 1
+                    if total >= best_total:
+                        best_j = j
+                        best_total = total
+                best[j] = best_j
+        else:
+            plain = self._plain_total(k)
+            for j in range(windows - 1, -1, -1):
+                first = workdays[j]
+                start = run_start[first]
+                # Days off never drop as the window widens; keep the
+                # narrowest window that reaches the most
+                j_total = -1
+                j_w = 0
+                for w in range(min(max_worked, len(workdays) - j - k) + 1):
+                    last = workdays[j + k + w - 1]
+                    if last - first > max_span_days:
+                        break
+                    total = run_end[last] - start + 1 - w
+                    if total > j_total and (not w or total > plain):
+                        j_total = total
+                        j_w = w
+                # Ties go to fewer worked days, then to the earlier window
+                if j_total >= 0 and (j_total, -j_w) >= (best_total, -best_w):
+                    best_j = j
+                    best_w = j_w
+                    best_total = j_total
+                best[j] = best_j
+                worked[j] = best_w
+
+        previous = -1
+        for j in range(windows):
+            chosen = best[j]
+            if chosen == -1 or chosen == previous:
+                continue
+            previous = chosen
+            w = worked[j]
+            first = workdays[chosen]
+            last = workdays[chosen + k + w - 1]
+            start = run_start[first]
+            end = run_end[last]
+            yield ClusterWindow(
+                first_seen=0 if j == 0 else workdays[j - 1] + 1,
+                pto_days=k,
+                first_workday=chosen,
+                cluster_start=start,
+                cluster_end=end,
+                total_days_off=end - start + 1 - w,
+                worked_days=w,
+            )
+
+
+def set_days(bits: int) -> Iterator[int]:
+    """Offsets of the set bits of a day bitset, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def rank_key(window: ClusterWindow) -> tuple[int, float, int, int]:
+    """Sort key ranking windows by days off, efficiency, fewest worked days, then earliest start."""
+    return (
+        -window.total_days_off,
+        -round(window.total_days_off / window.pto_days, 2),
+        window.worked_days,
+        window.cluster_start,
+    )
+
+
+def top_windows(windows: Iterable[ClusterWindow], limit: int) -> list[ClusterWindow]:
+    """Select the ``limit`` best windows by rank_key with a bounded heap.
+
+    Only ``limit`` windows are held at any time, so memory does not grow
+    with the number of candidates.
+    """
+    heap: list[_HeapItem] = []
+    for window in windows:
+        _keep_best(heap, window, limit)
+
+    heap.sort(reverse=True)
+    return [item[-1] for item in heap]
+
+
+# Min-heap entry on the negated rank key: the root is the worst window kept
+_HeapItem = tuple[int, float, int, int, ClusterWindow]
+
+
+def _keep_best(heap: list[_HeapItem], window: ClusterWindow, limit: int) -> None:
+    """Add a window to a heap of the ``limit`` best, if it ranks among them."""
+    if limit <= 0:
+        return
+    total, efficiency, worked, start = rank_key(window)
+    item = (-total, -efficiency, -worked, -start, window)
+    if len(heap) < limit:
+        heappush(heap, item)
+    elif item > heap[0]:
+        heapreplace(heap, item)
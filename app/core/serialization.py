@@ -0,0 +1,51 @@
+"""Fast JSON output for option lists the app computed itself.
+
+Responses built from optimizer output are written here and returned as
+ready bytes, which skips FastAPI's response_model validation. An option
+list is dumped once: the bytes are kept while the list is (cached results
+are returned as the same list object), so a response, the result store
+and repeated cache hits all reuse one dump.
+"""
+import json
+from datetime import date
+
+from pydantic import TypeAdapter
+
+from app.core.cache import MISSING, LRUCache
+from app.models.schemas import VacationOption
+
+DUMP_CACHE_MAX_ENTRIES = 512
+DUMP_CACHE_TTL = 3600
+
+_options_adapter = TypeAdapter(list[VacationOption])
+# id(options) -> (options, JSON); holding the list keeps its id from being reused
+_dumps = LRUCache(DUMP_CACHE_MAX_ENTRIES, DUMP_CACHE_TTL)
+
+
+def dump_options(options: list[VacationOption]) -> bytes:
+    """JSON array of options, dumped once per list object."""
+    cached = _dumps.get(id(options), MISSING)
+    if cached is not MISSING and cached[0] is options:  # type: ignore[index]
+        return cached[1]  # type: ignore[index]
+    dumped = _options_adapter.dump_json(options)
+    _dumps.set(id(options), (options, dumped))
+    return dumped
+
+
+def optimize_response_json(
+    options: list[VacationOption], country: str, start_date: date, end_date: date
+) -> bytes:
+    """An OptimizeResponse body, written around the options' shared dump."""
+    return b"".join(
+        [
+            b'{"options":',
+            dump_options(options),
+            b',"country":',
+            json.dumps(country, ensure_ascii=False).encode(),
+            f',"search_range":["{start_date}","{end_date}"]}}'.encode(),
+        ]
+    )
+
+
+def clear_dumps() -> None:
+    _dumps.clear()
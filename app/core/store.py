@@ -0,0 +1,141 @@
+"""Persistent store of raw Nager.Date responses.
+
+Entries are keyed by API path (e.g. ``PublicHolidays/2026/US``) and keep the
+decoded JSON payload with the wall-clock time it was fetched, so they stay
+meaningful across restarts and can be shared by every worker on a host.
+
+Run as a module to build a snapshot for bundling with the app::
+
+    python -m app.core.store --years 2025-2028 --output app/data/holiday_snapshot.json.gz
+"""
+import asyncio
+import gzip
+import json
+import sqlite3
+import threading
+import time
+from os import PathLike
+from pathlib import Path
+
+SNAPSHOT_PATH = Path(__file__).resolve().parent.parent / "data" / "holiday_snapshot.json.gz"
+
+
+class HolidayStore:
+    """SQLite-backed key/value store of upstream payloads."""
+
+    def __init__(self, path: str | PathLike = ":memory:") -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " fetched_at REAL NOT NULL,"
+                " payload TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> tuple[float, object] | None:
+        """Return ``(fetched_at, payload)`` for a key, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at, payload FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put(self, key: str, payload: object, fetched_at: float | None = None) -> None:
+        """Store a payload, keeping whichever copy was fetched most recently."""
+        self.put_many({key: payload}, fetched_at)
+
+    def put_many(self, entries: dict[str, object], fetched_at: float | None = None) -> None:
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO entries (key, fetched_at, payload) VALUES (?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                " fetched_at = excluded.fetched_at, payload = excluded.payload"
+                " WHERE excluded.fetched_at > entries.fetched_at",
+                [(key, fetched_at, json.dumps(payload)) for key, payload in entries.items()],
+            )
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT key FROM entries ORDER BY key")]
+
+    def load_snapshot(self, path: str | PathLike) -> int:
+        """Load a snapshot file, keeping newer entries already in the store.
+
+        Returns the number of entries in the snapshot.
+        """
+        snapshot = read_snapshot(path)
+        self.put_many(snapshot["entries"], snapshot["generated_at"])
+        return len(snapshot["entries"])
+
+    def export_snapshot(self, path: str | PathLike) -> int:
+        """Write every entry to a snapshot file and return the entry count."""
+        with self._lock:
+            rows = self._db.execute("SELECT key, payload FROM entries ORDER BY key").fetchall()
+        entries = {key: json.loads(payload) for key, payload in rows}
+        write_snapshot(path, entries)
+        return len(entries)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def read_snapshot(path: str | PathLike) -> dict:
+    """Read a gzipped JSON snapshot of ``{"generated_at", "entries"}``."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_snapshot(path: str | PathLike, entries: dict[str, object]) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"generated_at": time.time(), "entries": entries}, f, separators=(",", ":"))
+
+
+async def build_snapshot(years: range) -> dict[str, object]:
+    """Fetch the country list and every country's holidays for the given years."""
+    from app.core.holidays import BASE_URL, close_client, get_client
+
+    client = get_client()
+    entries: dict[str, object] = {}
+    try:
+        response = await client.get(f"{BASE_URL}/AvailableCountries")
+        response.raise_for_status()
+        entries["AvailableCountries"] = response.json()
+
+        paths = [
+            f"PublicHolidays/{year}/{country['countryCode']}"
+            for country in entries["AvailableCountries"]
+            for year in years
+        ]
+        for path in paths:
+            response = await client.get(f"{BASE_URL}/{path}")
+            response.raise_for_status()
+            entries[path] = response.json()
+    finally:
+        await close_client()
+    return entries
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a bundled holiday snapshot.")
+    parser.add_argument("--years", required=True, help="Year span, e.g. 2025-2028")
+    parser.add_argument("--output", type=Path, default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    first, _, last = args.years.partition("-")
+    entries = asyncio.run(build_snapshot(range(int(first), int(last or first) + 1)))
+    write_snapshot(args.output, entries)
+    print(f"Wrote {len(entries)} entries to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
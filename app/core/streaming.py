@@ -0,0 +1,87 @@
+"""Incremental optimization results.
+
+The PTO budgets 1..pto_days are split into chunks that are searched as
+separate executor jobs. Budgets never share candidates, so merging the best
+options of each finished chunk gives the current top-k over the budgets
+searched so far, and once every chunk is in it is exactly the result of
+optimize_vacation.
+"""
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from app.core import executor
+from app.core.holidays import get_holidays_for_range
+from app.core.optimizer import option_rank_key, search_vacation_batch
+from app.core.result_cache import cached_result, canonical_request, data_version, store_result
+from app.models.schemas import OptimizeRequest, VacationOption
+
+STREAM_CHUNKS = 6
+
+
+@dataclass
+class StreamEvent:
+    event: str  # "update" while searching, then "final"
+    options: list[VacationOption]
+    progress: float  # fraction of PTO budgets searched
+
+
+def budget_chunks(pto_days: int, chunks: int = STREAM_CHUNKS) -> list[range]:
+    """Split budgets 1..pto_days into at most ``chunks`` contiguous ranges."""
+    size = -(-pto_days // chunks)
+    return [range(k, min(k + size, pto_days + 1)) for k in range(1, pto_days + 1, size)]
+
+
+async def optimize_vacation_stream(request: OptimizeRequest) -> AsyncIterator[StreamEvent]:
+    """Yield a rolling top-k as budget chunks finish, then the final ranked list."""
+    request = canonical_request(request)
+    cached = cached_result(request)
+    if cached is not None:
+        yield StreamEvent("final", cached, 1.0)
+        return
+
+    public_holidays = await get_holidays_for_range(
+        request.country,
+        request.start_date,
+        request.end_date,
+        request.subdivision,
+        holiday_type="Public",
+    )
+    # Read before searching, so a refresh during the search cannot mark the result as newer
+    version = data_version(request)
+
+    timeout = executor.get_timeout()
+    chunks = budget_chunks(request.pto_days)
+    jobs = [
+        asyncio.ensure_future(
+            executor.run(
+                search_vacation_batch,
+                request.start_date,
+                request.end_date,
+                request.work_days,
+                public_holidays,
+                [(chunk[-1], request.max_results)],
+                timeout,
+                chunk[0],
+                request.max_span_days,
+                request.max_worked_days,
+                timeout=timeout,
+            )
+        )
+        for chunk in chunks
+    ]
+
+    top: list[VacationOption] = []
+    try:
+        for finished, job in enumerate(asyncio.as_completed(jobs), 1):
+            (options,) = await job
+            top = sorted(top + options, key=option_rank_key)[: request.max_results]
+            if finished < len(jobs):
+                yield StreamEvent("update", top, finished / len(jobs))
+    finally:
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+    store_result(request, top, version)
+    yield StreamEvent("final", top, 1.0)
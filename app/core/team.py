@@ -0,0 +1,190 @@
+"""Team PTO planner.
+
+Plans each member's trips in priority order so that on every day someone
+takes PTO, at least ``min_staffing`` members are still working. The
+occupancy is a (members x days) matrix kept as one int bitset per row:
+bit ``d`` of a member's row is set when day ``d`` is one of their
+workdays. Column sums give each day's staffing, and the days that cannot
+lose anyone else form a ``blocked`` bitset that each member's year plan
+avoids. Planning one member only touches the columns of their PTO days.
+
+Members share the country calendar, so calendars and search indexes are
+built once per work pattern. A member plans the same trips as an earlier
+one with the same pattern, limits and budget whenever the blocked days
+among their workdays are unchanged, so those plans are reused.
+"""
+import time
+from datetime import date
+
+from app.core import executor, metrics
+from app.core.holiday_archive import HolidaySpan
+from app.core.holidays import get_holidays_for_range
+from app.core.optimizer import build_calendar, materialize_options
+from app.core.planner import plan_trips
+from app.core.search import (
+    MAX_PTO_SPAN_DAYS,
+    MAX_WORKED_DAYS,
+    ClusterWindow,
+    SearchIndex,
+    set_days,
+)
+from app.models.schemas import Holiday, MemberPlan, TeamPlanRequest, VacationOption
+
+
+def day_bits(offsets) -> int:
+    """Bitset of day offsets."""
+    bits = 0
+    for d in offsets:
+        bits |= 1 << d
+    return bits
+
+
+def pto_days(index: SearchIndex, trips: list[ClusterWindow]) -> int:
+    """Bitset of the PTO days in a set of trips."""
+    return day_bits(
+        d for trip in trips for d in index.window(trip.first_workday, trip.pto_days, trip.worked_days)
+    )
+
+
+def plan_team(
+    indexes: list[SearchIndex],
+    members: list[tuple[int, int]],
+    min_staffing: int,
+    min_trip_days: int | None = None,
+    max_trip_days: int | None = None,
+    min_gap_days: int = 0,
+    deadline: float | None = None,
+) -> tuple[list[list[ClusterWindow]], int | None]:
+    """Trips for each ``(pattern, budget)`` member, and the lowest staffing on a PTO day.
+
+    ``pattern`` is the position of the member's work pattern in ``indexes``.
+    """
+    days = len(indexes[0].run_start)
+    rows = [day_bits(index.workdays) for index in indexes]
+
+    # Column sums of the matrix: rows with one pattern are equal, so add them up per pattern
+    staffed = [0] * days
+    for pattern, row in enumerate(rows):
+        count = sum(1 for p, _ in members if p == pattern)
+        for d in set_days(row):
+            staffed[d] += count
+    blocked = day_bits(d for d in range(days) if staffed[d] <= min_staffing)
+
+    plans: list[list[ClusterWindow]] = []
+    reuse: dict[tuple[int, int, int], tuple[list[ClusterWindow], int]] = {}
+    away = 0
+    for pattern, budget in members:
+        key = (pattern, budget, blocked & rows[pattern])
+        if key not in reuse:
+            index = indexes[pattern]
+            trips = plan_trips(
+                index, budget, min_trip_days, max_trip_days, min_gap_days, deadline, blocked
+            )
+            reuse[key] = (trips, pto_days(index, trips))
+        trips, taken = reuse[key]
+        plans.append(trips)
+        away |= taken
+        for d in set_days(taken):
+            staffed[d] -= 1
+            if staffed[d] <= min_staffing:
+                blocked |= 1 << d
+
+    lowest = min((staffed[d] for d in set_days(away)), default=None)
+    return plans, lowest
+
+
+def search_team_plan(
+    start_date: date,
+    end_date: date,
+    holidays: list[Holiday] | HolidaySpan,
+    members: list[tuple[list[int], int]],
+    min_staffing: int,
+    min_trip_days: int | None = None,
+    max_trip_days: int | None = None,
+    min_gap_days: int = 0,
+    time_budget: float | None = None,
+    max_span_days: int = MAX_PTO_SPAN_DAYS,
+    max_worked_days: int = MAX_WORKED_DAYS,
+) -> tuple[list[list[VacationOption]], int | None]:
+    """Build a calendar per work pattern and plan each ``(work_days, budget)`` member.
+
+    Like search_vacation_plan, this takes and returns only picklable values
+    so it can run in a worker process.
+    """
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    patterns: dict[tuple[int, ...], int] = {}
+    for work_days, _ in members:
+        patterns.setdefault(tuple(sorted(set(work_days))), len(patterns))
+
+    with metrics.span("build_calendar"):
+        calendars = [
+            build_calendar(start_date, end_date, list(work_days), holidays) for work_days in patterns
+        ]
+    if not calendars[0]:
+        return [[] for _ in members], None
+
+    with metrics.span("plan_search"):
+        indexes = [
+            SearchIndex(calendar.day_types, max_span_days, max_worked_days) for calendar in calendars
+        ]
+        plans, lowest = plan_team(
+            indexes,
+            [(patterns[tuple(sorted(set(work_days)))], budget) for work_days, budget in members],
+            min_staffing,
+            min_trip_days,
+            max_trip_days,
+            min_gap_days,
+            deadline,
+        )
+
+    with metrics.span("build_models"):
+        options: dict[tuple[int, int], list[VacationOption]] = {}
+        results = []
+        for (work_days, _), trips in zip(members, plans):
+            pattern = patterns[tuple(sorted(set(work_days)))]
+            # Members given the same plan share its models
+            key = (pattern, id(trips))
+            if key not in options:
+                options[key] = materialize_options(calendars[pattern], indexes[pattern], trips)
+            results.append(options[key])
+    return results, lowest
+
+
+async def plan_team_vacation(request: TeamPlanRequest) -> tuple[list[MemberPlan], int | None]:
+    """Plan every member's trips under the team's minimum staffing."""
+    with metrics.span("holidays"):
+        public_holidays = await get_holidays_for_range(
+            request.country.strip().upper(),
+            request.start_date,
+            request.end_date,
+            request.subdivision,
+            holiday_type="Public",
+        )
+
+    timeout = executor.get_timeout()
+    with metrics.span("executor"):
+        plans, lowest = await executor.run(
+            search_team_plan,
+            request.start_date,
+            request.end_date,
+            public_holidays,
+            [(member.work_days, member.pto_budget) for member in request.members],
+            request.min_staffing,
+            request.min_trip_days,
+            request.max_trip_days,
+            request.min_gap_days,
+            timeout,
+            request.max_span_days,
+            request.max_worked_days,
+            timeout=timeout,
+        )
+    members = [
+        MemberPlan.model_construct(
+            name=member.name,
+            trips=trips,
+            pto_days_used=sum(t.pto_days_used for t in trips),
+            total_days_off=sum(t.total_days_off for t in trips),
+        )
+        for member, trips in zip(request.members, plans)
+    ]
+    return members, lowest
@@ -1,28 +1,102 @@
+from contextlib import asynccontextmanager
+from datetime import date
+from pathlib import Path
+
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from app.api.routes import router
-from app.core.holidays import get_countries
+from app.config import get_settings
+from app.core import executor, metrics
+from app.core.executor import OptimizationTimeoutError
+from app.core.holiday_archive import HolidayArchive
+from app.core.holidays import (
+    CountryNotFoundError,
+    cached_countries,
+    close_archive,
+    close_client,
+    close_store,
+    create_client,
+    set_archive,
+    set_client,
+    set_store,
+    warm_up,
+)
+from app.core.result_store import ResultStore, close_result_store, set_result_store
+from app.core.store import HolidayStore
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared Nager.Date client, stores and worker pool for the app's lifetime.
+
+    Startup also preloads the country list and the configured countries'
+    holidays, so the first requests do not wait on the API.
+    """
+    settings = get_settings()
+    executor.configure(
+        settings.executor, settings.executor_workers, settings.optimize_timeout
+    )
+    metrics.configure(settings.metrics, settings.server_timing)
+    snapshot = settings.holiday_snapshot_path
+    has_snapshot = snapshot is not None and Path(snapshot).is_file()
+    if settings.holiday_store_path or has_snapshot:
+        store = HolidayStore(settings.holiday_store_path or ":memory:")
+        if has_snapshot:
+            store.load_snapshot(snapshot)
+        set_store(store)
+    archive = settings.holiday_archive_path
+    if archive is not None and Path(archive).is_file():
+        set_archive(HolidayArchive(archive))
+    if settings.result_store_path:
+        set_result_store(ResultStore(settings.result_store_path))
+
+    set_client(create_client())
+    year = date.today().year
+    await warm_up(settings.warm_countries, range(year, year + 2), settings.warm_up_timeout)
+    yield
+    executor.shutdown()
+    await close_store()
+    close_archive()
+    close_result_store()
+    await close_client()
+
 
 app = FastAPI(
     title="Vacation Time",
     description="Maximize your time off by finding optimal vacation periods around holidays",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+app.add_middleware(metrics.MetricsMiddleware)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(router)
 
 templates = Jinja2Templates(directory="app/templates")
 
 
+@app.exception_handler(CountryNotFoundError)
+async def country_not_found(request: Request, exc: CountryNotFoundError):
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+@app.exception_handler(OptimizationTimeoutError)
+async def optimization_timeout(request: Request, exc: OptimizationTimeoutError):
+    return JSONResponse(
+        status_code=504,
+        content={"detail": f"{exc}. Try a shorter date range or fewer PTO days."},
+    )
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
-    """Render the main page."""
-    countries = await get_countries()
+    """Render the main page, with the bundled country list if none is cached yet."""
+    countries = cached_countries()
     return templates.TemplateResponse(
+        request,
         "index.html",
-        {"request": request, "countries": countries},
+        {"countries": countries},
     )
@@ -1,6 +1,11 @@
 from datetime import date
+from typing import Annotated, Literal
+
 from pydantic import BaseModel, Field
 
+# Weekday number, 0=Monday to 6=Sunday
+Weekday = Annotated[int, Field(ge=0, le=6)]
+
 
 class Country(BaseModel):
     code: str
@@ -13,6 +18,9 @@ class Holiday(BaseModel):
     local_name: str | None = None
     country_code: str
     types: list[str] = Field(default_factory=list)
+    counties: list[str] | None = Field(
+        default=None, description="Subdivisions observing it; None if nationwide"
+    )
 
 
 class HolidayDetail(BaseModel):
@@ -21,21 +29,78 @@ class HolidayDetail(BaseModel):
     types: list[str]
 
 
-class OptimizeRequest(BaseModel):
+class SubdivisionList(BaseModel):
+    country: str
+    year: int
+    subdivisions: list[str]
+
+
+class SearchRangeRequest(BaseModel):
+    """Where and when to search: a country's holidays over a date range.
+
+    Requests list their mixins before this base, so its fields come first.
+    """
+
     country: str = Field(description="ISO 3166-1 alpha-2 country code")
-    pto_days: int = Field(ge=1, le=30, description="Number of PTO days available")
-    work_days: list[int] = Field(
-        default=[0, 1, 2, 3, 4],
-        description="Work days as weekday numbers (0=Monday, 6=Sunday)",
-    )
     start_date: date
     end_date: date
     subdivision: str | None = Field(
         default=None, description="Optional state/region code"
     )
+
+
+class WorkWeek(BaseModel):
+    work_days: list[Weekday] = Field(
+        default=[0, 1, 2, 3, 4],
+        description="Work days as weekday numbers (0=Monday, 6=Sunday)",
+    )
+
+
+class TripLimits(BaseModel):
+    min_trip_days: int | None = Field(default=None, ge=1, description="Shortest trip, in days off")
+    max_trip_days: int | None = Field(default=None, ge=1, description="Longest trip, in days off")
+    min_gap_days: int = Field(default=0, ge=0, description="Days back between trips")
+
+
+class GapPolicy(BaseModel):
+    max_span_days: int = Field(
+        default=14, ge=0, le=60, description="Most days from the first to the last PTO day of a vacation"
+    )
+    max_worked_days: int = Field(
+        default=0, ge=0, le=10, description="Workdays inside a vacation that may be worked instead of taken as PTO"
+    )
+
+
+class OptimizeRequest(GapPolicy, WorkWeek, SearchRangeRequest):
+    pto_days: int = Field(ge=1, le=30, description="Number of PTO days available")
     max_results: int = Field(default=10, ge=1, le=50)
 
 
+class PlanRequest(GapPolicy, TripLimits, WorkWeek, SearchRangeRequest):
+    pto_budget: int = Field(ge=1, le=60, description="Total PTO days to spread over the range")
+
+
+class TeamMember(WorkWeek):
+    name: str
+    pto_budget: int = Field(ge=1, le=60, description="Total PTO days to spread over the range")
+
+
+class TeamPlanRequest(GapPolicy, TripLimits, SearchRangeRequest):
+    members: list[TeamMember] = Field(
+        min_length=1, max_length=1000, description="Team members, in planning priority order"
+    )
+    min_staffing: int = Field(
+        ge=0, description="Fewest members who must be working on any day PTO is taken"
+    )
+
+
+class FrontierRequest(GapPolicy, WorkWeek, SearchRangeRequest):
+    pto_days: int = Field(ge=1, le=30, description="Most PTO days to spend on one vacation")
+    group_by: Literal["month", "season"] | None = Field(
+        default=None, description="Give a separate frontier for each month or season a vacation starts in"
+    )
+
+
 class VacationOption(BaseModel):
     pto_dates: list[date] = Field(description="Dates to take as PTO")
     pto_days_used: int
@@ -44,9 +109,83 @@ class VacationOption(BaseModel):
     start_date: date
     end_date: date
     holidays_included: list[HolidayDetail]
+    worked_dates: list[date] | None = Field(
+        default=None,
+        exclude_if=lambda dates: dates is None,
+        description="Workdays inside the vacation that are worked; left out when there are none",
+    )
 
 
 class OptimizeResponse(BaseModel):
     options: list[VacationOption]
     country: str
     search_range: tuple[date, date]
+
+
+class SweepResponse(BaseModel):
+    """The best options for every PTO budget from 1 to the requested maximum."""
+
+    options: list[VacationOption] = Field(description="Every distinct option, each listed once")
+    budgets: list[list[int]] = Field(
+        description="budgets[k - 1]: positions in options of the best options for k PTO days, best first"
+    )
+    country: str
+    search_range: tuple[date, date]
+
+
+class FrontierGroup(BaseModel):
+    label: str | None = Field(description='"2026-07", "2026-summer", or None when not grouped')
+    options: list[VacationOption] = Field(description="Pareto-efficient options, fewest PTO days first")
+
+
+class FrontierResponse(BaseModel):
+    groups: list[FrontierGroup]
+    country: str
+    search_range: tuple[date, date]
+
+
+class PlanResponse(BaseModel):
+    trips: list[VacationOption]
+    pto_days_used: int
+    total_days_off: int
+    country: str
+    search_range: tuple[date, date]
+
+
+class MemberPlan(BaseModel):
+    name: str
+    trips: list[VacationOption]
+    pto_days_used: int
+    total_days_off: int
+
+
+class TeamPlanResponse(BaseModel):
+    members: list[MemberPlan]
+    lowest_staffing: int | None = Field(
+        description="Fewest members working on a day someone takes PTO, if anyone does"
+    )
+    country: str
+    search_range: tuple[date, date]
+
+
+class BatchOptimizeRequest(BaseModel):
+    requests: list[OptimizeRequest] = Field(min_length=1, max_length=10000)
+
+
+class BatchOptimizeResult(BaseModel):
+    """One line of a batch response, matching the request at ``index``."""
+
+    index: int
+    country: str
+    search_range: tuple[date, date]
+    options: list[VacationOption] = Field(default_factory=list)
+    error: str | None = None
+
+
+class OptimizeStreamEvent(BaseModel):
+    """One event of a streamed optimization."""
+
+    event: str = Field(description='"update" while searching, then "final" or "error"')
+    progress: float = Field(description="Fraction of PTO budgets searched")
+    options: list[VacationOption] = Field(default_factory=list)
+    error: str | None = None
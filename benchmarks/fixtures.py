@@ -0,0 +1,102 @@
+"""Recorded Nager.Date responses that benchmarks run against offline.
+
+The fixture is a holiday snapshot (see app.core.store) holding the country
+list and every ``PublicHolidays/{year}/{country}`` response for the
+benchmarked countries and years. Re-record it from the live API with::
+
+    python -m benchmarks.fixtures --years 2026-2031 --countries US DE
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from app.core import holidays
+from app.core.holiday_archive import HolidayArchive, write_archive
+from app.core.store import HolidayStore, read_snapshot, write_snapshot
+from app.models.schemas import Holiday
+
+FIXTURE_PATH = Path(__file__).resolve().parent / "fixtures" / "holidays.json.gz"
+
+
+def fixture_entries(path: Path = FIXTURE_PATH) -> dict[str, object]:
+    return read_snapshot(path)["entries"]
+
+
+def public_holidays(country_code: str, years: range, path: Path = FIXTURE_PATH) -> list[Holiday]:
+    """Public holidays of a fixture country, as the optimizer receives them with no subdivision."""
+    entries = fixture_entries(path)
+    return [
+        holiday
+        for year in years
+        for holiday in holidays.HolidayIndex.from_payload(
+            entries[f"PublicHolidays/{year}/{country_code}"]  # type: ignore[arg-type]
+        ).select(holiday_type="Public")
+    ]
+
+
+def fixture_archive(path: Path = FIXTURE_PATH) -> HolidayArchive:
+    """The fixture compiled into a holiday archive in a temporary directory."""
+    archive_path = Path(tempfile.mkdtemp(prefix="vacation-time-bench-")) / "holidays.bin"
+    write_archive(archive_path, fixture_entries(path))
+    return HolidayArchive(archive_path)
+
+
+def _offline(request: httpx.Request) -> httpx.Response:
+    raise httpx.ConnectError(f"benchmarks run offline; {request.url} is not in the fixture")
+
+
+def offline_client() -> httpx.AsyncClient:
+    """A Nager.Date client that refuses every request."""
+    return holidays.create_client(httpx.MockTransport(_offline))
+
+
+def use_fixtures(path: Path = FIXTURE_PATH) -> None:
+    """Serve holiday lookups from the fixture and refuse any upstream request.
+
+    Entries are stored as freshly fetched so no background refresh starts.
+    """
+    store = HolidayStore()
+    store.put_many(fixture_entries(path), time.time())
+    holidays.set_store(store)
+    holidays.set_client(offline_client())
+
+
+async def record(countries: list[str], years: range) -> dict[str, object]:
+    client = holidays.get_client()
+    entries: dict[str, object] = {}
+    try:
+        paths = ["AvailableCountries"] + [
+            f"PublicHolidays/{year}/{country}" for country in countries for year in years
+        ]
+        for path in paths:
+            response = await client.get(f"{holidays.BASE_URL}/{path}")
+            response.raise_for_status()
+            entries[path] = response.json()
+    finally:
+        await holidays.close_client()
+    entries["AvailableCountries"] = [
+        c for c in entries["AvailableCountries"] if c["countryCode"] in countries  # type: ignore[union-attr]
+    ]
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record holiday fixtures for the benchmarks.")
+    parser.add_argument("--years", required=True, help="Year span, e.g. 2026-2031")
+    parser.add_argument("--countries", nargs="+", default=["US", "DE"])
+    parser.add_argument("--output", type=Path, default=FIXTURE_PATH)
+    args = parser.parse_args()
+
+    first, _, last = args.years.partition("-")
+    years = range(int(first), int(last or first) + 1)
+    entries = asyncio.run(record([c.upper() for c in args.countries], years))
+    write_snapshot(args.output, entries)
+    print(f"Wrote {len(entries)} entries to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Load test of the app against a stand-in Nager.Date server.
+
+The fake upstream is an ASGI app serving the recorded benchmark fixture,
+with configurable latency and a share of injected 503 errors. The real app
+runs in this process with its lifespan, its holiday client pointed at the
+fake, and settings read from the ``VACATION_TIME_*`` environment as usual.
+
+Requests are sent open-loop at a target rate: each one starts on schedule
+whether or not earlier ones have finished, and its latency is counted from
+that scheduled time, so a stalled server shows up as latency instead of a
+lower request rate. The mix covers ``/api/optimize`` and ``/results``, with
+cached (a few repeated queries) and uncached (every query new) requests
+over short (one month) and long (five year) ranges::
+
+    python -m benchmarks.load --rps 50 --duration 30 --upstream-latency 0.05
+
+The report is JSON with throughput, error rate and p50/p95/p99 latency for
+each endpoint and, within it, each kind of request. The driver shares the
+event loop with the app, so keep the search in the process pool (the
+default executor) when measuring.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.core import holidays
+from benchmarks.fixtures import FIXTURE_PATH, fixture_entries
+
+ENDPOINTS = ("/api/optimize", "/results")
+COUNTRIES = ("US", "DE")
+# Fixture years that every generated range stays within
+FIRST_YEAR, LAST_YEAR = 2026, 2031
+SHORT_RANGE_DAYS = 31
+LONG_RANGE_YEARS = 5
+CACHED_QUERIES = 4
+
+
+@dataclass
+class LoadConfig:
+    rps: float = 20.0
+    duration: float = 10.0
+    # Relative weight of each endpoint in the mix
+    mix: dict[str, float] = field(default_factory=lambda: {"/api/optimize": 3.0, "/results": 1.0})
+    cached_ratio: float = 0.7
+    long_ratio: float = 0.2
+    upstream_latency: float = 0.0
+    upstream_jitter: float = 0.0
+    upstream_error_rate: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    kind: str
+    seconds: float
+    ok: bool
+
+
+def fake_nager_app(
+    entries: dict[str, object],
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    rng: random.Random | None = None,
+) -> Starlette:
+    """An ASGI stand-in for the Nager.Date API serving recorded entries.
+
+    Each response waits ``latency`` plus up to ``jitter`` seconds, and a
+    share ``error_rate`` of them is a 503. Paths not in the entries are 404s.
+    """
+    rng = rng or random.Random()
+    prefix = httpx.URL(holidays.BASE_URL).path.strip("/")
+
+    async def serve(request: Request) -> Response:
+        delay = latency + rng.uniform(0, jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if rng.random() < error_rate:
+            return JSONResponse({"detail": "injected error"}, status_code=503)
+        path = request.path_params["path"]
+        if not path.startswith(prefix + "/") or path[len(prefix) + 1 :] not in entries:
+            return JSONResponse({"detail": "not found"}, status_code=404)
+        return JSONResponse(entries[path[len(prefix) + 1 :]])
+
+    return Starlette(routes=[Route("/{path:path}", serve)])
+
+
+def _query(rng: random.Random, long: bool, cached: bool) -> dict[str, object]:
+    """An optimize query; cached ones come from a small pool, the rest are new."""
+    if cached:
+        rng = random.Random(rng.randrange(CACHED_QUERIES))
+    first = date(FIRST_YEAR, 1, 1)
+    if long:
+        start = first + timedelta(days=rng.randrange(365))
+        end = start.replace(year=start.year + LONG_RANGE_YEARS) - timedelta(days=1)
+    else:
+        latest = date(LAST_YEAR, 12, 31) - timedelta(days=SHORT_RANGE_DAYS - 1)
+        start = first + timedelta(days=rng.randrange((latest - first).days + 1))
+        end = start + timedelta(days=SHORT_RANGE_DAYS - 1)
+    return {
+        "country": rng.choice(COUNTRIES),
+        "pto_days": rng.randint(1, 30),
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "max_results": rng.randint(1, 50),
+    }
+
+
+def _send(client: httpx.AsyncClient, endpoint: str, query: dict[str, object]):
+    if endpoint == "/results":
+        return client.post(endpoint, data=query)
+    return client.post(endpoint, json=query)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def _summary(samples: list[Sample], elapsed: float) -> dict[str, object]:
+    latencies = sorted(s.seconds for s in samples)
+    errors = sum(not s.ok for s in samples)
+    summary: dict[str, object] = {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            name: round(value * 1000, 3)
+            for name, value in [
+                ("p50", percentile(latencies, 50)),
+                ("p95", percentile(latencies, 95)),
+                ("p99", percentile(latencies, 99)),
+                ("max", latencies[-1]),
+            ]
+        }
+    return summary
+
+
+def report(samples: list[Sample], elapsed: float, config: LoadConfig) -> dict[str, object]:
+    """Totals plus per-endpoint and per-kind summaries."""
+    endpoints = {}
+    for endpoint in sorted({s.endpoint for s in samples}):
+        mine = [s for s in samples if s.endpoint == endpoint]
+        endpoints[endpoint] = _summary(mine, elapsed)
+        endpoints[endpoint]["kinds"] = {
+            kind: _summary([s for s in mine if s.kind == kind], elapsed)
+            for kind in sorted({s.kind for s in mine})
+        }
+    return {
+        "config": asdict(config),
+        "elapsed_seconds": round(elapsed, 3),
+        "total": _summary(samples, elapsed),
+        "endpoints": endpoints,
+    }
+
+
+async def drive(client: httpx.AsyncClient, config: LoadConfig) -> tuple[list[Sample], float]:
+    """Send the request mix at ``config.rps`` for ``config.duration`` seconds."""
+    rng = random.Random(config.seed)
+    endpoints = list(config.mix)
+    weights = [config.mix[e] for e in endpoints]
+
+    async def one(scheduled: float, endpoint: str, kind: str, query: dict[str, object]) -> Sample:
+        try:
+            response = await _send(client, endpoint, query)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        return Sample(endpoint, kind, time.perf_counter() - scheduled, ok)
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(config.rps * config.duration)):
+        scheduled = start + i / config.rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint = rng.choices(endpoints, weights)[0]
+        cached = rng.random() < config.cached_ratio
+        long = rng.random() < config.long_ratio
+        kind = f"{'cached' if cached else 'uncached'}-{'long' if long else 'short'}"
+        tasks.append(asyncio.create_task(one(scheduled, endpoint, kind, _query(rng, long, cached))))
+    samples = await asyncio.gather(*tasks)
+    return list(samples), time.perf_counter() - start
+
+
+async def run_load(config: LoadConfig, fixture: Path = FIXTURE_PATH) -> dict[str, object]:
+    """Start the app against the fake upstream, drive it and report."""
+    from app import main
+
+    upstream = fake_nager_app(
+        fixture_entries(fixture),
+        config.upstream_latency,
+        config.upstream_jitter,
+        config.upstream_error_rate,
+        random.Random(config.seed),
+    )
+    create_client: Callable[[], httpx.AsyncClient] = main.create_client
+    main.create_client = lambda: holidays.create_client(httpx.ASGITransport(app=upstream))
+    try:
+        async with main.lifespan(main.app):
+            # Server errors come back as 500 responses instead of raising here
+            transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+                samples, elapsed = await drive(client, config)
+    finally:
+        main.create_client = create_client
+    return report(samples, elapsed, config)
+
+
+def _mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        endpoint, _, weight = part.partition("=")
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {endpoint!r}; use {', '.join(ENDPOINTS)}")
+        mix[endpoint] = float(weight or 1)
+    return mix
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test the app against a fake Nager.Date server.")
+    parser.add_argument("--rps", type=float, default=LoadConfig.rps, help="Requests started per second")
+    parser.add_argument("--duration", type=float, default=LoadConfig.duration, help="Seconds to send for")
+    parser.add_argument(
+        "--mix", type=_mix, default=None, help="Endpoint weights, e.g. /api/optimize=3,/results=1"
+    )
+    parser.add_argument("--cached-ratio", type=float, default=LoadConfig.cached_ratio)
+    parser.add_argument("--long-ratio", type=float, default=LoadConfig.long_ratio)
+    parser.add_argument("--upstream-latency", type=float, default=0.0, help="Seconds per upstream response")
+    parser.add_argument("--upstream-jitter", type=float, default=0.0, help="Extra random seconds, up to this")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0, help="Share of upstream 503s")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", type=Path, help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    config = LoadConfig(
+        rps=args.rps,
+        duration=args.duration,
+        cached_ratio=args.cached_ratio,
+        long_ratio=args.long_ratio,
+        upstream_latency=args.upstream_latency,
+        upstream_jitter=args.upstream_jitter,
+        upstream_error_rate=args.upstream_error_rate,
+        seed=args.seed,
+    )
+    if args.mix:
+        config.mix = args.mix
+    result = json.dumps(asyncio.run(run_load(config)), indent=2)
+    if args.output:
+        args.output.write_text(result)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""Offline benchmark suite for the optimizer and holiday pipeline.
+
+Sweeps range length, PTO days, work-day patterns and holiday density over
+the calendar build, the cluster search, optimize_vacation, ICS export and
+HTTP round-trips through the ASGI app, with holidays served from recorded
+fixtures. The ``startup`` group times fresh processes (see
+benchmarks.startup). Results are written as JSON; ``--compare`` checks them against a
+saved baseline and exits non-zero on regressions::
+
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import timeit
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+from app.core import executor, holidays
+from app.core.calendar_gen import generate_ics, generate_multi_ics
+from app.core.optimizer import (
+    build_calendar,
+    find_vacation_clusters,
+    materialize_options,
+    optimize_vacation,
+)
+from app.core.result_cache import clear_result_cache
+from app.core.result_store import get_result_store
+from app.core.search import SearchIndex
+from app.core.serialization import clear_dumps, optimize_response_json
+from app.models.schemas import Holiday, OptimizeRequest, OptimizeResponse, VacationOption
+from benchmarks.fixtures import fixture_archive, public_holidays, use_fixtures
+
+START = date(2026, 1, 1)
+RANGES = {"1m": 31, "3m": 91, "1y": 365, "2y": 730, "5y": 1826}
+PTO_DAYS = [1, 5, 10, 20, 30]
+PATTERNS = {
+    "mon-fri": [0, 1, 2, 3, 4],
+    "sun-thu": [6, 0, 1, 2, 3],
+    "mon-thu": [0, 1, 2, 3],
+    "mon-sat": [0, 1, 2, 3, 4, 5],
+}
+DENSITIES = ["none", "national", "dense"]
+DENSE_EXTRA_PER_YEAR = 30
+
+# A run fails --compare if any median is this many times the baseline's
+DEFAULT_THRESHOLD = 1.25
+
+
+@dataclass
+class Benchmark:
+    group: str
+    params: dict[str, object]
+    fn: Callable[[], object]
+    items: int | None = None  # items handled per call, to report a per-item median
+
+    @property
+    def name(self) -> str:
+        args = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.group}[{args}]"
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    params: dict[str, object]
+    loops: int
+    min: float  # seconds per call
+    median: float
+    samples: list[float] = field(default_factory=list)
+    per_item: float | None = None  # median / items
+
+
+def end_date(range_name: str) -> date:
+    return START + timedelta(days=RANGES[range_name] - 1)
+
+
+def holidays_for(density: str, end: date) -> list[Holiday]:
+    """Holidays at a density: none, the US fixture, or the fixture plus extra workday holidays."""
+    if density == "none":
+        return []
+    national = public_holidays("US", range(START.year, end.year + 1))
+    national = [h for h in national if START <= h.date <= end]
+    if density == "national":
+        return national
+
+    rng = random.Random(0)
+    days = (end - START).days + 1
+    count = DENSE_EXTRA_PER_YEAR * days // 365
+    offsets = rng.sample(range(days), min(count, days))
+    extra = [
+        Holiday(date=START + timedelta(days=o), name=f"Extra {o}", country_code="US", types=["Public"])
+        for o in offsets
+    ]
+    return sorted(national + extra, key=lambda h: h.date)
+
+
+def calendar_benchmarks(quick: bool) -> Iterator[Benchmark]:
+    archive = fixture_archive()
+    for range_name in RANGES:
+        end = end_date(range_name)
+        for density in ["national"] if quick else DENSITIES:
+            hols = holidays_for(density, end)
+            yield Benchmark(
+                "build_calendar",
+                {"range": range_name, "density": density},
+                lambda end=end, hols=hols: build_calendar(START, end, PATTERNS["mon-fri"], hols),
+            )
+        if end.year <= archive.years.stop - 1:
+            span = archive.span("US", START, end)
+            yield Benchmark(
+                "build_calendar",
+                {"range": range_name, "density": "national", "source": "archive"},
+                lambda end=end, span=span: build_calendar(START, end, PATTERNS["mon-fri"], span),
+            )
+
+
+def search_benchmarks(quick: bool) -> Iterator[Benchmark]:
+    def bench(range_name: str, pto: int, pattern: str, density: str) -> Benchmark:
+        end = end_date(range_name)
+        calendar = build_calendar(START, end, PATTERNS[pattern], holidays_for(density, end))
+        return Benchmark(
+            "find_vacation_clusters",
+            {"range": range_name, "pto": pto, "pattern": pattern, "density": density},
+            lambda: find_vacation_clusters(calendar, pto),
+        )
+
+    ranges = ["1m", "1y", "5y"] if quick else list(RANGES)
+    ptos = [1, 10, 30] if quick else PTO_DAYS
+    for range_name in ranges:
+        for pto in ptos:
+            yield bench(range_name, pto, "mon-fri", "national")
+    for pattern in PATTERNS:
+        if pattern != "mon-fri":
+            yield bench("1y", 10, pattern, "national")
+    for density in DENSITIES:
+        if density != "national":
+            yield bench("1y", 10, "mon-fri", density)
+
+    # Every budget up to 30: one sweep against a search per budget
+    end = end_date("1y")
+    index = SearchIndex(
+        build_calendar(START, end, PATTERNS["mon-fri"], holidays_for("national", end)).day_types
+    )
+    yield Benchmark("all_budgets", {"range": "1y", "pto": 30, "mode": "sweep"}, lambda: index.sweep(30, 10))
+    yield Benchmark(
+        "all_budgets",
+        {"range": "1y", "pto": 30, "mode": "per_budget"},
+        lambda: [index.top(k, 10) for k in range(1, 31)],
+    )
+
+    # Wider gap policies: longer spans and worked days inside a vacation
+    calendar = build_calendar(START, end, PATTERNS["mon-fri"], holidays_for("national", end))
+    for span, worked in [(14, 0), (28, 0), (14, 2), (28, 5)]:
+        yield Benchmark(
+            "gap_policy",
+            {"range": "1y", "pto": 10, "max_span_days": span, "max_worked_days": worked},
+            lambda span=span, worked=worked: SearchIndex(calendar.day_types, span, worked).top(10, 10),
+        )
+
+
+def optimize_benchmarks(quick: bool, run: Callable) -> Iterator[Benchmark]:
+    for range_name in ["1y", "5y"] if quick else ["1m", "1y", "2y", "5y"]:
+        for pto in [10, 30] if quick else [5, 10, 30]:
+            request = OptimizeRequest(
+                country="US", pto_days=pto, start_date=START, end_date=end_date(range_name)
+            )
+            yield Benchmark(
+                "optimize_vacation",
+                {"range": range_name, "pto": pto},
+                lambda request=request: run(optimize_vacation(request)),
+            )
+
+    def cold_lookup(end: date) -> object:
+        # Every lookup misses the in-process cache and reads the fixture store
+        holidays._cache.clear()
+        return run(holidays.get_holidays_for_range("DE", START, end, "BY", "Public"))
+
+    archive = fixture_archive()
+
+    def archive_lookup(end: date) -> object:
+        holidays.set_archive(archive)
+        try:
+            return run(holidays.get_holidays_for_range("DE", START, end, "BY", "Public"))
+        finally:
+            holidays.set_archive(None)
+
+    for range_name in ["1y", "5y"]:
+        yield Benchmark(
+            "get_holidays_for_range",
+            {"range": range_name, "cache": "cold"},
+            lambda end=end_date(range_name): cold_lookup(end),
+        )
+        yield Benchmark(
+            "get_holidays_for_range",
+            {"range": range_name, "cache": "archive"},
+            lambda end=end_date(range_name): archive_lookup(end),
+        )
+
+
+def ics_benchmarks(quick: bool) -> Iterator[Benchmark]:
+    end = end_date("5y")
+    calendar = build_calendar(START, end, PATTERNS["mon-fri"], holidays_for("national", end))
+    options = find_vacation_clusters(calendar, 10)
+    best = max(options, key=lambda o: o.total_days_off)
+    yield Benchmark("generate_ics", {"pto": best.pto_days_used}, lambda: generate_ics(best))
+    for count in [10, 50] if quick else [10, 50, 500]:
+        chosen = options[:count]
+        yield Benchmark(
+            "generate_multi_ics", {"options": count}, lambda chosen=chosen: generate_multi_ics(chosen)
+        )
+
+
+def serialize_benchmarks(quick: bool, run: Callable) -> Iterator[Benchmark]:
+    """Writing an optimize response: through response_model as before, dumped, or reused."""
+    from fastapi.routing import serialize_response
+
+    from app.api.routes import router
+
+    route = next(r for r in router.routes if getattr(r, "path", None) == "/api/optimize")
+    end = end_date("5y")
+    calendar = build_calendar(START, end, PATTERNS["mon-fri"], holidays_for("national", end))
+    index = SearchIndex(calendar.day_types)
+
+    def response_model(options: list[VacationOption]) -> object:
+        response = OptimizeResponse(options=options, country="US", search_range=(START, end))
+        return run(
+            serialize_response(field=route.response_field, response_content=response, dump_json=True)
+        )
+
+    def dump(options: list[VacationOption]) -> bytes:
+        clear_dumps()
+        return optimize_response_json(options, "US", START, end)
+
+    def reuse(options: list[VacationOption]) -> bytes:
+        return optimize_response_json(options, "US", START, end)
+
+    for count in [50] if quick else [10, 50, 500]:
+        options = materialize_options(calendar, index, index.top(10, count, None))
+        for path, fn in [("response_model", response_model), ("dump", dump), ("reuse", reuse)]:
+            yield Benchmark(
+                "serialize_response",
+                {"options": len(options), "path": path},
+                lambda fn=fn, options=options: fn(options),
+                items=len(options),
+            )
+
+
+def http_benchmarks(quick: bool, run: Callable, client: httpx.AsyncClient) -> Iterator[Benchmark]:
+    for range_name in ["1y"] if quick else ["1y", "5y"]:
+        payload = {
+            "country": "US",
+            "pto_days": 10,
+            "start_date": START.isoformat(),
+            "end_date": end_date(range_name).isoformat(),
+        }
+
+        def optimize(payload: dict = payload, cold: bool = True) -> object:
+            if cold:
+                clear_result_cache()
+            response = run(client.post("/api/optimize", json=payload))
+            response.raise_for_status()
+            return response
+
+        yield Benchmark("http_optimize", {"range": range_name, "result_cache": "cold"}, optimize)
+        yield Benchmark(
+            "http_optimize",
+            {"range": range_name, "result_cache": "warm"},
+            lambda payload=payload: optimize(payload, cold=False),
+        )
+
+    end = end_date("1y")
+    calendar = build_calendar(START, end, PATTERNS["mon-fri"], holidays_for("national", end))
+    result_id = get_result_store().save(find_vacation_clusters(calendar, 10)[:50])
+
+    def download(path: str) -> object:
+        response = run(client.get(path))
+        response.raise_for_status()
+        return response
+
+    yield Benchmark("http_ics", {"export": "single"}, lambda: download(f"/api/ics/{result_id}/0"))
+    yield Benchmark("http_ics", {"export": "all"}, lambda: download(f"/api/ics/{result_id}"))
+
+
+def startup_benchmarks(quick: bool) -> Iterator[Benchmark]:
+    def fresh_process(*args: str) -> object:
+        return subprocess.run([sys.executable, *args], check=True, capture_output=True)
+
+    yield Benchmark("startup", {"phase": "import"}, lambda: fresh_process("-c", "import app.main"))
+    yield Benchmark(
+        "startup",
+        {"phase": "first_request"},
+        lambda: fresh_process("-m", "benchmarks.startup", "--executor", "inline"),
+    )
+
+
+def measure(benchmark: Benchmark, repeat: int) -> Result:
+    timer = timeit.Timer(benchmark.fn)
+    loops, _ = timer.autorange()
+    samples = [t / loops for t in timer.repeat(repeat, loops)]
+    return Result(
+        name=benchmark.name,
+        group=benchmark.group,
+        params=benchmark.params,
+        loops=loops,
+        min=min(samples),
+        median=statistics.median(samples),
+        samples=samples,
+        per_item=statistics.median(samples) / benchmark.items if benchmark.items else None,
+    )
+
+
+def run_suite(quick: bool = False, only: str | None = None, repeat: int = 5) -> dict:
+    """Run every benchmark whose name contains ``only`` and return the report."""
+    from app.main import app
+
+    loop = asyncio.new_event_loop()
+    executor.configure("inline")
+    use_fixtures()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    try:
+        benchmarks = [
+            *calendar_benchmarks(quick),
+            *search_benchmarks(quick),
+            *optimize_benchmarks(quick, loop.run_until_complete),
+            *ics_benchmarks(quick),
+            *serialize_benchmarks(quick, loop.run_until_complete),
+            *http_benchmarks(quick, loop.run_until_complete, client),
+            *startup_benchmarks(quick),
+        ]
+        results = []
+        for benchmark in benchmarks:
+            if only and only not in benchmark.name:
+                continue
+            result = measure(benchmark, repeat)
+            per_item = f" ({result.per_item * 1e6:.2f} us/item)" if result.per_item else ""
+            print(f"{result.name}: {result.median * 1e3:.3f} ms{per_item}", file=sys.stderr)
+            results.append(result)
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.run_until_complete(holidays.close_store())
+        loop.run_until_complete(holidays.close_client())
+        loop.close()
+        executor.shutdown()
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": [r.__dict__ for r in results],
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """Median ratios against a baseline report, for benchmarks present in both."""
+    before = {r["name"]: r for r in baseline["results"]}
+    rows = []
+    for result in report["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        ratio = result["median"] / old["median"]
+        rows.append(
+            {
+                "name": result["name"],
+                "baseline": old["median"],
+                "current": result["median"],
+                "ratio": ratio,
+                "regressed": ratio > threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help="Run a smaller sweep")
+    parser.add_argument("--filter", dest="only", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing samples per benchmark")
+    parser.add_argument("--output", "-o", type=Path, help="Write the JSON report here (default stdout)")
+    parser.add_argument("--compare", type=Path, help="Baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.quick, args.only, args.repeat)
+    if args.compare:
+        rows = compare(report, json.loads(args.compare.read_text()), args.threshold)
+        report["comparison"] = {"baseline": str(args.compare), "threshold": args.threshold, "rows": rows}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        regressed = [row for row in report["comparison"]["rows"] if row["regressed"]]
+        for row in regressed:
+            print(f"REGRESSION {row['name']}: {row['ratio']:.2f}x baseline", file=sys.stderr)
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
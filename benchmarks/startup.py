@@ -0,0 +1,75 @@
+"""Cold-start timings of one fresh process.
+
+Times importing the app, the lifespan startup (with the warm-up served from
+the benchmark fixture) and the first requests, and prints them as JSON::
+
+    python -m benchmarks.startup --warm-countries US,DE
+
+``benchmarks.run`` runs this in subprocesses for its ``startup`` group.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+OPTIMIZE_PAYLOAD = {
+    "country": "US",
+    "pto_days": 10,
+    "start_date": "2026-01-01",
+    "end_date": "2026-12-31",
+}
+
+
+async def _start_and_serve(timings: dict[str, float]) -> None:
+    import httpx
+
+    from app import main
+    from benchmarks.fixtures import offline_client, use_fixtures
+
+    use_fixtures()
+    main.create_client = offline_client  # the lifespan must not go online
+
+    start = time.perf_counter()
+    async with main.lifespan(main.app):
+        timings["lifespan"] = time.perf_counter() - start
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            (await client.get("/")).raise_for_status()
+            timings["first_home"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            (await client.post("/api/optimize", json=OPTIMIZE_PAYLOAD)).raise_for_status()
+            timings["first_optimize"] = time.perf_counter() - start
+
+
+def measure(warm_countries: str = "US,DE", executor_mode: str = "process") -> dict[str, object]:
+    """Seconds spent in each startup phase; run in a process that has not imported the app."""
+    # Settings are read from the environment by the lifespan
+    os.environ["VACATION_TIME_WARM_COUNTRIES"] = warm_countries
+    os.environ["VACATION_TIME_EXECUTOR"] = executor_mode
+    os.environ["VACATION_TIME_HOLIDAY_SNAPSHOT"] = ""
+
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+    import app.main  # noqa: F401
+
+    timings["import"] = time.perf_counter() - start
+    export_loaded = "app.core.calendar_gen" in sys.modules
+    asyncio.run(_start_and_serve(timings))
+    return {"seconds": timings, "export_modules_imported_at_startup": export_loaded}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Time the cold start of one process.")
+    parser.add_argument("--warm-countries", default="US,DE", help="Comma-separated country codes")
+    parser.add_argument("--executor", default="process", choices=["process", "thread", "inline"])
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.warm_countries, args.executor), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from datetime import date
+
+import pytest
+import respx
+from httpx import Response
+
+from app.core import executor, holidays, metrics
+from app.core.result_cache import clear_result_cache
+from app.core.result_store import close_result_store
+from app.models.schemas import HolidayDetail, OptimizeRequest, VacationOption
+
+US_2026 = [
+    {"date": "2026-05-25", "name": "Memorial Day", "countryCode": "US", "types": ["Public"]},
+    {"date": "2026-09-07", "name": "Labor Day", "countryCode": "US", "types": ["Public"]},
+]
+
+
+def make_request(**overrides) -> OptimizeRequest:
+    fields = {
+        "country": "US",
+        "pto_days": 5,
+        "start_date": date(2026, 1, 1),
+        "end_date": date(2026, 12, 31),
+    }
+    fields.update(overrides)
+    return OptimizeRequest(**fields)
+
+
+def make_option(day: int = 2, holiday_name: str = "Independence Day") -> VacationOption:
+    return VacationOption(
+        start_date=date(2026, 7, day),
+        end_date=date(2026, 7, day + 4),
+        pto_days_used=2,
+        total_days_off=5,
+        pto_dates=[date(2026, 7, day), date(2026, 7, day + 1)],
+        holidays_included=[HolidayDetail(date=date(2026, 7, 4), name=holiday_name, types=["Public"])],
+        efficiency_ratio=2.5,
+    )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+async def reset_holiday_state():
+    """Give every test empty caches, no store, a fresh upstream client and inline search."""
+    executor.configure("inline")
+    holidays._cache.clear()
+    clear_result_cache()
+    yield
+    await holidays.close_store()
+    holidays.close_archive()
+    await holidays.close_client()
+    executor.shutdown()
+    close_result_store()
+    metrics.configure(False)
+    metrics.reset()
+
+
+@pytest.fixture
+def upstream():
+    """Nager.Date with US public holidays for 2026 and no country ZZ."""
+    with respx.mock:
+        routes = {
+            "US": respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(
+                return_value=Response(200, json=US_2026)
+            ),
+            "ZZ": respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/ZZ").mock(
+                return_value=Response(404)
+            ),
+        }
+        yield routes
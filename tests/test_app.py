@@ -0,0 +1,168 @@
+import httpx
+import pytest
+import respx
+from httpx import Response
+
+from app import main
+from app.config import Settings
+from app.core import executor, holidays
+from app.core.holiday_archive import write_archive
+from app.core.store import write_snapshot
+from app.main import app, lifespan
+
+
+class TestLifespan:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_opens_and_closes_shared_client(self):
+        respx.get(f"{holidays.BASE_URL}/AvailableCountries").mock(return_value=Response(200, json=[]))
+
+        async with lifespan(app):
+            client = holidays.get_client()
+            assert not client.is_closed
+
+        assert client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_loads_snapshot_for_offline_start(self, tmp_path, monkeypatch):
+        snapshot = tmp_path / "snapshot.json.gz"
+        write_snapshot(snapshot, {"AvailableCountries": [{"countryCode": "NO", "name": "Norway"}]})
+        monkeypatch.setattr(
+            main, "get_settings", lambda: Settings(holiday_snapshot_path=str(snapshot))
+        )
+
+        def offline(request: httpx.Request) -> Response:
+            raise httpx.ConnectError("offline", request=request)
+
+        async with lifespan(app):
+            holidays.set_client(holidays.create_client(httpx.MockTransport(offline)))
+            countries = await holidays.get_countries()
+
+        assert [c.code for c in countries] == ["NO"]
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_warms_up_configured_countries(self, monkeypatch):
+        monkeypatch.setattr(
+            main,
+            "get_settings",
+            lambda: Settings(holiday_snapshot_path=None, warm_countries=("NO",)),
+        )
+        respx.get(f"{holidays.BASE_URL}/AvailableCountries").mock(
+            return_value=Response(200, json=[{"countryCode": "NO", "name": "Norway"}])
+        )
+        lookups = respx.get(url__regex=rf"{holidays.BASE_URL}/PublicHolidays/\d+/NO").mock(
+            return_value=Response(200, json=[])
+        )
+
+        async with lifespan(app):
+            assert [c.code for c in holidays.cached_countries()] == ["NO"]
+
+        assert lookups.call_count == 2
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_maps_holiday_archive(self, tmp_path, monkeypatch):
+        archive = tmp_path / "holidays.bin"
+        write_archive(archive, {"PublicHolidays/2026/NO": []})
+        monkeypatch.setattr(
+            main,
+            "get_settings",
+            lambda: Settings(holiday_snapshot_path=None, holiday_archive_path=str(archive)),
+        )
+        respx.get(f"{holidays.BASE_URL}/AvailableCountries").mock(return_value=Response(200, json=[]))
+
+        async with lifespan(app):
+            assert holidays.data_version("NO", range(2026, 2027)) is not None
+
+        assert holidays.data_version("NO", range(2026, 2027)) is None
+
+
+class TestHome:
+    @pytest.mark.asyncio
+    async def test_renders_bundled_countries_without_upstream(self):
+        def offline(request: httpx.Request) -> Response:
+            raise httpx.ConnectError("offline", request=request)
+
+        holidays.set_client(holidays.create_client(httpx.MockTransport(offline)))
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/")
+
+        assert response.status_code == 200
+        assert '<option value="DE">Germany</option>' in response.text
+
+
+class TestErrors:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_unknown_country_returns_404(self):
+        respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/ZZ").mock(return_value=Response(404))
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/optimize",
+                json={
+                    "country": "ZZ",
+                    "pto_days": 3,
+                    "start_date": "2026-01-01",
+                    "end_date": "2026-03-31",
+                },
+            )
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Unknown country code: ZZ"}
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_optimization_timeout_returns_504(self):
+        respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(
+            return_value=Response(200, json=[])
+        )
+        executor.configure("inline", timeout=1e-9)
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/optimize",
+                json={
+                    "country": "US",
+                    "pto_days": 30,
+                    "start_date": "2026-01-01",
+                    "end_date": "2026-12-31",
+                },
+            )
+
+        assert response.status_code == 504
+
+
+class TestSubdivisions:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_lists_subdivisions(self):
+        respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/DE").mock(
+            return_value=Response(
+                200,
+                json=[
+                    {
+                        "date": "2026-01-06",
+                        "name": "Epiphany",
+                        "countryCode": "DE",
+                        "counties": ["DE-BW", "DE-BY"],
+                        "types": ["Public"],
+                    }
+                ],
+            )
+        )
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/countries/de/subdivisions", params={"year": 2026})
+
+        assert response.json() == {
+            "country": "DE",
+            "year": 2026,
+            "subdivisions": ["DE-BW", "DE-BY"],
+        }
@@ -0,0 +1,112 @@
+import json
+import time
+
+import httpx
+import pytest
+
+from app.core import batch, executor
+from app.core.batch import optimize_batch
+from app.core.holidays import CountryNotFoundError
+from app.core.optimizer import optimize_vacation
+from app.main import app
+from tests.conftest import make_request
+
+
+class TestOptimizeBatch:
+    @pytest.mark.asyncio
+    async def test_shares_calendar_within_group(self, upstream, monkeypatch):
+        calls = []
+        original = batch.search_vacation_batch
+
+        def counting(*args):
+            calls.append(args[4])
+            return original(*args)
+
+        monkeypatch.setattr(batch, "search_vacation_batch", counting)
+        requests = [
+            make_request(pto_days=3),
+            make_request(pto_days=5),
+            make_request(pto_days=3),
+            make_request(pto_days=3, work_days=[0, 1, 2, 3]),
+        ]
+
+        results = [r async for r in optimize_batch(requests)]
+
+        assert [i for i, _ in results] == [0, 1, 2, 3]
+        assert upstream["US"].call_count == 1
+        assert calls == [[(3, 10), (5, 10)], [(3, 10)]]
+
+    @pytest.mark.asyncio
+    async def test_splits_large_groups_into_jobs(self, upstream, monkeypatch):
+        calls = []
+        original = batch.search_vacation_batch
+
+        def counting(*args):
+            calls.append(args[4])
+            return original(*args)
+
+        monkeypatch.setattr(batch, "search_vacation_batch", counting)
+        requests = [make_request(pto_days=p) for p in range(1, batch.SEARCHES_PER_JOB + 3)]
+
+        results = [r async for _, r in optimize_batch(requests)]
+
+        assert [len(searches) for searches in calls] == [batch.SEARCHES_PER_JOB, 2]
+        assert results == [await optimize_vacation(r) for r in requests]
+
+    @pytest.mark.asyncio
+    async def test_matches_single_requests(self, upstream):
+        requests = [make_request(pto_days=p, max_results=m) for p, m in [(1, 5), (4, 20), (10, 3)]]
+
+        results = [r async for _, r in optimize_batch(requests)]
+
+        assert results == [await optimize_vacation(r) for r in requests]
+
+    @pytest.mark.asyncio
+    async def test_queued_jobs_do_not_time_out(self, upstream, monkeypatch):
+        # Eight 0.1 s jobs on one worker: together they outlast the deadline
+        executor.configure("thread", workers=1, timeout=0.5)
+
+        def slow(*args):
+            time.sleep(0.1)
+            return [[] for _ in args[4]]
+
+        monkeypatch.setattr(batch, "search_vacation_batch", slow)
+        requests = [make_request(max_span_days=span) for span in range(1, 9)]
+
+        results = [r async for _, r in optimize_batch(requests)]
+
+        assert results == [[]] * len(requests)
+
+    @pytest.mark.asyncio
+    async def test_reports_errors_per_request(self, upstream):
+        requests = [make_request(), make_request(country="ZZ"), make_request(pto_days=2)]
+
+        results = [r async for _, r in optimize_batch(requests)]
+
+        assert isinstance(results[1], CountryNotFoundError)
+        assert len(results[0]) == 10
+        assert len(results[2]) == 10
+
+
+class TestBatchEndpoint:
+    @pytest.mark.asyncio
+    async def test_streams_ndjson_in_input_order(self, upstream):
+        payload = {
+            "requests": [
+                {"country": "US", "pto_days": 2, "start_date": "2026-01-01", "end_date": "2026-12-31"},
+                {"country": "ZZ", "pto_days": 2, "start_date": "2026-01-01", "end_date": "2026-12-31"},
+                {"country": "us", "pto_days": 4, "start_date": "2026-05-01", "end_date": "2026-06-30"},
+            ]
+        }
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/optimize/batch", json=payload)
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["index"] for line in lines] == [0, 1, 2]
+        assert lines[0]["error"] is None and len(lines[0]["options"]) == 10
+        assert lines[1]["error"] == "Unknown country code: ZZ"
+        assert lines[2]["country"] == "us"
+        assert lines[2]["options"][0]["start_date"] >= "2026-05-01"
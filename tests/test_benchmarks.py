@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.core import holidays
+from benchmarks import load, run
+from benchmarks.fixtures import public_holidays
+
+
+def report(**medians: float) -> dict:
+    return {"results": [{"name": name, "median": median} for name, median in medians.items()]}
+
+
+def test_fixture_holidays():
+    holidays = public_holidays("US", range(2026, 2027))
+
+    assert "Independence Day" in [h.name for h in holidays]
+    assert all(h.date.year == 2026 for h in holidays)
+
+
+def test_compare_flags_regressions():
+    rows = run.compare(report(a=2.0, b=1.0, new=1.0), report(a=1.0, b=1.0, gone=1.0), threshold=1.5)
+
+    assert [(r["name"], r["ratio"], r["regressed"]) for r in rows] == [
+        ("a", 2.0, True),
+        ("b", 1.0, False),
+    ]
+
+
+def test_runs_offline_and_compares(tmp_path, capsys):
+    output = tmp_path / "bench.json"
+
+    status = run.main(["--quick", "--filter", "http_ics[export=single]", "--repeat", "1", "-o", str(output)])
+    first = json.loads(output.read_text())
+    status_again = run.main(
+        ["--quick", "--filter", "generate_ics", "--repeat", "1", "--compare", str(output), "--threshold", "1000"]
+    )
+
+    assert status == status_again == 0
+    assert [r["name"] for r in first["results"]] == ["http_ics[export=single]"]
+    assert first["results"][0]["median"] > 0
+    again = json.loads(capsys.readouterr().out)
+    assert again["comparison"]["rows"] == []
+
+
+def test_startup_runs_offline_without_export_modules():
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--executor", "inline"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    report = json.loads(result.stdout)
+    assert set(report["seconds"]) == {"import", "lifespan", "first_home", "first_optimize"}
+    assert report["export_modules_imported_at_startup"] is False
+
+
+@pytest.mark.asyncio
+async def test_fake_upstream_serves_fixture_and_injects_errors():
+    entries = {"AvailableCountries": [{"countryCode": "US", "name": "United States"}]}
+
+    async def get(path: str, error_rate: float) -> httpx.Response:
+        transport = httpx.ASGITransport(app=load.fake_nager_app(entries, error_rate=error_rate))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.get(f"{holidays.BASE_URL}/{path}")
+
+    assert (await get("AvailableCountries", 0)).json() == entries["AvailableCountries"]
+    assert (await get("PublicHolidays/2026/XX", 0)).status_code == 404
+    assert (await get("AvailableCountries", 1)).status_code == 503
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert [load.percentile(values, p) for p in (50, 95, 99)] == [50.0, 95.0, 99.0]
+    assert load.percentile([7.0], 99) == 7.0
+
+
+def test_load_reports_each_endpoint():
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.load", "--rps", "40", "--duration", "0.5"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "VACATION_TIME_EXECUTOR": "inline"},
+    )
+
+    report = json.loads(result.stdout)
+    assert report["total"]["requests"] == 20
+    assert set(report["endpoints"]) <= {"/api/optimize", "/results"}
+    for endpoint in report["endpoints"].values():
+        assert endpoint["error_rate"] == 0
+        assert set(endpoint["latency_ms"]) == {"p50", "p95", "p99", "max"}
@@ -0,0 +1,103 @@
+from datetime import date
+
+from icalendar import Calendar
+
+from app.core.calendar_gen import (
+    MAX_LINE_OCTETS,
+    escape_text,
+    fold_line,
+    generate_ics,
+    generate_multi_ics,
+    iter_multi_ics,
+)
+from app.models.schemas import VacationOption
+from tests.conftest import make_option
+
+
+def unfolded_lines(content: bytes) -> list[bytes]:
+    return content.replace(b"\r\n ", b"").split(b"\r\n")
+
+
+class TestWriter:
+    def test_escapes_text(self):
+        assert escape_text("a,b;c\\d\ne") == r"a\,b\;c\\d\ne"
+
+    def test_folds_long_lines_without_splitting_characters(self):
+        line = "DESCRIPTION:" + "Fête nationale, " * 20
+
+        folded = fold_line(line)
+
+        physical = folded.split(b"\r\n")[:-1]
+        assert all(len(p) <= MAX_LINE_OCTETS for p in physical)
+        assert all(p.startswith(b" ") for p in physical[1:])
+        assert folded.replace(b"\r\n ", b"").decode() == line + "\r\n"
+
+    def test_short_lines_are_not_folded(self):
+        assert fold_line("BEGIN:VEVENT") == b"BEGIN:VEVENT\r\n"
+
+    def test_output_is_deterministic(self):
+        assert generate_ics(make_option()) == generate_ics(make_option())
+        assert generate_multi_ics([make_option(), make_option(9)]) == generate_multi_ics(
+            [make_option(), make_option(9)]
+        )
+
+    def test_streams_one_chunk_per_component(self):
+        chunks = list(iter_multi_ics([make_option(), make_option(9)]))
+
+        assert len(chunks) == 4
+        assert b"".join(chunks) == generate_multi_ics([make_option(), make_option(9)])
+
+
+class TestParsedOutput:
+    def test_single_option_round_trips(self):
+        option = make_option(holiday_name="Day; of, the \\ \"Nation\"\nobserved " * 4)
+
+        content = generate_ics(option)
+        calendar = Calendar.from_ical(content)
+
+        assert all(len(line) <= MAX_LINE_OCTETS for line in content.split(b"\r\n"))
+        assert str(calendar["X-WR-CALNAME"]) == "Vacation Time - PTO Plan"
+        vacation, *pto_days = calendar.walk("VEVENT")
+        assert vacation.decoded("dtstart") == option.start_date
+        assert vacation.decoded("dtend") == date(2026, 7, 7)
+        assert str(vacation["description"]).endswith(f"Holidays: {option.holidays_included[0].name}")
+        assert [e.decoded("dtstart") for e in pto_days] == option.pto_dates
+        assert len({str(e["uid"]) for e in calendar.walk("VEVENT")}) == 3
+        assert all("dtstamp" in e for e in calendar.walk("VEVENT"))
+
+    def test_multi_option_round_trips(self):
+        options = [make_option(day) for day in (1, 8, 15)]
+
+        calendar = Calendar.from_ical(generate_multi_ics(options))
+
+        events = calendar.walk("VEVENT")
+        assert [str(e["summary"]) for e in events] == [
+            f"Vacation Option {i}: 5 days off" for i in (1, 2, 3)
+        ]
+        assert [e.decoded("dtstart") for e in events] == [o.start_date for o in options]
+        assert "PTO dates: 2026-07-08, 2026-07-09" in str(events[1]["description"])
+        assert all("dtstamp" in e for e in events)
+
+    def test_uid_follows_content(self):
+        first = Calendar.from_ical(generate_multi_ics([make_option(1), make_option(8)]))
+        reordered = Calendar.from_ical(generate_multi_ics([make_option(8), make_option(1)]))
+
+        uids = [str(e["uid"]) for e in first.walk("VEVENT")]
+        assert [str(e["uid"]) for e in reordered.walk("VEVENT")] == uids[::-1]
+
+    def test_options_sharing_a_pto_day_get_distinct_uids(self):
+        first, second = make_option(2), make_option(1)
+
+        def pto_uids(option: VacationOption) -> dict[date, str]:
+            _, *pto_days = Calendar.from_ical(generate_ics(option)).walk("VEVENT")
+            return {e.decoded("dtstart"): str(e["uid"]) for e in pto_days}
+
+        assert pto_uids(first)[date(2026, 7, 2)] != pto_uids(second)[date(2026, 7, 2)]
+        assert pto_uids(first) == pto_uids(make_option(2))
+
+    def test_every_line_is_crlf_terminated(self):
+        content = generate_ics(make_option())
+
+        assert content.endswith(b"END:VCALENDAR\r\n")
+        assert b"\n" not in content.replace(b"\r\n", b"")
+        assert unfolded_lines(content)[0] == b"BEGIN:VCALENDAR"
@@ -0,0 +1,66 @@
+import time
+from datetime import date
+
+import pytest
+
+from app.core import executor
+from app.core.executor import OptimizationTimeoutError
+from app.core.optimizer import search_vacation_options
+from app.core.search import SearchTimeout
+from app.models.schemas import Holiday
+
+HOLIDAYS = [
+    Holiday(date=date(2026, 7, 3), name="Independence Day", country_code="US", types=["Public"])
+]
+ARGS = (date(2026, 1, 1), date(2026, 12, 31), [0, 1, 2, 3, 4], HOLIDAYS, 5, 10)
+
+
+class TestRun:
+    @pytest.mark.asyncio
+    async def test_inline(self):
+        executor.configure("inline")
+
+        assert await executor.run(sum, [1, 2, 3]) == 6
+
+    @pytest.mark.asyncio
+    async def test_thread_pool(self):
+        executor.configure("thread", workers=2)
+
+        assert await executor.run(search_vacation_options, *ARGS) == search_vacation_options(*ARGS)
+
+    @pytest.mark.asyncio
+    async def test_process_pool(self):
+        executor.configure("process", workers=1)
+
+        assert await executor.run(search_vacation_options, *ARGS) == search_vacation_options(*ARGS)
+
+    @pytest.mark.asyncio
+    async def test_times_out(self):
+        executor.configure("thread", workers=1)
+
+        with pytest.raises(OptimizationTimeoutError):
+            await executor.run(time.sleep, 0.5, timeout=0.01)
+
+    def test_workers(self):
+        executor.configure("thread", workers=3)
+        assert executor.get_workers() == 3
+
+        executor.configure("inline")
+        assert executor.get_workers() == 1
+
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            executor.configure("gpu")
+
+
+class TestSearchDeadline:
+    def test_search_stops_at_deadline(self):
+        with pytest.raises(SearchTimeout):
+            search_vacation_options(*ARGS, time_budget=-1)
+
+    @pytest.mark.asyncio
+    async def test_deadline_surfaces_as_timeout_error(self):
+        executor.configure("inline")
+
+        with pytest.raises(OptimizationTimeoutError):
+            await executor.run(search_vacation_options, *ARGS, -1, timeout=0)
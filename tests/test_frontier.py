@@ -0,0 +1,99 @@
+import random
+from datetime import date, timedelta
+
+import httpx
+import pytest
+import respx
+from httpx import Response
+
+from app.core import holidays
+from app.core.frontier import group_labels, pareto_frontier, search_vacation_frontier
+from app.core.optimizer import build_calendar
+from app.core.planner import candidate_trips
+from app.core.search import SearchIndex
+from app.main import app
+from app.models.schemas import FrontierResponse, Holiday
+
+START = date(2026, 1, 1)
+
+
+def random_calendar(seed: int):
+    rng = random.Random(seed)
+    holidays = [
+        Holiday(date=START + timedelta(days=o), name=f"Holiday {o}", country_code="XX", types=["Public"])
+        for o in rng.sample(range(365), rng.randrange(0, 20))
+    ]
+    return build_calendar(START, date(2026, 12, 31), [0, 1, 2, 3, 4], holidays)
+
+
+def brute_force(windows) -> list[tuple[int, int]]:
+    points = {(w.pto_days, w.total_days_off) for w in windows}
+    return sorted(
+        (k, total)
+        for k, total in points
+        if not any(k2 <= k and t2 >= total and (k2, t2) != (k, total) for k2, t2 in points)
+    )
+
+
+class TestParetoFrontier:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_brute_force(self, seed):
+        index = SearchIndex(random_calendar(seed).day_types)
+
+        (frontier,) = pareto_frontier(index, 10)
+
+        assert [(w.pto_days, w.total_days_off) for w in frontier] == brute_force(
+            candidate_trips(index, 10)
+        )
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_groups_by_start_month(self, seed):
+        calendar = random_calendar(seed)
+        index = SearchIndex(calendar.day_types)
+        labels, groups = group_labels(START, len(calendar), "month")
+
+        frontiers = pareto_frontier(index, 8, groups, len(labels))
+
+        assert len(labels) == 12
+        for month, frontier in enumerate(frontiers, 1):
+            in_month = [
+                w for w in candidate_trips(index, 8) if calendar.date_at(w.cluster_start).month == month
+            ]
+            assert [(w.pto_days, w.total_days_off) for w in frontier] == brute_force(in_month)
+
+    def test_season_labels(self):
+        labels, groups = group_labels(date(2026, 11, 30), 95, "season")
+
+        assert labels == ["2026-autumn", "2027-winter", "2027-spring"]
+        assert groups[0] == 0 and groups[1] == 1 and groups[-1] == 2
+
+
+class TestSearchVacationFrontier:
+    def test_every_option_beats_those_using_less_pto(self):
+        groups = search_vacation_frontier(START, date(2026, 12, 31), [0, 1, 2, 3, 4], [], 10)
+
+        ((label, options),) = groups
+        assert label is None
+        points = [(o.pto_days_used, o.total_days_off) for o in options]
+        assert points[0] == (1, 3)
+        assert points == sorted(points) and len({total for _, total in points}) == len(points)
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_endpoint(self):
+        respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(return_value=Response(200, json=[]))
+        payload = {
+            "country": "US",
+            "pto_days": 5,
+            "start_date": "2026-06-01",
+            "end_date": "2026-08-31",
+            "group_by": "month",
+        }
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/optimize/frontier", json=payload)
+
+        frontier = FrontierResponse.model_validate_json(response.content)
+        assert [g.label for g in frontier.groups] == ["2026-06", "2026-07", "2026-08"]
+        assert all(g.options for g in frontier.groups)
@@ -0,0 +1,157 @@
+import pickle
+from datetime import date
+
+import pytest
+
+from app.core import holidays
+from app.core.holiday_archive import (
+    ArchiveFormatError,
+    HolidayArchive,
+    HolidaySpan,
+    write_archive,
+)
+from app.core.optimizer import build_calendar
+from app.core.search import HOLIDAY
+from benchmarks.fixtures import fixture_entries, public_holidays
+
+ENTRIES = {
+    "AvailableCountries": [{"countryCode": "DE", "name": "Germany"}],
+    "PublicHolidays/2026/DE": [
+        {"date": "2026-01-01", "name": "Neujahr", "countryCode": "DE", "types": ["Public"]},
+        {
+            "date": "2026-01-06",
+            "name": "Heilige Drei Könige",
+            "countryCode": "DE",
+            "counties": ["DE-BW", "DE-BY"],
+            "types": ["Public"],
+        },
+        {"date": "2026-02-14", "name": "Valentinstag", "countryCode": "DE", "types": ["Observance"]},
+        {"date": "2026-12-31", "name": "Silvester", "countryCode": "DE", "types": ["Public"]},
+    ],
+    "PublicHolidays/2027/DE": [
+        {"date": "2027-01-01", "name": "Neujahr", "countryCode": "DE", "types": ["Public"]},
+    ],
+}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "holidays.bin"
+    write_archive(path, ENTRIES)
+    archive = HolidayArchive(path)
+    yield archive
+    archive.close()
+
+
+def names(span: HolidaySpan | None) -> list[tuple[date, str]]:
+    assert span is not None
+    return [(h.date, h.name) for h in span]
+
+
+class TestArchive:
+    def test_country_has_all_public_holidays(self, archive):
+        span = archive.span("DE", date(2026, 1, 1), date(2027, 1, 31))
+
+        assert names(span) == [
+            (date(2026, 1, 1), "Neujahr"),
+            (date(2026, 1, 6), "Heilige Drei Könige"),
+            (date(2026, 12, 31), "Silvester"),
+            (date(2027, 1, 1), "Neujahr"),
+        ]
+
+    def test_subdivision_includes_national_holidays(self, archive):
+        span = archive.span("DE", date(2026, 1, 1), date(2026, 1, 31), "DE-BY")
+
+        assert names(span) == [(date(2026, 1, 1), "Neujahr"), (date(2026, 1, 6), "Heilige Drei Könige")]
+
+    def test_subdivision_without_own_holidays_gets_national_ones(self, archive):
+        span = archive.span("DE", date(2026, 1, 1), date(2026, 1, 31), "DE-BE")
+
+        assert names(span) == [(date(2026, 1, 1), "Neujahr")]
+
+    def test_subdivision_of_another_country_gets_national_ones(self, tmp_path):
+        path = tmp_path / "holidays.bin"
+        us_2026 = [
+            {
+                "date": "2026-03-31",
+                "name": "César Chávez Day",
+                "countryCode": "US",
+                "counties": ["US-CA"],
+                "types": ["Public"],
+            }
+        ]
+        write_archive(path, {**ENTRIES, "PublicHolidays/2026/US": us_2026})
+        archive = HolidayArchive(path)
+
+        span = archive.span("DE", date(2026, 1, 1), date(2027, 1, 31), "US-CA")
+        archive.close()
+
+        assert names(span) == [
+            (date(2026, 1, 1), "Neujahr"),
+            (date(2026, 12, 31), "Silvester"),
+            (date(2027, 1, 1), "Neujahr"),
+        ]
+
+    def test_uncompiled_years_and_countries_are_not_covered(self, archive):
+        assert archive.span("DE", date(2026, 1, 1), date(2028, 1, 1)) is None
+        assert archive.span("US", date(2026, 1, 1), date(2026, 12, 31)) is None
+        assert archive.covers("DE", range(2026, 2028))
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "not-an-archive.bin"
+        path.write_bytes(b"\0" * 64)
+
+        with pytest.raises(ArchiveFormatError):
+            HolidayArchive(path)
+
+    def test_matches_fixture_holidays(self, tmp_path):
+        path = tmp_path / "fixture.bin"
+        write_archive(path, fixture_entries())
+        archive = HolidayArchive(path)
+
+        span = archive.span("US", date(2026, 1, 1), date(2027, 12, 31))
+        expected = public_holidays("US", range(2026, 2028))
+        archive.close()
+
+        assert names(span) == [(h.date, h.name) for h in expected]
+
+
+class TestSpan:
+    def test_fills_calendar_like_a_holiday_list(self, archive):
+        start, end = date(2025, 12, 20), date(2026, 1, 10)
+        span = archive.span("DE", date(2026, 1, 1), end, "DE-BW")
+
+        from_bits = build_calendar(start, end, [0, 1, 2, 3, 4], span)
+        from_list = build_calendar(start, end, [0, 1, 2, 3, 4], list(span))
+
+        assert from_bits.day_types == from_list.day_types
+        assert from_bits.day_types.count(HOLIDAY) == 2
+        assert {o: h.name for o, h in from_bits.holidays.items()} == {
+            o: h.name for o, h in from_list.holidays.items()
+        }
+
+    def test_pickles_without_materialized_holidays(self, archive):
+        span = archive.span("DE", date(2026, 1, 1), date(2026, 12, 31))
+        list(span)
+
+        copy = pickle.loads(pickle.dumps(span))
+
+        assert copy._holidays is None
+        assert names(copy) == names(span)
+
+
+class TestLookups:
+    @pytest.mark.asyncio
+    async def test_range_lookups_use_the_archive(self, archive):
+        holidays.set_archive(archive)
+        before = holidays.fetch_stats().archive_hits
+
+        result = await holidays.get_holidays_for_range(
+            "de", date(2026, 1, 1), date(2026, 1, 31), "BY", holiday_type="Public"
+        )
+
+        assert isinstance(result, HolidaySpan)
+        assert [h.name for h in result] == ["Neujahr", "Heilige Drei Könige"]
+        assert holidays.fetch_stats().archive_hits == before + 1
+        assert holidays.data_version("DE", range(2026, 2027)) == (-archive.version,)
+        assert holidays.data_version("US", range(2026, 2027)) is None
@@ -1,16 +1,35 @@
+import asyncio
 from datetime import date
 
+import httpx
 import pytest
 import respx
 from httpx import Response
 
+from app.core import holidays
 from app.core.holidays import (
     BASE_URL,
+    MISSING,
+    CountryNotFoundError,
     HolidayCache,
+    HolidayIndex,
+    bundled_countries,
+    cached_countries,
+    close_client,
+    create_client,
+    fetch_stats,
+    get_client,
     get_countries,
     get_holidays,
     get_holidays_for_range,
+    normalize_subdivision,
+    set_client,
+    set_store,
+    wait_for_refreshes,
+    warm_up,
 )
+from app.core.store import HolidayStore
+from tests.conftest import FakeClock
 
 
 class TestHolidayCache:
@@ -47,6 +66,85 @@ class TestGetCountries:
         assert countries[0].name == "United States"
 
 
+class TestColdStart:
+    def test_bundled_countries(self):
+        codes = {c.code for c in bundled_countries()}
+
+        assert {"US", "DE", "GB", "JP"} <= codes
+
+    @pytest.mark.asyncio
+    async def test_cached_countries_falls_back_to_bundled_list(self):
+        set_client(
+            create_client(
+                httpx.MockTransport(
+                    lambda request: Response(200, json=[{"countryCode": "NO", "name": "Norway"}])
+                )
+            )
+        )
+
+        assert cached_countries() == bundled_countries()
+        await wait_for_refreshes()
+        assert [c.code for c in cached_countries()] == ["NO"]
+
+    @pytest.mark.asyncio
+    async def test_cold_home_page_hits_share_one_country_load(self):
+        requests = []
+
+        def respond(request):
+            requests.append(request)
+            return Response(200, json=[{"countryCode": "NO", "name": "Norway"}])
+
+        set_client(create_client(httpx.MockTransport(respond)))
+
+        for _ in range(5):
+            cached_countries()
+        assert len(holidays._background) == 1
+        await wait_for_refreshes()
+
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_warm_up_loads_countries_and_holidays(self):
+        paths = []
+
+        def handler(request: httpx.Request) -> Response:
+            paths.append(request.url.path.removeprefix("/api/v3/"))
+            if request.url.path.endswith("AvailableCountries"):
+                return Response(200, json=[{"countryCode": "US", "name": "United States"}])
+            if "/DE" in request.url.path:
+                return Response(500)
+            return Response(200, json=[])
+
+        set_client(create_client(httpx.MockTransport(handler)))
+
+        await warm_up(["US", "DE"], range(2026, 2028), timeout=None)
+
+        assert sorted(paths) == [
+            "AvailableCountries",
+            "PublicHolidays/2026/DE",
+            "PublicHolidays/2026/US",
+            "PublicHolidays/2027/DE",
+            "PublicHolidays/2027/US",
+        ]
+        assert [c.code for c in cached_countries()] == ["US"]
+
+    @pytest.mark.asyncio
+    async def test_warm_up_timeout_leaves_loading_in_background(self):
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> Response:
+            await release.wait()
+            return Response(200, json=[{"countryCode": "US", "name": "United States"}])
+
+        set_client(create_client(httpx.MockTransport(handler)))
+
+        await warm_up([], range(2026, 2027), timeout=0.01)
+        release.set()
+        await wait_for_refreshes()
+
+        assert [c.code for c in cached_countries()] == ["US"]
+
+
 class TestGetHolidays:
     @respx.mock
     @pytest.mark.asyncio
@@ -152,3 +250,278 @@ class TestGetHolidaysForRange:
 
         assert len(holidays) == 1
         assert holidays[0].name == "New Year's Day"
+
+
+class TestClient:
+    @pytest.mark.asyncio
+    async def test_uses_injected_transport(self):
+        def handler(request: httpx.Request) -> Response:
+            assert request.url.path == "/api/v3/AvailableCountries"
+            return Response(200, json=[{"countryCode": "FR", "name": "France"}])
+
+        set_client(create_client(httpx.MockTransport(handler)))
+
+        countries = await get_countries()
+
+        assert [c.code for c in countries] == ["FR"]
+
+    @pytest.mark.asyncio
+    async def test_reuses_shared_client(self):
+        assert get_client() is get_client()
+
+    @pytest.mark.asyncio
+    async def test_close_client_releases_connections(self):
+        client = get_client()
+
+        await close_client()
+
+        assert client.is_closed
+        assert get_client() is not client
+
+
+class TestConcurrentFetching:
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_requests_for_same_year(self):
+        requests = 0
+
+        async def handler(request: httpx.Request) -> Response:
+            nonlocal requests
+            requests += 1
+            await asyncio.sleep(0.01)
+            return Response(
+                200,
+                json=[{"date": "2026-01-01", "name": "New Year's Day", "countryCode": "US"}],
+            )
+
+        set_client(create_client(httpx.MockTransport(handler)))
+        before = fetch_stats()
+
+        results = await asyncio.gather(
+            *(get_holidays("US", 2026, sub) for sub in [None, None, "US-CA", "US-NY"])
+        )
+
+        after = fetch_stats()
+        assert requests == 1
+        assert all(len(r) == 1 for r in results)
+        assert after.misses - before.misses == 1
+        assert after.coalesced - before.coalesced == 3
+
+    @pytest.mark.asyncio
+    async def test_fetches_years_concurrently(self):
+        in_flight = 0
+        peak = 0
+
+        async def handler(request: httpx.Request) -> Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return Response(200, json=[])
+
+        set_client(create_client(httpx.MockTransport(handler)))
+
+        await get_holidays_for_range("US", date(2025, 1, 1), date(2027, 12, 31))
+
+        assert peak == 3
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_counts_cache_hits(self):
+        respx.get(f"{BASE_URL}/PublicHolidays/2026/US").mock(
+            return_value=Response(
+                200,
+                json=[{"date": "2026-01-01", "name": "New Year's Day", "countryCode": "US"}],
+            )
+        )
+        await get_holidays("US", 2026)
+        before = fetch_stats()
+
+        await get_holidays("US", 2026)
+
+        assert fetch_stats().hits - before.hits == 1
+
+
+class TestPersistentStore:
+    @pytest.mark.asyncio
+    async def test_serves_stored_data_without_network(self):
+        def handler(request: httpx.Request) -> Response:
+            raise httpx.ConnectError("offline", request=request)
+
+        store = HolidayStore()
+        store.put(
+            "PublicHolidays/2026/US",
+            [{"date": "2026-01-01", "name": "New Year's Day", "countryCode": "US"}],
+        )
+        set_store(store)
+        set_client(create_client(httpx.MockTransport(handler)))
+
+        holidays = await get_holidays("US", 2026)
+
+        assert [h.name for h in holidays] == ["New Year's Day"]
+
+    @pytest.mark.asyncio
+    async def test_refreshes_stale_entries_in_background(self):
+        requests = 0
+
+        def handler(request: httpx.Request) -> Response:
+            nonlocal requests
+            requests += 1
+            return Response(200, json=[{"countryCode": "US", "name": "United States"}])
+
+        store = HolidayStore()
+        store.put("AvailableCountries", [{"countryCode": "CA", "name": "Canada"}], fetched_at=0.0)
+        set_store(store)
+        set_client(create_client(httpx.MockTransport(handler)))
+
+        countries = await get_countries()
+        await wait_for_refreshes()
+
+        assert [c.code for c in countries] == ["CA"]
+        assert requests == 1
+        assert store.get("AvailableCountries")[1] == [
+            {"countryCode": "US", "name": "United States"}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_persists_upstream_responses(self):
+        def handler(request: httpx.Request) -> Response:
+            return Response(200, json=[])
+
+        store = HolidayStore()
+        set_store(store)
+        set_client(create_client(httpx.MockTransport(handler)))
+
+        await get_holidays("DE", 2026)
+
+        assert store.get("PublicHolidays/2026/DE")[1] == []
+
+
+class TestBoundedCache:
+    def test_evicts_least_recently_used(self):
+        cache = HolidayCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats().evictions == 1
+
+    def test_expires_on_monotonic_clock(self):
+        clock = FakeClock()
+        cache = HolidayCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=100)
+
+        clock.now = 50
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.stats().expirations == 1
+
+    def test_distinguishes_empty_results_from_misses(self):
+        cache = HolidayCache()
+        cache.set("empty", [])
+
+        assert cache.get("empty", MISSING) == []
+        assert cache.get("absent", MISSING) is MISSING
+
+    def test_reports_stats(self):
+        cache = HolidayCache(maxsize=5)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+
+        stats = cache.stats()
+
+        assert (stats.hits, stats.misses, stats.size, stats.maxsize) == (1, 1, 1, 5)
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_caches_empty_holiday_lists(self):
+        route = respx.get(f"{BASE_URL}/PublicHolidays/2026/SJ").mock(
+            return_value=Response(200, json=[])
+        )
+
+        await get_holidays("SJ", 2026)
+        await get_holidays("SJ", 2026)
+
+        assert route.call_count == 1
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_negatively_caches_unknown_countries(self):
+        route = respx.get(f"{BASE_URL}/PublicHolidays/2026/ZZ").mock(
+            return_value=Response(404)
+        )
+
+        for _ in range(2):
+            with pytest.raises(CountryNotFoundError):
+                await get_holidays("ZZ", 2026)
+
+        assert route.call_count == 1
+
+
+REGIONAL_PAYLOAD = [
+    {"date": "2026-01-01", "name": "New Year's Day", "countryCode": "US", "types": ["Public"]},
+    {
+        "date": "2026-03-31",
+        "name": "César Chávez Day",
+        "countryCode": "US",
+        "counties": ["US-CA", "US-TX"],
+        "types": ["Observance"],
+    },
+    {
+        "date": "2026-04-20",
+        "name": "Patriots' Day",
+        "countryCode": "US",
+        "counties": ["US-MA"],
+        "types": ["Public"],
+    },
+]
+
+
+class TestHolidayIndex:
+    def test_selects_by_subdivision_and_type(self):
+        index = HolidayIndex.from_payload(REGIONAL_PAYLOAD)
+
+        assert [h.name for h in index.select()] == [
+            "New Year's Day",
+            "César Chávez Day",
+            "Patriots' Day",
+        ]
+        assert [h.name for h in index.select("US-MA")] == ["New Year's Day", "Patriots' Day"]
+        assert [h.name for h in index.select("US-CA", "Public")] == ["New Year's Day"]
+        assert [h.name for h in index.select("US-NY")] == ["New Year's Day"]
+
+    def test_memoizes_views(self):
+        index = HolidayIndex.from_payload(REGIONAL_PAYLOAD)
+
+        assert index.select("US-CA") is index.select("US-CA")
+
+    def test_lists_subdivisions(self):
+        index = HolidayIndex.from_payload(REGIONAL_PAYLOAD)
+
+        assert index.subdivisions() == ["US-CA", "US-MA", "US-TX"]
+
+    def test_normalizes_bare_subdivision_codes(self):
+        assert normalize_subdivision("US", "ca") == "US-CA"
+        assert normalize_subdivision("US", "US-CA") == "US-CA"
+        assert normalize_subdivision("US", "") is None
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_fetches_once_for_every_subdivision(self):
+        route = respx.get(f"{BASE_URL}/PublicHolidays/2026/US").mock(
+            return_value=Response(200, json=REGIONAL_PAYLOAD)
+        )
+
+        ma = await get_holidays("US", 2026, "MA")
+        ca = await get_holidays("US", 2026, "US-CA", holiday_type="Public")
+
+        assert route.call_count == 1
+        assert [h.name for h in ma] == ["New Year's Day", "Patriots' Day"]
+        assert [h.name for h in ca] == ["New Year's Day"]
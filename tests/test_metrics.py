@@ -0,0 +1,131 @@
+import httpx
+import pytest
+
+from app.core import executor, metrics
+from app.main import app
+
+PAYLOAD = {"country": "US", "pto_days": 5, "start_date": "2026-01-01", "end_date": "2026-12-31"}
+
+
+async def post_optimize() -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/api/optimize", json=PAYLOAD)
+
+
+async def scrape() -> str:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return response.text
+
+
+def sample(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class TestHistogram:
+    def test_renders_cumulative_buckets(self):
+        histogram = metrics.Histogram("h", "Help.", ("stage",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(5, "a")
+
+        assert list(histogram.render()) == [
+            "# HELP h Help.",
+            "# TYPE h histogram",
+            'h_bucket{stage="a",le="0.1"} 1',
+            'h_bucket{stage="a",le="1.0"} 2',
+            'h_bucket{stage="a",le="+Inf"} 3',
+            'h_sum{stage="a"} 5.550000',
+            'h_count{stage="a"} 3',
+        ]
+
+
+class TestSpans:
+    def test_disabled_span_is_a_shared_no_op(self):
+        assert metrics.span("a") is metrics.span("b")
+
+        with metrics.span("a"):
+            pass
+
+        assert "vacation_time_stage_seconds_bucket" not in metrics.render()
+
+    def test_executor_returns_spans_from_where_fn_ran(self):
+        metrics.configure(True)
+
+        def work():
+            with metrics.span("inner"):
+                return 42
+
+        result, spans = metrics.call_collecting(work, ())
+
+        assert result == 42
+        assert [stage for stage, _ in spans] == ["inner"]
+
+    def test_server_timing_adds_up_repeated_stages(self):
+        value = metrics.server_timing([("search", 0.001), ("render", 0.002), ("search", 0.003)])
+
+        assert value == "search;dur=4.00, render;dur=2.00"
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_stages_upstream_and_caches(self, upstream):
+        metrics.configure(True)
+        executor.configure("thread")
+
+        before = await scrape()
+        await post_optimize()
+        text = await scrape()
+
+        for stage in (
+            "holidays",
+            "executor",
+            "build_calendar",
+            "search_index",
+            "cluster_search",
+            "build_models",
+        ):
+            assert f'vacation_time_stage_seconds_count{{stage="{stage}"}} 1' in text
+        assert 'vacation_time_upstream_request_seconds_count{endpoint="PublicHolidays",status="200"} 1' in text
+        assert (
+            'vacation_time_request_seconds_count{method="POST",route="/api/optimize",status="200"} 1'
+            in text
+        )
+        for series in (
+            'vacation_time_cache_misses_total{cache="holidays"}',
+            'vacation_time_holiday_lookups_total{source="upstream"}',
+        ):
+            assert sample(text, series) == sample(before, series) + 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_records_no_latencies(self, upstream):
+        series = 'vacation_time_cache_misses_total{cache="holidays"}'
+        before = await scrape()
+        await post_optimize()
+        text = await scrape()
+
+        assert "vacation_time_stage_seconds_count" not in text
+        assert sample(text, series) == sample(before, series) + 1
+
+    @pytest.mark.asyncio
+    async def test_server_timing_header(self, upstream):
+        metrics.configure(True, server_timing=True)
+
+        response = await post_optimize()
+
+        stages = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+        assert {"holidays", "upstream", "cluster_search", "total"} <= set(stages)
+
+    @pytest.mark.asyncio
+    async def test_no_server_timing_by_default(self, upstream):
+        metrics.configure(True)
+
+        response = await post_optimize()
+
+        assert "server-timing" not in response.headers
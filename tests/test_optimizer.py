@@ -1,14 +1,19 @@
 from datetime import date
 
 import pytest
+import respx
+from httpx import Response
 
+from app.core.holidays import BASE_URL
 from app.core.optimizer import (
+    CompactCalendar,
     DayType,
     build_calendar,
     expand_cluster,
     find_vacation_clusters,
+    optimize_vacation,
 )
-from app.models.schemas import Holiday
+from app.models.schemas import Holiday, OptimizeRequest
 
 
 class TestBuildCalendar:
@@ -134,3 +139,73 @@ class TestFindVacationClusters:
 
         for option in options:
             assert option.pto_days_used <= 2
+
+
+class TestCompactCalendar:
+    def test_stores_one_byte_per_day(self):
+        calendar = build_calendar(
+            start_date=date(2026, 1, 1),
+            end_date=date(2030, 12, 31),
+            work_days=[0, 1, 2, 3, 4],
+            holidays=[],
+        )
+
+        assert len(calendar) == 1826
+        assert len(calendar.day_types) == 1826
+        assert calendar.holidays == {}
+
+    def test_round_trips_through_mapping(self):
+        holidays = [
+            Holiday(
+                date=date(2026, 1, 1),
+                name="New Year's Day",
+                country_code="US",
+                types=["Public"],
+            )
+        ]
+        calendar = build_calendar(
+            start_date=date(2025, 12, 29),
+            end_date=date(2026, 1, 4),
+            work_days=[0, 1, 2, 3, 4],
+            holidays=holidays,
+        )
+        as_dict = dict(calendar)
+
+        packed = CompactCalendar.from_mapping(as_dict)
+
+        assert packed.day_types == calendar.day_types
+        assert packed.holidays == {3: holidays[0]}
+        assert find_vacation_clusters(as_dict, 2) == find_vacation_clusters(calendar, 2)
+
+    def test_out_of_range_date_raises_key_error(self):
+        calendar = build_calendar(
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 1, 7),
+            work_days=[0, 1, 2, 3, 4],
+            holidays=[],
+        )
+
+        with pytest.raises(KeyError):
+            calendar[date(2026, 1, 8)]
+
+
+class TestOptimizeVacation:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_honors_max_results(self):
+        respx.get(f"{BASE_URL}/PublicHolidays/2027/US").mock(
+            return_value=Response(200, json=[])
+        )
+        request = OptimizeRequest(
+            country="US",
+            pto_days=5,
+            start_date=date(2027, 1, 1),
+            end_date=date(2027, 12, 31),
+            max_results=7,
+        )
+
+        options = await optimize_vacation(request)
+
+        assert len(options) == 7
+        keys = [(-o.total_days_off, -o.efficiency_ratio, o.start_date) for o in options]
+        assert keys == sorted(keys)
@@ -0,0 +1,194 @@
+import random
+from datetime import date, timedelta
+
+import httpx
+import pytest
+import respx
+from httpx import Response
+
+from app.core import holidays
+from app.core.optimizer import build_calendar
+from app.core.planner import candidate_trips, plan_trips, search_vacation_plan
+from app.core.search import WEEKEND, WORKDAY, SearchIndex
+from app.main import app
+
+US_2026 = [
+    {"date": "2026-05-25", "name": "Memorial Day", "countryCode": "US", "types": ["Public"]},
+    {"date": "2026-07-03", "name": "Independence Day", "countryCode": "US", "types": ["Public"]},
+    {"date": "2026-09-07", "name": "Labor Day", "countryCode": "US", "types": ["Public"]},
+    {"date": "2026-11-26", "name": "Thanksgiving Day", "countryCode": "US", "types": ["Public"]},
+    {"date": "2026-12-25", "name": "Christmas Day", "countryCode": "US", "types": ["Public"]},
+]
+
+
+def brute_force(index: SearchIndex, budget: int, min_gap_days: int = 0, **limits) -> int:
+    """Best total days off over every set of compatible trips."""
+    trips = sorted(candidate_trips(index, budget, **limits), key=lambda t: t.cluster_start)
+    gap = max(min_gap_days, 1)
+
+    def best(i: int, free_from: int, left: int) -> int:
+        if i == len(trips):
+            return 0
+        skip = best(i + 1, free_from, left)
+        trip = trips[i]
+        if trip.cluster_start >= free_from and trip.pto_days <= left:
+            take = trip.total_days_off + best(
+                i + 1, trip.cluster_end + 1 + gap, left - trip.pto_days
+            )
+            return max(skip, take)
+        return skip
+
+    return best(0, 0, budget)
+
+
+def check_plan(plan, budget: int, min_gap_days: int = 0) -> None:
+    assert sum(t.pto_days for t in plan) <= budget
+    for previous, trip in zip(plan, plan[1:]):
+        assert trip.cluster_start - previous.cluster_end - 1 >= max(min_gap_days, 1)
+
+
+class TestPlanTrips:
+    @pytest.mark.parametrize("seed", range(25))
+    def test_matches_brute_force(self, seed):
+        rng = random.Random(seed)
+        day_types = bytes(rng.choice([WORKDAY, WORKDAY, WEEKEND]) for _ in range(rng.randint(5, 24)))
+        index = SearchIndex(day_types)
+        budget = rng.randint(1, 5)
+        min_gap_days = rng.choice([0, 0, 2])
+        limits = rng.choice([{}, {"min_trip_days": 3}, {"max_trip_days": 4}])
+
+        plan = plan_trips(index, budget, min_gap_days=min_gap_days, **limits)
+
+        check_plan(plan, budget, min_gap_days)
+        assert sum(t.total_days_off for t in plan) == brute_force(
+            index, budget, min_gap_days, **limits
+        )
+
+    def test_spends_budget_across_the_year(self):
+        calendar = build_calendar(
+            date(2026, 1, 1),
+            date(2026, 12, 31),
+            [0, 1, 2, 3, 4],
+            holidays.HolidayIndex.from_payload(US_2026).holidays,
+        )
+        index = SearchIndex(calendar.day_types)
+
+        plan = plan_trips(index, 20)
+
+        check_plan(plan, 20)
+        assert sum(t.pto_days for t in plan) == 20
+        assert len(plan) > 1
+
+    def test_trip_length_limits(self):
+        calendar = build_calendar(date(2026, 1, 1), date(2026, 6, 30), [0, 1, 2, 3, 4], [])
+        index = SearchIndex(calendar.day_types)
+
+        plan = plan_trips(index, 15, min_trip_days=5, max_trip_days=9)
+
+        assert plan
+        assert all(5 <= t.total_days_off <= 9 for t in plan)
+
+    def test_prefers_less_pto_for_same_days_off(self):
+        # Mon..Sun with Tue-Thu holidays: one PTO day on Monday or Friday
+        # bridges to the weekend, two make the whole week
+        calendar = build_calendar(
+            date(2026, 1, 3),
+            date(2026, 1, 11),
+            [0, 1, 2, 3, 4],
+            [
+                holidays.Holiday(date=date(2026, 1, d), name="H", country_code="XX")
+                for d in (6, 7, 8)
+            ],
+        )
+        index = SearchIndex(calendar.day_types)
+
+        plan = plan_trips(index, 5)
+
+        assert [(t.pto_days, t.total_days_off) for t in plan] == [(2, 9)]
+
+    def test_can_work_a_day_inside_a_trip(self):
+        # Wednesday holidays a week apart: working the Monday between them
+        # joins two bridges into one trip
+        bridged = [
+            holidays.Holiday(date=date(2026, 1, d), name="H", country_code="XX") for d in (7, 14)
+        ]
+        args = (date(2026, 1, 5), date(2026, 1, 16), [0, 1, 2, 3, 4], bridged, 3)
+
+        assert all(t.worked_dates is None for t in search_vacation_plan(*args))
+        (trip,) = search_vacation_plan(*args, max_worked_days=1)
+        assert trip.worked_dates == [date(2026, 1, 12)]
+        assert trip.total_days_off == 7
+
+    def test_empty_range(self):
+        assert search_vacation_plan(date(2026, 1, 2), date(2026, 1, 1), [0, 1, 2, 3, 4], [], 5) == []
+
+
+class TestPlanEndpoints:
+    @pytest.mark.asyncio
+    async def test_api_plan(self):
+        payload = {
+            "country": "us",
+            "pto_budget": 15,
+            "start_date": "2026-01-01",
+            "end_date": "2026-12-31",
+            "max_trip_days": 10,
+            "min_gap_days": 30,
+        }
+        transport = httpx.ASGITransport(app=app)
+
+        with respx.mock:
+            respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(
+                return_value=Response(200, json=US_2026)
+            )
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/api/plan", json=payload)
+
+        assert response.status_code == 200
+        body = response.json()
+        trips = body["trips"]
+        assert body["pto_days_used"] == sum(t["pto_days_used"] for t in trips) <= 15
+        assert body["total_days_off"] == sum(t["total_days_off"] for t in trips)
+        assert all(t["total_days_off"] <= 10 for t in trips)
+        starts = [date.fromisoformat(t["start_date"]) for t in trips]
+        ends = [date.fromisoformat(t["end_date"]) for t in trips]
+        assert all(s - e > timedelta(days=30) for e, s in zip(ends, starts[1:]))
+
+    @pytest.mark.asyncio
+    async def test_plan_partial(self):
+        form = {
+            "country": "US",
+            "pto_days": "10",
+            "start_date": "2026-01-01",
+            "end_date": "2026-12-31",
+            "work_days": ["0", "1", "2", "3", "4"],
+            "min_trip_days": "",
+            "max_trip_days": "",
+            "min_gap_days": "",
+        }
+        transport = httpx.ASGITransport(app=app)
+
+        with respx.mock:
+            respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(
+                return_value=Response(200, json=US_2026)
+            )
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/plan", data=form)
+
+        assert response.status_code == 200
+        assert "Vacation Plan" in response.text
+        assert "of 10 PTO days" in response.text
+
+
+class TestBlockedDays:
+    def test_trips_avoid_blocked_days(self):
+        calendar = build_calendar(date(2026, 1, 1), date(2026, 3, 31), [0, 1, 2, 3, 4], [])
+        index = SearchIndex(calendar.day_types)
+        blocked = sum(1 << d for d in index.workdays[::4])
+
+        trips = candidate_trips(index, 5, blocked=blocked)
+
+        assert trips
+        assert all(
+            not blocked >> d & 1 for t in trips for d in index.window(t.first_workday, t.pto_days)
+        )
+        assert max(t.pto_days for t in trips) == 3
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+import respx
+from httpx import Response
+from pydantic import ValidationError
+
+from app.core import holidays, result_cache
+from app.core.result_cache import (
+    canonical_request,
+    optimize_vacation_cached,
+    request_key,
+    result_cache_stats,
+    sweep_vacation_cached,
+)
+from tests.conftest import make_request
+
+
+@pytest.fixture
+def counted_optimizer(monkeypatch):
+    calls = []
+    original = result_cache.optimize_vacation
+
+    async def counting(request):
+        calls.append(request)
+        return await original(request)
+
+    monkeypatch.setattr(result_cache, "optimize_vacation", counting)
+    return calls
+
+
+@pytest.fixture
+def us_holidays():
+    with respx.mock:
+        respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(
+            return_value=Response(
+                200,
+                json=[
+                    {
+                        "date": "2026-07-03",
+                        "name": "Independence Day",
+                        "countryCode": "US",
+                        "types": ["Public"],
+                    }
+                ],
+            )
+        )
+        yield
+
+
+class TestRequestKey:
+    def test_equivalent_requests_share_a_key(self):
+        a = canonical_request(make_request(country="us", work_days=[4, 3, 2, 1, 0]))
+        b = canonical_request(make_request(country="US", work_days=[0, 1, 2, 3, 4]))
+
+        assert request_key(a) == request_key(b)
+        assert request_key(a)[4] == 0b11111
+
+    def test_rejects_out_of_range_weekdays(self):
+        with pytest.raises(ValidationError):
+            make_request(work_days=[-1, 0, 1, 2, 3, 4])
+
+    def test_qualifies_subdivision(self):
+        request = canonical_request(make_request(subdivision="ca"))
+
+        assert request.subdivision == "US-CA"
+
+
+class TestOptimizeVacationCached:
+    @pytest.mark.asyncio
+    async def test_reuses_results(self, us_holidays, counted_optimizer):
+        first = await optimize_vacation_cached(make_request())
+        second = await optimize_vacation_cached(make_request(country="us"))
+
+        assert second is first
+        assert len(counted_optimizer) == 1
+        assert result_cache_stats().hits == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_requests(self, us_holidays, counted_optimizer):
+        results = await asyncio.gather(*(optimize_vacation_cached(make_request()) for _ in range(5)))
+
+        assert all(r is results[0] for r in results)
+        assert len(counted_optimizer) == 1
+
+    @pytest.mark.asyncio
+    async def test_recomputes_when_holiday_data_changes(self, us_holidays, counted_optimizer):
+        await optimize_vacation_cached(make_request())
+        holidays._cache.clear()
+
+        await optimize_vacation_cached(make_request())
+
+        assert len(counted_optimizer) == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_during_compute_is_not_cached_as_current(self, us_holidays, monkeypatch):
+        calls = []
+        original = result_cache.optimize_vacation
+
+        async def refreshed_mid_compute(request):
+            calls.append(request)
+            options = await original(request)
+            # New holiday data lands while the old result is being computed
+            holidays._cache.clear()
+            await holidays.get_holiday_index("US", 2026)
+            return options
+
+        monkeypatch.setattr(result_cache, "optimize_vacation", refreshed_mid_compute)
+        await optimize_vacation_cached(make_request())
+        monkeypatch.setattr(result_cache, "optimize_vacation", original)
+
+        assert result_cache.cached_result(canonical_request(make_request())) is None
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_different_requests_are_computed_separately(self, us_holidays, counted_optimizer):
+        await optimize_vacation_cached(make_request(pto_days=5))
+        await optimize_vacation_cached(make_request(pto_days=10))
+
+        assert len(counted_optimizer) == 2
+
+
+class TestSweepVacationCached:
+    @pytest.mark.asyncio
+    async def test_seeds_every_budget(self, counted_optimizer, us_holidays):
+        options, budgets = await sweep_vacation_cached(make_request(country="us", pto_days=4))
+
+        for k in range(1, 5):
+            single = await optimize_vacation_cached(make_request(pto_days=k))
+            assert single == [options[i] for i in budgets[k - 1]]
+        assert counted_optimizer == []
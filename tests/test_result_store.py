@@ -0,0 +1,101 @@
+from datetime import date
+
+import httpx
+import pytest
+from icalendar import Calendar
+
+from app.core.result_store import ResultStore, get_result_store
+from app.main import app
+from tests.conftest import FakeClock, make_option
+
+
+class TestResultStore:
+    def test_ids_are_short_and_content_derived(self):
+        store = ResultStore()
+        first = store.save([make_option()])
+
+        assert len(first) == 16
+        assert store.save([make_option()]) == first
+        assert store.save([make_option(day=6)]) != first
+        assert store.load(first) == [make_option()]
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        store = ResultStore(ttl=60, clock=clock)
+        result_id = store.save([make_option()])
+
+        clock.now = 61
+
+        assert store.load(result_id) is None
+        assert store.ics(result_id, 0) is None
+
+    def test_bounded(self):
+        store = ResultStore(maxsize=2)
+        ids = [store.save([make_option(day=d)]) for d in (1, 2, 3)]
+
+        assert store.load(ids[0]) is None
+        assert store.load(ids[2]) is not None
+
+    def test_sqlite_backend_survives_restart(self, tmp_path):
+        path = tmp_path / "results.sqlite3"
+        store = ResultStore(path)
+        result_id = store.save([make_option(), make_option(day=10)])
+        store.close()
+
+        reopened = ResultStore(path)
+        assert reopened.load(result_id) == [make_option(), make_option(day=10)]
+        reopened.close()
+
+    def test_ics_is_cached_per_index(self):
+        store = ResultStore()
+        result_id = store.save([make_option(), make_option(day=10)])
+
+        single = store.ics(result_id, 1)
+
+        assert store.ics(result_id, 1) is single
+        assert store.ics(result_id, 0) != single
+        with pytest.raises(IndexError):
+            store.ics(result_id, 2)
+
+
+class TestDownloadEndpoints:
+    @pytest.mark.asyncio
+    async def test_download_and_conditional_get(self):
+        result_id = get_result_store().save([make_option(), make_option(day=10)])
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(f"/api/ics/{result_id}/1")
+            etag = response.headers["etag"]
+            cached = await client.get(f"/api/ics/{result_id}/1", headers={"If-None-Match": etag})
+            everything = await client.get(f"/api/ics/{result_id}")
+            everything_cached = await client.get(
+                f"/api/ics/{result_id}", headers={"If-None-Match": everything.headers["etag"]}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/calendar")
+        events = Calendar.from_ical(response.content).walk("VEVENT")
+        assert events[0].decoded("dtstart") == date(2026, 7, 10)
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+        assert everything.status_code == 200
+        assert everything.headers["etag"] != etag
+        assert len(Calendar.from_ical(everything.content).walk("VEVENT")) == 2
+        assert everything_cached.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_unknown_result_or_index(self):
+        result_id = get_result_store().save([make_option()])
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            missing = await client.get("/api/ics/nosuchresult0000")
+            missing_single = await client.get("/api/ics/nosuchresult0000/0")
+            out_of_range = await client.get(f"/api/ics/{result_id}/5")
+
+        assert missing.status_code == 404
+        assert missing_single.json()["detail"] == "Unknown or expired result: nosuchresult0000"
+        assert out_of_range.status_code == 404
+        assert out_of_range.json()["detail"] == f"No option 5 in result {result_id}"
@@ -0,0 +1,233 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.optimizer import (
+    build_calendar,
+    find_top_vacation_options,
+    find_vacation_clusters,
+    find_vacation_clusters_reference,
+    search_vacation_options,
+    search_vacation_sweep,
+)
+from app.core.search import SearchIndex
+from app.models.schemas import Holiday
+
+
+def random_holidays(rng: random.Random, start: date, days: int, count: int) -> list[Holiday]:
+    offsets = rng.sample(range(days), min(count, days))
+    return [
+        Holiday(
+            date=start + timedelta(days=o),
+            name=f"Holiday {o}",
+            country_code="XX",
+            types=["Public"],
+        )
+        for o in offsets
+    ]
+
+
+class TestSearchIndex:
+    def test_free_run_boundaries(self):
+        # Fri workday, Sat-Sun weekend, Mon workday
+        calendar = build_calendar(
+            start_date=date(2026, 1, 9),
+            end_date=date(2026, 1, 12),
+            work_days=[0, 1, 2, 3, 4],
+            holidays=[],
+        )
+        index = SearchIndex(calendar.day_types)
+
+        assert list(index.workdays) == [0, 3]
+        assert list(index.run_start) == [0, 1, 1, 1]
+        assert list(index.run_end) == [2, 2, 2, 3]
+
+    def test_respects_pto_span_limit(self):
+        # Only two workdays, 16 days apart
+        calendar = build_calendar(
+            start_date=date(2026, 1, 5),
+            end_date=date(2026, 1, 21),
+            work_days=[0, 1, 2, 3, 4],
+            holidays=[
+                Holiday(date=date(2026, 1, 5) + timedelta(days=o), name="H", country_code="XX")
+                for o in range(1, 16)
+            ],
+        )
+
+        options = find_vacation_clusters(calendar, pto_days=2)
+
+        assert all(o.pto_days_used == 1 for o in options)
+
+
+class TestGapPolicy:
+    def bridge_calendar(self):
+        # Holidays on Wed 2026-01-07 and Wed 2026-01-14, with a weekend between
+        holidays = [
+            Holiday(date=date(2026, 1, 7), name="First", country_code="XX"),
+            Holiday(date=date(2026, 1, 14), name="Second", country_code="XX"),
+        ]
+        return build_calendar(date(2026, 1, 5), date(2026, 1, 16), [0, 1, 2, 3, 4], holidays)
+
+    def test_worked_days_bridge_two_holidays(self):
+        calendar = self.bridge_calendar()
+
+        consecutive = find_top_vacation_options(calendar, 3, 1)[0]
+        (bridge,) = find_top_vacation_options(calendar, 3, 1, max_worked_days=1)
+
+        assert consecutive.total_days_off == 6
+        assert bridge.pto_dates == [date(2026, 1, 8), date(2026, 1, 9), date(2026, 1, 13)]
+        assert bridge.worked_dates == [date(2026, 1, 12)]
+        assert (bridge.start_date, bridge.end_date) == (date(2026, 1, 7), date(2026, 1, 14))
+        assert bridge.total_days_off == 7
+
+    def test_prefers_consecutive_pto_on_ties(self):
+        # Thanksgiving week: working a day around Thursday gives no more
+        # days off than Wednesday and Friday as PTO
+        thanksgiving = [Holiday(date=date(2025, 11, 27), name="Thanksgiving Day", country_code="US")]
+
+        options = search_vacation_options(
+            date(2025, 11, 1), date(2025, 11, 30), [0, 1, 2, 3, 4], thanksgiving, 2, 5, max_worked_days=1
+        )
+
+        assert options[0].pto_dates == [date(2025, 11, 26), date(2025, 11, 28)]
+        assert options[0].total_days_off == 5
+        assert all(o.worked_dates is None for o in options)
+
+    def test_span_limit_is_a_parameter(self):
+        calendar = self.bridge_calendar()
+
+        options = find_vacation_clusters(calendar, 3, max_span_days=2)
+
+        assert all((o.pto_dates[-1] - o.pto_dates[0]).days <= 2 for o in options)
+        assert max(o.pto_days_used for o in options) == 2
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_best_window_per_budget_matches_brute_force(self, seed):
+        rng = random.Random(seed)
+        start = date(2026, 1, 1)
+        holidays = random_holidays(rng, start, 120, rng.randrange(0, 12))
+        calendar = build_calendar(start, start + timedelta(days=119), [0, 1, 2, 3, 4], holidays)
+        span, max_worked = rng.randrange(0, 25), rng.randrange(0, 4)
+        index = SearchIndex(calendar.day_types, span, max_worked)
+        workdays = index.workdays
+
+        for k in range(1, 8):
+            expected = 0
+            for j in range(len(workdays)):
+                for w in range(max_worked + 1 if k >= 2 else 1):
+                    if j + k + w > len(workdays) or workdays[j + k + w - 1] - workdays[j] > span:
+                        break
+                    total = index.run_end[workdays[j + k + w - 1]] - index.run_start[workdays[j]] + 1 - w
+                    expected = max(expected, total)
+            found = list(index.windows(k, min_pto_days=k))
+            assert max((w.total_days_off for w in found), default=0) == expected
+            for window in found:
+                days = index.window(window.first_workday, window.pto_days, window.worked_days)
+                assert len(days) == k and days[-1] - days[0] <= span
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_all_windows_follow_the_same_policy(self, seed):
+        rng = random.Random(seed)
+        start = date(2026, 1, 1)
+        holidays = random_holidays(rng, start, 120, rng.randrange(0, 12))
+        calendar = build_calendar(start, start + timedelta(days=119), [0, 1, 2, 3, 4], holidays)
+        index = SearchIndex(calendar.day_types, rng.randrange(0, 25), rng.randrange(0, 4))
+
+        windows = list(index.all_windows(7))
+
+        for k in range(1, 8):
+            searched = list(index.windows(k, min_pto_days=k))
+            assert max((w.total_days_off for w in windows if w.pto_days == k), default=0) == max(
+                (w.total_days_off for w in searched), default=0
+            )
+            assert {(w.first_workday, w.worked_days) for w in searched} <= {
+                (w.first_workday, w.worked_days) for w in windows if w.pto_days == k
+            }
+
+    def test_default_output_has_no_worked_dates(self):
+        (option,) = search_vacation_options(
+            date(2026, 1, 5), date(2026, 1, 16), [0, 1, 2, 3, 4], [], 3, 1
+        )
+
+        assert "worked_dates" not in option.model_dump_json()
+
+
+class TestMatchesReference:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_random_calendars(self, seed):
+        rng = random.Random(seed)
+        start = date(2026, 1, 1) + timedelta(days=rng.randrange(365))
+        days = rng.randrange(1, 90)
+        work_days = sorted(rng.sample(range(7), rng.randrange(1, 8)))
+        holidays = random_holidays(rng, start, days, rng.randrange(0, 12))
+        calendar = build_calendar(start, start + timedelta(days=days - 1), work_days, holidays)
+        pto_days = rng.randrange(1, 8)
+
+        expected = find_vacation_clusters_reference(calendar, pto_days)
+        actual = find_vacation_clusters(calendar, pto_days)
+
+        assert actual == expected
+
+    def test_full_year(self):
+        rng = random.Random(2026)
+        start = date(2026, 1, 1)
+        holidays = random_holidays(rng, start, 365, 11)
+        calendar = build_calendar(start, date(2026, 12, 31), [0, 1, 2, 3, 4], holidays)
+
+        assert find_vacation_clusters(calendar, 5) == find_vacation_clusters_reference(calendar, 5)
+
+
+class TestTopWindows:
+    @pytest.mark.parametrize("seed", range(10))
+    def test_matches_full_sort(self, seed):
+        rng = random.Random(seed)
+        start = date(2026, 1, 1)
+        holidays = random_holidays(rng, start, 365, rng.randrange(0, 20))
+        calendar = build_calendar(start, date(2026, 12, 31), [0, 1, 2, 3, 4], holidays)
+        limit = rng.randrange(1, 60)
+
+        expected = sorted(
+            find_vacation_clusters(calendar, 10),
+            key=lambda o: (-o.total_days_off, -o.efficiency_ratio, o.start_date),
+        )[:limit]
+
+        assert find_top_vacation_options(calendar, 10, limit) == expected
+
+    def test_shares_holiday_details(self):
+        holidays = [Holiday(date=date(2026, 1, 1), name="New Year's Day", country_code="US")]
+        calendar = build_calendar(date(2025, 12, 29), date(2026, 1, 11), [0, 1, 2, 3, 4], holidays)
+
+        options = find_top_vacation_options(calendar, 3, 10)
+        details = [h for o in options for h in o.holidays_included]
+
+        assert len(details) > 1
+        assert all(d is details[0] for d in details)
+
+
+class TestSweep:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_top_for_every_budget(self, seed):
+        rng = random.Random(seed)
+        start = date(2026, 1, 1)
+        holidays = random_holidays(rng, start, 365, rng.randrange(0, 20))
+        calendar = build_calendar(start, date(2026, 12, 31), [0, 1, 2, 3, 4], holidays)
+        index = SearchIndex(calendar.day_types)
+        limit = rng.randrange(1, 30)
+
+        sweep = index.sweep(12, limit)
+
+        assert sweep == [index.top(k, limit) for k in range(1, 13)]
+
+    def test_options_are_shared_between_budgets(self):
+        start, end = date(2026, 1, 1), date(2026, 12, 31)
+        holidays = random_holidays(random.Random(0), start, 365, 10)
+
+        options, budgets = search_vacation_sweep(start, end, [0, 1, 2, 3, 4], holidays, 8, 10)
+
+        assert len(budgets) == 8
+        assert len(options) == len({i for positions in budgets for i in positions})
+        assert len(options) < sum(map(len, budgets))
+        for k, positions in enumerate(budgets, 1):
+            expected = search_vacation_options(start, end, [0, 1, 2, 3, 4], holidays, k, 10)
+            assert [options[i] for i in positions] == expected
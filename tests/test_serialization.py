@@ -0,0 +1,71 @@
+from datetime import date
+
+import httpx
+import pytest
+import respx
+from httpx import Response
+
+from app.core import holidays
+from app.core.serialization import dump_options, optimize_response_json
+from app.main import app
+from app.models.schemas import OptimizeResponse, SweepResponse
+from tests.conftest import make_option
+
+
+class TestSerialization:
+    def test_response_matches_model_dump(self):
+        options = [make_option(), make_option(9)]
+        search_range = (date(2026, 1, 1), date(2026, 12, 31))
+
+        body = optimize_response_json(options, "US", *search_range)
+
+        expected = OptimizeResponse(options=options, country="US", search_range=search_range)
+        assert body == expected.model_dump_json().encode()
+
+    def test_dumps_each_list_once(self):
+        options = [make_option()]
+
+        first = dump_options(options)
+
+        assert dump_options(options) is first
+        assert dump_options([make_option()]) is not first
+        assert dump_options([make_option()]) == first
+
+
+class TestOptimizeEndpoint:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_repeated_requests_reuse_the_dump(self):
+        respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(
+            return_value=Response(
+                200,
+                json=[{"date": "2026-07-03", "name": "Independence Day", "countryCode": "US", "types": ["Public"]}],
+            )
+        )
+        payload = {"country": "us", "pto_days": 3, "start_date": "2026-06-01", "end_date": "2026-07-31"}
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/api/optimize", json=payload)
+            second = await client.post("/api/optimize", json=payload)
+
+        assert first.headers["content-type"] == "application/json"
+        assert first.content == second.content
+        response = OptimizeResponse.model_validate_json(first.content)
+        assert response.country == "us"
+        assert response.options[0].holidays_included[0].name == "Independence Day"
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_sweep_lists_each_option_once(self):
+        respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(return_value=Response(200, json=[]))
+        payload = {"country": "US", "pto_days": 5, "start_date": "2026-06-01", "end_date": "2026-07-31"}
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/optimize/sweep", json=payload)
+
+        sweep = SweepResponse.model_validate_json(response.content)
+        assert len(sweep.budgets) == 5
+        assert [sweep.options[i].pto_days_used for i in sweep.budgets[0]] == [1] * len(sweep.budgets[0])
+        assert sorted({i for b in sweep.budgets for i in b}) == list(range(len(sweep.options)))
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_calls(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 42
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(10)))
+
+        assert results == [42] * 10
+        assert calls == 1
+        assert flight.calls == 1
+        assert flight.coalesced == 9
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_separate_keys_run_separately(self):
+        flight = SingleFlight()
+
+        async def work(value: str) -> str:
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", lambda: work("a")),
+            flight.do("b", lambda: work("b")),
+        )
+
+        assert results == ["a", "b"]
+        assert flight.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_shares_exceptions_and_forgets_failed_calls(self):
+        flight = SingleFlight()
+
+        async def fail() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> str:
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "done"
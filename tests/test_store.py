@@ -0,0 +1,54 @@
+import time
+
+from app.core.store import HolidayStore, read_snapshot, write_snapshot
+
+
+class TestHolidayStore:
+    def test_put_and_get(self):
+        store = HolidayStore()
+        store.put("PublicHolidays/2026/US", [{"date": "2026-01-01"}], fetched_at=100.0)
+
+        assert store.get("PublicHolidays/2026/US") == (100.0, [{"date": "2026-01-01"}])
+        assert store.get("PublicHolidays/2026/CA") is None
+
+    def test_keeps_most_recent_copy(self):
+        store = HolidayStore()
+        store.put("key", "new", fetched_at=200.0)
+        store.put("key", "old", fetched_at=100.0)
+
+        assert store.get("key") == (200.0, "new")
+
+    def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "holidays.sqlite3"
+        store = HolidayStore(path)
+        store.put("AvailableCountries", [{"countryCode": "US", "name": "United States"}])
+        store.close()
+
+        reopened = HolidayStore(path)
+
+        assert reopened.keys() == ["AvailableCountries"]
+
+
+class TestSnapshot:
+    def test_round_trips_entries(self, tmp_path):
+        path = tmp_path / "snapshot.json.gz"
+        source = HolidayStore()
+        source.put("PublicHolidays/2026/US", [])
+        source.put("AvailableCountries", [])
+
+        assert source.export_snapshot(path) == 2
+        target = HolidayStore()
+
+        assert target.load_snapshot(path) == 2
+        assert target.keys() == ["AvailableCountries", "PublicHolidays/2026/US"]
+
+    def test_does_not_overwrite_newer_entries(self, tmp_path):
+        path = tmp_path / "snapshot.json.gz"
+        write_snapshot(path, {"key": "snapshot"})
+        store = HolidayStore()
+        store.put("key", "fresh", fetched_at=time.time() + 60)
+
+        store.load_snapshot(path)
+
+        assert store.get("key")[1] == "fresh"
+        assert read_snapshot(path)["entries"] == {"key": "snapshot"}
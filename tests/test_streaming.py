@@ -0,0 +1,115 @@
+import json
+
+import httpx
+import pytest
+
+from app.api.routes import sse_event
+from app.core.optimizer import optimize_vacation
+from app.core.result_cache import optimize_vacation_cached
+from app.core.streaming import budget_chunks, optimize_vacation_stream
+from app.main import app
+from tests.conftest import make_request
+
+FORM = {
+    "country": "US",
+    "pto_days": "8",
+    "start_date": "2026-01-01",
+    "end_date": "2026-12-31",
+    "work_days": ["0", "1", "2", "3", "4"],
+}
+
+
+def test_budget_chunks_cover_every_budget_once():
+    for pto_days in (1, 5, 6, 7, 30):
+        chunks = budget_chunks(pto_days)
+        assert len(chunks) <= 6
+        assert [k for chunk in chunks for k in chunk] == list(range(1, pto_days + 1))
+
+
+def test_sse_event_prefixes_every_line():
+    assert sse_event("update", "a\nb") == "event: update\ndata: a\ndata: b\n\n"
+
+
+class TestOptimizeVacationStream:
+    @pytest.mark.asyncio
+    async def test_final_matches_optimize_vacation(self, upstream):
+        request = make_request(pto_days=8, max_results=7)
+
+        events = [e async for e in optimize_vacation_stream(request)]
+
+        assert [e.event for e in events] == ["update"] * 3 + ["final"]
+        assert [e.progress for e in events][-1] == 1.0
+        assert all(e.progress < 1 for e in events[:-1])
+        assert events[-1].options == await optimize_vacation(request)
+
+    @pytest.mark.asyncio
+    async def test_updates_never_get_worse(self, upstream):
+        events = [e async for e in optimize_vacation_stream(make_request(pto_days=8))]
+
+        best = [e.options[0].total_days_off for e in events]
+        assert best == sorted(best)
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_final_only(self, upstream):
+        request = make_request(pto_days=8)
+        expected = await optimize_vacation_cached(request)
+
+        events = [e async for e in optimize_vacation_stream(request)]
+
+        assert [(e.event, e.options) for e in events] == [("final", expected)]
+
+    @pytest.mark.asyncio
+    async def test_fills_result_cache(self, upstream):
+        request = make_request(pto_days=8)
+        events = [e async for e in optimize_vacation_stream(request)]
+
+        assert await optimize_vacation_cached(request) is events[-1].options
+
+
+class TestStreamEndpoints:
+    @pytest.mark.asyncio
+    async def test_ndjson_by_default(self, upstream):
+        payload = {"country": "US", "pto_days": 8, "start_date": "2026-01-01", "end_date": "2026-12-31"}
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/optimize/stream", json=payload)
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[-1]["event"] == "final"
+        assert len(lines[-1]["options"]) == 10
+
+    @pytest.mark.asyncio
+    async def test_sse_when_accepted(self, upstream):
+        payload = {"country": "ZZ", "pto_days": 8, "start_date": "2026-01-01", "end_date": "2026-12-31"}
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/optimize/stream", json=payload, headers={"Accept": "text/event-stream"}
+            )
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        event, data = response.text.strip().split("\n")
+        assert event == "event: error"
+        assert json.loads(data.removeprefix("data: "))["error"] == "Unknown country code: ZZ"
+
+    @pytest.mark.asyncio
+    async def test_results_form_returns_stream_shell(self, upstream):
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            shell = await client.post("/results", data={**FORM, "stream": "1"})
+            url = shell.text.split('sse-connect="')[1].split('"')[0].replace("&amp;", "&")
+            response = await client.get(url)
+
+        assert url.startswith("/results/stream?")
+        assert "stream=" not in url
+        # Updates replace the target's contents, so it keeps receiving them
+        assert '<div sse-swap="update" hx-swap="innerHTML">' in shell.text
+        events = [block for block in response.text.split("\n\n") if block]
+        assert events[0].startswith("event: update")
+        assert events[-1].startswith("event: final")
+        assert "/api/ics/" not in events[0]
+        assert "/api/ics/" in events[-1]
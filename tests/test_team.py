@@ -0,0 +1,89 @@
+from datetime import date
+
+import httpx
+import pytest
+import respx
+from httpx import Response
+
+from app.core import holidays
+from app.core.optimizer import build_calendar
+from app.core.planner import plan_trips
+from app.core.search import SearchIndex
+from app.core.team import plan_team, pto_days, search_team_plan
+from app.main import app
+from app.models.schemas import TeamPlanResponse
+
+START, END = date(2026, 1, 1), date(2026, 12, 31)
+WEEKDAYS = [0, 1, 2, 3, 4]
+TUE_SAT = [1, 2, 3, 4, 5]
+
+
+def indexes(*patterns: list[int]) -> list[SearchIndex]:
+    return [SearchIndex(build_calendar(START, END, p, []).day_types) for p in patterns]
+
+
+class TestPlanTeam:
+    @pytest.mark.parametrize("min_staffing", [3, 6, 9])
+    def test_never_drops_below_min_staffing(self, min_staffing):
+        team = indexes(WEEKDAYS, TUE_SAT)
+        members = [(i % 2, 10 + i) for i in range(12)]
+
+        plans, lowest = plan_team(team, members, min_staffing)
+
+        # Rebuild the occupancy matrix one member and day at a time
+        days = len(team[0].run_start)
+        for d in range(days):
+            working = [d in team[p].workdays for p, _ in members]
+            away = [pto_days(team[p], trips) >> d & 1 for (p, _), trips in zip(members, plans)]
+            if any(away):
+                assert sum(working) - sum(away) >= min_staffing
+        assert lowest is not None and lowest >= min_staffing
+
+    def test_without_a_staffing_limit_everyone_gets_their_own_best_plan(self):
+        team = indexes(WEEKDAYS, TUE_SAT)
+        members = [(0, 12), (1, 12), (0, 3)]
+
+        plans, _ = plan_team(team, members, 0)
+
+        assert plans == [plan_trips(team[p], budget) for p, budget in members]
+
+    def test_earlier_members_get_first_pick(self):
+        team = indexes(WEEKDAYS)
+
+        (first, second), lowest = plan_team(team, [(0, 10), (0, 10)], 1)
+
+        assert first == plan_trips(team[0], 10)
+        assert not pto_days(team[0], first) & pto_days(team[0], second)
+        assert lowest == 1
+
+    def test_identical_members_share_options(self):
+        plans, lowest = search_team_plan(START, END, [], [(WEEKDAYS, 5)] * 3, 0)
+
+        assert plans[0] is plans[1] is plans[2]
+        assert lowest == 0
+
+
+class TestTeamEndpoint:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_api_plan_team(self):
+        respx.get(f"{holidays.BASE_URL}/PublicHolidays/2026/US").mock(return_value=Response(200, json=[]))
+        payload = {
+            "country": "US",
+            "start_date": "2026-06-01",
+            "end_date": "2026-08-31",
+            "min_staffing": 1,
+            "members": [
+                {"name": "Ada", "pto_budget": 5},
+                {"name": "Grace", "pto_budget": 5, "work_days": TUE_SAT},
+            ],
+        }
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/plan/team", json=payload)
+
+        plan = TeamPlanResponse.model_validate_json(response.content)
+        assert [m.name for m in plan.members] == ["Ada", "Grace"]
+        assert all(m.pto_days_used == 5 for m in plan.members)
+        assert plan.lowest_staffing == 1